@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+"""
+Answer Journal
+
+Append-only local journal of an interview in progress, one JSON line per event: a header
+when the first answer arrives, one line per answer as it is submitted, and a completion
+marker. Every line is flushed and fsynced before the candidate moves on, so a browser or
+server crash loses at most the answer being typed. A new session for the same interview
+resumes from the journal.
+
+Each line also carries the block of transcript text it adds and the byte offset of that
+block in the transcript. The transcript (the answers file) is therefore the header text
+followed by every answer's text in order. It can be built from the journal, or appended
+to an append blob block by block with the offset as the expected append position.
+
+A journal opened without a directory is not written anywhere: it still hands out records
+and offsets, but nothing survives the session.
+"""
+
+import os
+import json
+import time
+import uuid
+import logging
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_DIR = os.environ.get('INTERVIEW_JOURNAL_DIR', os.path.join(os.getcwd(), ".interview_journal"))
+
+class AnswerJournal:
+    """Journal of one interview. Assumes a single session writes it at a time."""
+
+    def __init__(self, interview_id: str, journal_dir: Optional[str] = JOURNAL_DIR):
+        self.interview_id = str(interview_id)
+        safe_id = "".join(c if c.isalnum() or c in "-_" else "_" for c in self.interview_id)
+        self.path = os.path.join(journal_dir, f"{safe_id}.jsonl") if journal_dir else None
+
+    def load(self) -> Dict[str, Any]:
+        """
+        Read the journal.
+
+        Returns:
+            dict: journal_id and header text (None if nothing was journaled yet), the
+            answer records in order, whether the interview was completed, and the
+            transcript size in bytes
+        """
+        state = {"journal_id": None, "header": None, "interview_date": None, "answers": [],
+                 "complete": False, "size": 0}
+        if self.path is None or not os.path.exists(self.path):
+            return state
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A line cut short by a crash; it was never acknowledged
+                    logger.warning(f"Ignoring incomplete line in journal {self.path}")
+                    continue
+                if record.get("type") == "header":
+                    state.update(journal_id=record["journal_id"], header=record["text"],
+                                 interview_date=record.get("interview_date"), size=len(record["text"].encode("utf-8")))
+                elif record.get("type") == "answer":
+                    state["answers"].append(record)
+                    state["size"] = record["offset"] + len(record["text"].encode("utf-8"))
+                elif record.get("type") == "complete":
+                    state["complete"] = True
+        return state
+
+    def start(self, state: Dict[str, Any], header_text: str, interview_date: Optional[str] = None) -> Dict[str, Any]:
+        """Begin the journal with the transcript header, updating the state from load() in
+        place. Returns the header record, whose journal_id identifies this take of the interview."""
+        record = {"type": "header", "journal_id": uuid.uuid4().hex, "interview_id": self.interview_id,
+                  "interview_date": interview_date, "text": header_text, "offset": 0, "created_at": time.time()}
+        self._append(record)
+        state.update(journal_id=record["journal_id"], header=header_text, interview_date=interview_date,
+                     size=len(header_text.encode("utf-8")))
+        return record
+
+    def append_answer(self, state: Dict[str, Any], question_number: int, question: str, answer: str,
+                      text: str) -> Dict[str, Any]:
+        """
+        Journal one answer and its transcript block.
+
+        Args:
+            state (dict): The journal state from load(); updated in place
+            question_number (int): Number of the question answered
+            question (str): The question text
+            answer (str): The candidate's answer
+            text (str): Transcript block for this answer
+
+        Returns:
+            dict: The answer record, including the block's byte offset in the transcript
+        """
+        record = {"type": "answer", "question_number": question_number, "question": question,
+                  "answer": answer, "text": text, "offset": state["size"], "created_at": time.time()}
+        self._append(record)
+        state["answers"].append(record)
+        state["size"] += len(text.encode("utf-8"))
+        return record
+
+    def rewrite(self, state: Dict[str, Any]) -> None:
+        """Replace the journal with the records in a state from load(), e.g. one restored from
+        the session store after another replica moved the interview on."""
+        if self.path is None or state["journal_id"] is None:
+            return
+        header = {"type": "header", "journal_id": state["journal_id"], "interview_id": self.interview_id,
+                  "interview_date": state["interview_date"], "text": state["header"], "offset": 0,
+                  "created_at": time.time()}
+        records = [header] + state["answers"]
+        if state["complete"]:
+            records.append({"type": "complete", "completed_at": time.time()})
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(b"".join(json.dumps(record).encode("utf-8") + b"\n" for record in records))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+
+    def mark_complete(self) -> None:
+        self._append({"type": "complete", "completed_at": time.time()})
+
+    def archive(self) -> Optional[str]:
+        """Move the journal aside so the interview can be taken again. Returns the new path."""
+        if self.path is None or not os.path.exists(self.path):
+            return None
+        archived_path = f"{self.path[:-len('.jsonl')]}.{int(time.time())}.jsonl"
+        os.replace(self.path, archived_path)
+        return archived_path
+
+    @staticmethod
+    def transcript(state: Dict[str, Any]) -> str:
+        """Build the full transcript from a loaded journal."""
+        return (state["header"] or "") + "".join(record["text"] for record in state["answers"])
+
+    @staticmethod
+    def responses(state: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Return the journaled answers in the interview data's response format."""
+        return [{"question": record["question"], "answer": record["answer"],
+                 "question_number": record["question_number"]} for record in state["answers"]]
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        if self.path is None:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a+b") as f:
+            line = json.dumps(record).encode("utf-8") + b"\n"
+            if f.tell() > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    # Terminate a line cut short by a crash so this record stays readable
+                    line = b"\n" + line
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
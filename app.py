@@ -2,11 +2,52 @@ import streamlit as st
 import random
 import time
 import json
-import requests
 import os
 from datetime import datetime
 import re
-from azure.storage.blob import BlobServiceClient
+from azure.core.exceptions import ResourceNotFoundError
+from azure.storage.blob import BlobServiceClient, BlobType
+from nocodb_client import NocoDBClient, NocoDBError, INTERVIEWS_TABLE
+from deadlines import DeadlineExceeded, deadline_scope, call_timeout
+from completion_outbox import CompletionOutbox
+from answer_journal import AnswerJournal, JOURNAL_DIR
+from session_store import SessionConflict, create_session_store
+
+# Time budgets (seconds) for the API calls made while loading the page and for manual
+# saves from the sidebar, so a hung connection can't freeze a candidate's session. Each
+# call's own timeout is capped to the time left (see deadlines.py). Completion side
+# effects run in the background under the outbox's own per-attempt budget.
+PAGE_LOAD_DEADLINE_SECONDS = 10
+MANUAL_SAVE_DEADLINE_SECONDS = 30
+AZURE_CONNECT_TIMEOUT = 10
+AZURE_READ_TIMEOUT = 60
+
+# Once an interview is complete, the answers blob is checked against the journal after this
+# long (appends normally land within seconds) and rebuilt from it if blocks are missing.
+# Azure limits a single appended block to 4 MiB.
+ANSWERS_BLOB_CHECK_DELAY_SECONDS = 60
+APPEND_BLOCK_MAX_BYTES = 4 * 1024 * 1024
+
+# Production mode (INTERVIEW_APP_MODE=production) drops the Dev Debug sidebar and every
+# diagnostic sidebar message, which candidates should never see
+PRODUCTION_MODE = os.environ.get('INTERVIEW_APP_MODE', 'development').lower() == 'production'
+
+# Questions are streamed a chunk of words at a time with this delay between chunks;
+# a delay of 0 shows each question at once
+STREAM_CHUNK_WORDS = max(1, int(os.environ.get('INTERVIEW_STREAM_CHUNK_WORDS', '3')))
+STREAM_CHUNK_DELAY_SECONDS = float(os.environ.get('INTERVIEW_STREAM_CHUNK_DELAY', '0.05'))
+
+# Interview records are cached per interview ID for this long, so sessions opened from
+# the same link, and reruns of one session, share a single NocoDB fetch
+INTERVIEW_CACHE_TTL_SECONDS = 300
+
+# Stand-in for st.sidebar in production mode: every call is a no-op that returns None,
+# so debug messages cost nothing and debug buttons never fire
+class NoOpSidebar:
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+debug_sidebar = NoOpSidebar() if PRODUCTION_MODE else st.sidebar
 
 try:
     # Get the Azure Storage settings from secrets.toml
@@ -15,65 +56,147 @@ try:
     AZURE_CONTAINER_NAME = st.secrets.get("azure", {}).get("container_name", "landing")
     
     # Log the configuration (without exposing the full key)
-    st.sidebar.write(f"Azure Storage Account: {AZURE_STORAGE_ACCOUNT_NAME}")
-    st.sidebar.write(f"Azure Container: {AZURE_CONTAINER_NAME}")
-    st.sidebar.write(f"Azure Key: {AZURE_STORAGE_ACCOUNT_KEY[:5]}..." if AZURE_STORAGE_ACCOUNT_KEY else "No key found")
+    debug_sidebar.write(f"Azure Storage Account: {AZURE_STORAGE_ACCOUNT_NAME}")
+    debug_sidebar.write(f"Azure Container: {AZURE_CONTAINER_NAME}")
+    debug_sidebar.write(f"Azure Key: {AZURE_STORAGE_ACCOUNT_KEY[:5]}..." if AZURE_STORAGE_ACCOUNT_KEY else "No key found")
 except Exception as e:
-    st.sidebar.error(f"Error loading Azure Storage configuration: {str(e)}")
+    debug_sidebar.error(f"Error loading Azure Storage configuration: {str(e)}")
     # Set defaults if secrets are not available
     AZURE_STORAGE_ACCOUNT_NAME = None
     AZURE_STORAGE_ACCOUNT_KEY = None
     AZURE_CONTAINER_NAME = "landing"
 
+# Function to build the path of an interview's answers file, relative to the role folder root
+def get_answers_path(interview_data):
+    # Use the formatted role name that's now guaranteed to exist
+    role_path = interview_data['formatted_role_name']
+    
+    # Get CV filename (if available) or use candidate name
+    cv_filename = interview_data.get('cv_filename')
+    if cv_filename:
+        # Use CV filename as the base for the answer file
+        base_filename = cv_filename.split('.')[0] + '_answers.txt'
+    else:
+        # Fall back to candidate name if CV filename not available
+        sanitized_candidate_name = interview_data['candidate_name'].replace(' ', '_')
+        base_filename = f"{sanitized_candidate_name}_answers.txt"
+    
+    # roles/roleid_rolename/answers/<cv_name>_answers.txt, the same pattern as download_and_upload_cvs.py
+    return f"roles/{role_path}/answers/{base_filename}"
+
+# Function to render the header of the answers file
+def render_interview_header(interview_data):
+    content = f"Interview with {interview_data['candidate_name']} for {interview_data['role_name']}\n"
+    content += f"Date: {interview_data['interview_date']}\n"
+    content += f"Interview ID: {interview_data['interview_id']}\n\n"
+    return content
+
+# Function to render one question and answer of the answers file
+def render_answer_block(number, response):
+    content = f"Question {number}: {response['question']}\n\n"
+    content += f"Answer: {response['answer']}\n\n"
+    content += "-" * 80 + "\n\n"
+    return content
+
+# Function to render interview responses as the text saved to file and blob storage
+def render_interview_responses(interview_data):
+    content = render_interview_header(interview_data)
+    for i, response in enumerate(interview_data['responses'], 1):
+        content += render_answer_block(i, response)
+    return content
+
+# Function to get a blob client for a path in the container; raises if storage isn't configured
+def get_blob_client(blob_filename):
+    # Check if Azure Storage credentials are available
+    if not AZURE_STORAGE_ACCOUNT_NAME or not AZURE_STORAGE_ACCOUNT_KEY:
+        raise Exception("Azure Storage credentials not available. Check your secrets.toml file.")
+    
+    # Connect to blob storage using credentials from secrets.toml
+    account_url = f"https://{AZURE_STORAGE_ACCOUNT_NAME}.blob.core.windows.net"
+    blob_service_client = BlobServiceClient(account_url=account_url, credential=AZURE_STORAGE_ACCOUNT_KEY,
+                                            connection_timeout=AZURE_CONNECT_TIMEOUT,
+                                            read_timeout=call_timeout(AZURE_READ_TIMEOUT))
+    
+    # Get container client
+    container_client = blob_service_client.get_container_client(AZURE_CONTAINER_NAME)
+    return container_client.get_blob_client(blob_filename)
+
+# Function to upload text to Azure Blob Storage; raises on failure
+def upload_text_to_blob(blob_filename, content):
+    # Upload the content to blob storage; overwriting makes retries safe
+    blob_client = get_blob_client(blob_filename)
+    blob_client.upload_blob(content, overwrite=True, timeout=max(1, int(call_timeout(AZURE_READ_TIMEOUT))))
+    return blob_filename
+
+# Function to append one journaled block of the answers file to its append blob; raises on failure.
+# The block's offset is the expected append position, so a retried append is never written twice
+# and a block whose predecessors haven't landed yet fails and is retried after them.
+def append_text_to_blob(blob_filename, journal_id, offset, content):
+    blob_client = get_blob_client(blob_filename)
+    data = content.encode("utf-8")
+    try:
+        properties = blob_client.get_blob_properties(timeout=max(1, int(call_timeout(AZURE_READ_TIMEOUT))))
+    except ResourceNotFoundError:
+        properties = None
+    
+    if (properties is None or properties.blob_type != BlobType.APPENDBLOB
+            or properties.metadata.get("journal_id") != journal_id):
+        if offset != 0:
+            raise Exception(f"Append blob for journal {journal_id} not created yet")
+        # The header block starts this take's blob, replacing any earlier answers file
+        blob_client.create_append_blob(metadata={"journal_id": journal_id},
+                                       timeout=max(1, int(call_timeout(AZURE_READ_TIMEOUT))))
+        size = 0
+    else:
+        size = properties.size
+    
+    if size >= offset + len(data):
+        # Appended by an earlier attempt
+        return blob_filename
+    if size != offset:
+        raise Exception(f"Append blob has {size} bytes, waiting for earlier blocks before offset {offset}")
+    blob_client.append_block(data, appendpos_condition=offset, timeout=max(1, int(call_timeout(AZURE_READ_TIMEOUT))))
+    return blob_filename
+
+# Function to make sure a completed interview's answers blob holds the whole transcript; raises on failure.
+# An append that ran out of attempts leaves every later block waiting for it, so a short blob
+# is rebuilt from the journal. Appends still pending then find their block already there.
+def check_answers_blob(blob_filename, journal_id, content):
+    blob_client = get_blob_client(blob_filename)
+    data = content.encode("utf-8")
+    try:
+        properties = blob_client.get_blob_properties(timeout=max(1, int(call_timeout(AZURE_READ_TIMEOUT))))
+    except ResourceNotFoundError:
+        properties = None
+    
+    if properties is not None and properties.blob_type == BlobType.APPENDBLOB:
+        if properties.metadata.get("journal_id") != journal_id:
+            # A later take of the interview owns the blob now
+            return blob_filename
+        if properties.size >= len(data):
+            return blob_filename
+    
+    blob_client.create_append_blob(metadata={"journal_id": journal_id},
+                                   timeout=max(1, int(call_timeout(AZURE_READ_TIMEOUT))))
+    for start in range(0, len(data), APPEND_BLOCK_MAX_BYTES):
+        blob_client.append_block(data[start:start + APPEND_BLOCK_MAX_BYTES], appendpos_condition=start,
+                                 timeout=max(1, int(call_timeout(AZURE_READ_TIMEOUT))))
+    return blob_filename
+
+# Function to write a text file atomically, so a retried or interrupted write never leaves a partial file
+def write_text_file(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as file:
+        file.write(content)
+    os.replace(tmp_path, path)
+    return path
+
 # Function to save interview responses to Azure Blob Storage
 def save_to_blob_storage(interview_data):
     try:
-        # Use the formatted role name that's now guaranteed to exist
-        role_path = interview_data['formatted_role_name']
-        st.sidebar.info(f"Using role path: {role_path}")
-        
-        # Get CV filename (if available) or use candidate name
-        cv_filename = interview_data.get('cv_filename')
-        if cv_filename:
-            # Use CV filename as the base for the answer file
-            base_filename = cv_filename.split('.')[0] + '_answers.txt'
-        else:
-            # Fall back to candidate name if CV filename not available
-            sanitized_candidate_name = interview_data['candidate_name'].replace(' ', '_')
-            base_filename = f"{sanitized_candidate_name}_answers.txt"
-        
-        # Create blob path with roles/roleid_rolename/answers/<cv_name>_answers.txt structure
-        blob_filename = f"roles/{role_path}/answers/{base_filename}"
-        
-        # Generate the content to be saved
-        content = ""
-        # Write header information
-        content += f"Interview with {interview_data['candidate_name']} for {interview_data['role_name']}\n"
-        content += f"Date: {interview_data['interview_date']}\n"
-        content += f"Interview ID: {interview_data['interview_id']}\n\n"
-        
-        # Write each question and answer
-        for i, response in enumerate(interview_data['responses'], 1):
-            content += f"Question {i}: {response['question']}\n\n"
-            content += f"Answer: {response['answer']}\n\n"
-            content += "-" * 80 + "\n\n"
-        
-        # Check if Azure Storage credentials are available
-        if not AZURE_STORAGE_ACCOUNT_NAME or not AZURE_STORAGE_ACCOUNT_KEY:
-            raise Exception("Azure Storage credentials not available. Check your secrets.toml file.")
-            
-        # Connect to blob storage using credentials from secrets.toml
-        account_url = f"https://{AZURE_STORAGE_ACCOUNT_NAME}.blob.core.windows.net"
-        blob_service_client = BlobServiceClient(account_url=account_url, credential=AZURE_STORAGE_ACCOUNT_KEY)
-        
-        # Get container client
-        container_client = blob_service_client.get_container_client(AZURE_CONTAINER_NAME)
-        
-        # Upload the content to blob storage
-        blob_client = container_client.get_blob_client(blob_filename)
-        blob_client.upload_blob(content, overwrite=True)
-        
-        return blob_filename
+        debug_sidebar.info(f"Using role path: {interview_data['formatted_role_name']}")
+        return upload_text_to_blob(get_answers_path(interview_data), render_interview_responses(interview_data))
     except Exception as e:
         st.error(f"Error saving to blob storage: {str(e)}")
         return None
@@ -81,133 +204,119 @@ def save_to_blob_storage(interview_data):
 # Function to save interview responses to a text file
 def save_interview_responses(interview_data):
     try:
-        # Use the formatted role name that's now guaranteed to exist
         role_path = interview_data['formatted_role_name']
-        st.sidebar.info(f"Using role path for local file: {role_path}")
-        
-        # Get CV filename (if available) or use candidate name
-        cv_filename = interview_data.get('cv_filename')
-        if cv_filename:
-            # Use CV filename as the base for the answer file
-            base_filename = cv_filename.split('.')[0] + '_answers.txt'
-        else:
-            # Fall back to candidate name if CV filename not available
-            sanitized_candidate_name = interview_data['candidate_name'].replace(' ', '_')
-            base_filename = f"{sanitized_candidate_name}_answers.txt"
-        
-        # Create directory structure with the same pattern as download_and_upload_cvs.py
-        dir_path = f"roles/{role_path}/answers"
-        os.makedirs(dir_path, exist_ok=True)
-        
-        # Create full file path
-        filename = f"{dir_path}/{base_filename}"
+        debug_sidebar.info(f"Using role path for local file: {role_path}")
         
         # Write responses to the text file
-        with open(filename, "w") as file:
-            # Write header information
-            file.write(f"Interview with {interview_data['candidate_name']} for {interview_data['role_name']}\n")
-            file.write(f"Date: {interview_data['interview_date']}\n")
-            file.write(f"Interview ID: {interview_data['interview_id']}\n\n")
-            
-            # Write each question and answer
-            for i, response in enumerate(interview_data['responses'], 1):
-                file.write(f"Question {i}: {response['question']}\n\n")
-                file.write(f"Answer: {response['answer']}\n\n")
-                file.write("-" * 80 + "\n\n")
+        filename = write_text_file(get_answers_path(interview_data), render_interview_responses(interview_data))
         
         # Log details about the file storage
-        st.sidebar.info(f"Saving responses with CV: {cv_filename or 'None'}")
-        st.sidebar.info(f"Using directory structure: roles/{role_path}/answers/")
+        debug_sidebar.info(f"Saving responses with CV: {interview_data.get('cv_filename') or 'None'}")
+        debug_sidebar.info(f"Using directory structure: roles/{role_path}/answers/")
         
         # Also save to Azure Blob Storage
         blob_path = save_to_blob_storage(interview_data)
         if blob_path:
-            st.sidebar.success(f"✓ Responses saved to Azure Blob Storage: {blob_path}")
+            debug_sidebar.success(f"✓ Responses saved to Azure Blob Storage: {blob_path}")
         
         return filename
     except Exception as e:
         st.error(f"Error saving responses: {str(e)}")
         return None
 
-
-    
 # Streamed response emulator
 def response_generator(response_text):
-    for word in response_text.split():
-        yield word + " "
-        time.sleep(0.05)
+    if STREAM_CHUNK_DELAY_SECONDS <= 0:
+        yield response_text
+        return
+    words = response_text.split()
+    for i in range(0, len(words), STREAM_CHUNK_WORDS):
+        yield " ".join(words[i:i + STREAM_CHUNK_WORDS]) + " "
+        time.sleep(STREAM_CHUNK_DELAY_SECONDS)
 
-# API configuration
-BASE_API_URL = "http://20.254.105.163:8080/api/v2"
-INTERVIEW_TABLE = "mpims4p3zrwsarx"
-INTERVIEW_URL = f"{BASE_API_URL}/tables/{INTERVIEW_TABLE}/records"
+# API configuration: one pooled NocoDB client, shared across reruns and sessions
+# (see nocodb_client.py for the NOCODB_* settings; API_TOKEN is still honoured)
+@st.cache_resource
+def get_nocodb_client():
+    return NocoDBClient()
 
-# Handle token configuration with fallback
-try:
-    # Try to get token from Streamlit secrets
-    import os
-    API_TOKEN = os.environ.get("API_TOKEN", "EgEls5yPpzOqhGdtL1CDcZkNolXhQhIFfwd4DIe0")  # Default token from example
-except Exception as e:
-    # Fallback to environment variable or hardcoded token for development
-    print(f"Error accessing environment variables: {e}")
-    
+nocodb = get_nocodb_client()
+
+# Side effects (answer blocks appended to the answers blob, and on completion the status update
+# and answers file) go through a durable local outbox and run on background workers with
+# retries (see completion_outbox.py), so neither answering nor completing waits on NocoDB or
+# Azure. One outbox and its workers per process.
+@st.cache_resource
+def get_completion_outbox():
+    outbox = CompletionOutbox()
+    outbox.register("interview_update", lambda payload: nocodb.update_records(INTERVIEWS_TABLE, payload["record"]))
+    outbox.register("answers_file", lambda payload: write_text_file(payload["path"], payload["content"]))
+    outbox.register("answers_append", lambda payload: append_text_to_blob(
+        payload["blob_path"], payload["journal_id"], payload["offset"], payload["content"]))
+    outbox.register("answers_blob_check", lambda payload: check_answers_blob(
+        payload["blob_path"], payload["journal_id"], payload["content"]))
+    # Whole-file uploads are no longer queued; kept for entries queued by earlier versions
+    outbox.register("answers_blob", lambda payload: upload_text_to_blob(payload["blob_path"], payload["content"]))
+    outbox.start()
+    return outbox
+
+completion_outbox = get_completion_outbox()
 
-HEADERS = {
-    'accept': 'application/json',
-    'xc-token': API_TOKEN,
-    'Content-Type': 'application/json'
-}
+# Function to fetch the interview record (questions and role name) from the API
+@st.cache_data(ttl=INTERVIEW_CACHE_TTL_SECONDS, show_spinner=False)
+def fetch_interview_record(interview_id):
+    # Errors are raised rather than returned, so failed fetches are not cached
+    data = nocodb.list_records(INTERVIEWS_TABLE, {'fields': 'Questions,Role Name',
+                                                  'where': f"(Id,eq,{interview_id})", 'limit': 1})
+    records = (data or {}).get('list') or []
+    return records[0] if records else None
 
 # Function to fetch questions from the API
 def fetch_interview_questions(interview_id):
     try:
-        # Construct the API URL with query parameters
-        questions_url = f"{INTERVIEW_URL}?fields=Questions&where=(Id,eq,{interview_id})&limit=25&shuffle=0&offset=0"
+        debug_sidebar.write(f"Fetching questions from API...")
+        
+        # Get the interview record, shared with the role name lookup
+        try:
+            interview_record = fetch_interview_record(interview_id)
+        except NocoDBError as e:
+            debug_sidebar.error(f"Failed to fetch questions. Status code: {e.status_code}")
+            debug_sidebar.error(f"Error response: {e.text}")
+            return get_default_questions()
+        except DeadlineExceeded as e:
+            debug_sidebar.error(f"Timed out fetching questions: {str(e)}")
+            return get_default_questions()
         
-        st.sidebar.write(f"Fetching questions from API...")
-        st.sidebar.code(questions_url)
+        # Check if we got a record back
+        if interview_record is None:
+            debug_sidebar.warning("No interview data found. Using default questions.")
+            return get_default_questions()
         
-        # Send the GET request
-        response = requests.get(questions_url, headers=HEADERS)
+        debug_sidebar.success("✓ Questions fetched successfully")
+        questions_text = interview_record.get('Questions', '')
         
-        if response.status_code == 200:
-            data = response.json()
-            st.sidebar.success("✓ Questions fetched successfully")
-            
-            # Check if we got any records back
-            if data and 'list' in data and len(data['list']) > 0:
-                # Extract the Questions field from the first record
-                questions_text = data['list'][0].get('Questions', '')
-                
-                if not questions_text:
-                    st.sidebar.warning("No questions found in response. Using default questions.")
-                    return get_default_questions()
-                
-                # Parse the numbered list of questions
-                # Split the text by newlines first, then extract question text
-                questions_list = []
-                for line in questions_text.split('\n'):
-                    # Use regex to match numbered questions (e.g., "1. Question text")
-                    match = re.match(r'^\s*\d+\.\s*(.*\S)\s*$', line)
-                    if match:
-                        # Add the question text to our list
-                        questions_list.append(match.group(1))
-                
-                if not questions_list:
-                    st.sidebar.warning("Failed to parse questions. Using default questions.")
-                    return get_default_questions()
-                
-                st.sidebar.write(f"Found {len(questions_list)} questions")
-                return questions_list
-            else:
-                st.sidebar.warning("No interview data found. Using default questions.")
-                return get_default_questions()
-        else:
-            st.sidebar.error(f"Failed to fetch questions. Status code: {response.status_code}")
-            st.sidebar.error(f"Error response: {response.text}")
+        if not questions_text:
+            debug_sidebar.warning("No questions found in response. Using default questions.")
+            return get_default_questions()
+        
+        # Parse the numbered list of questions
+        # Split the text by newlines first, then extract question text
+        questions_list = []
+        for line in questions_text.split('\n'):
+            # Use regex to match numbered questions (e.g., "1. Question text")
+            match = re.match(r'^\s*\d+\.\s*(.*\S)\s*$', line)
+            if match:
+                # Add the question text to our list
+                questions_list.append(match.group(1))
+        
+        if not questions_list:
+            debug_sidebar.warning("Failed to parse questions. Using default questions.")
             return get_default_questions()
+        
+        debug_sidebar.write(f"Found {len(questions_list)} questions")
+        return questions_list
     except Exception as e:
-        st.sidebar.error(f"Error fetching questions: {str(e)}")
+        debug_sidebar.error(f"Error fetching questions: {str(e)}")
         return get_default_questions()
 
 # Default questions as fallback
@@ -225,39 +334,100 @@ def get_default_questions():
 role_name = st.query_params.get("role", "Unknown Role")
 candidate_name = st.query_params.get("candidate", "Unknown User")
 interview_id = st.query_params.get("interview_id", "1")  # Default to ID 1 if not provided
+# Progress (session store and answer journal) is keyed by interview ID, so it is only kept for
+# links that carry one; otherwise every visitor would share and resume the default ID's progress
+persist_progress = "interview_id" in st.query_params
 cv_filename = st.query_params.get("cv")  # Get CV filename parameter, None if not provided
 formatted_role_name = st.query_params.get("role_path")  # Get formatted role name directly from URL
 
 # If we don't have formatted_role_name from URL, try to fetch it from the API
 if not formatted_role_name and interview_id and interview_id != "1":
     try:
-        # Construct the API URL to get interview details
-        interview_url = f"http://20.254.105.163:8080/api/v2/tables/mpims4p3zrwsarx/records?where=(Id,eq,{interview_id})"
-        
-        # API Token
-        TOKEN = os.environ.get("API_TOKEN", "EgEls5yPpzOqhGdtL1CDcZkNolXhQhIFfwd4DIe0")
-        
-        # Make the API request
-        headers = {
-            'accept': 'application/json',
-            'xc-token': TOKEN
-        }
-        
-        response = requests.get(interview_url, headers=headers)
-        if response.status_code == 200:
-            data = response.json()
-            if data and 'list' in data and len(data['list']) > 0:
-                interview_data = data['list'][0]
-                # Get the formatted role name from the API
-                formatted_role_name = interview_data.get("Role Name")
-                st.sidebar.info(f"Fetched formatted role name from API: {formatted_role_name}")
+        # Get the interview details (cached, and shared with the question fetch)
+        with deadline_scope(PAGE_LOAD_DEADLINE_SECONDS, "role name lookup"):
+            interview_record = fetch_interview_record(interview_id)
+        if interview_record:
+            # Get the formatted role name from the API
+            formatted_role_name = interview_record.get("Role Name")
+            debug_sidebar.info(f"Fetched formatted role name from API: {formatted_role_name}")
     except Exception as e:
-        st.sidebar.error(f"Error fetching interview data: {str(e)}")
+        debug_sidebar.error(f"Error fetching interview data: {str(e)}")
 
 # If we still don't have formatted_role_name, create a simple fallback
 if not formatted_role_name:
     formatted_role_name = f"0_{role_name.replace(' ', '_')}"
-    st.sidebar.info(f"Using fallback formatted role name: {formatted_role_name}")
+    debug_sidebar.info(f"Using fallback formatted role name: {formatted_role_name}")
+
+# Function to open this interview's answer journal; kept in memory only without an interview ID
+def get_answer_journal():
+    return AnswerJournal(interview_id, JOURNAL_DIR if persist_progress else None)
+
+# Interview progress is also kept in the session store (see session_store.py), keyed by
+# interview ID, so a candidate reconnecting to a replica that shares the store resumes where
+# they left off. The store is the source of truth: a restored session rewrites this replica's
+# answer journal, and the journal is only resumed from when the store has no session.
+SESSION_STATE_KEYS = ("interview_data", "messages", "interview_questions", "question_index",
+                      "interview_complete", "journal_state", "outbox_keys", "greeted")
+
+@st.cache_resource
+def get_session_store():
+    return create_session_store()
+
+session_store = get_session_store()
+
+# Function to restore this browser session from a stored session
+def restore_session(stored):
+    for key in SESSION_STATE_KEYS:
+        if key in stored["state"]:
+            st.session_state[key] = stored["state"][key]
+    st.session_state.session_version = stored["version"]
+    if "journal_state" in stored["state"]:
+        try:
+            get_answer_journal().rewrite(st.session_state.journal_state)
+        except Exception as e:
+            debug_sidebar.error(f"Error rewriting answer journal: {str(e)}")
+
+# Function to save this browser session to the session store
+def save_session():
+    if not persist_progress:
+        return
+    state = {key: st.session_state[key] for key in SESSION_STATE_KEYS if key in st.session_state}
+    try:
+        st.session_state.session_version = session_store.save(interview_id, state,
+                                                               st.session_state.session_version)
+    except SessionConflict as e:
+        # Another tab or replica saved first; the next answer picks up its progress
+        debug_sidebar.warning(f"Session changed elsewhere: {str(e)}")
+    except Exception as e:
+        debug_sidebar.error(f"Error saving session: {str(e)}")
+
+# Function to pick up progress another tab or replica saved; returns True if there was any
+def reload_session_if_stale():
+    if not persist_progress:
+        return False
+    try:
+        if session_store.version(interview_id) == st.session_state.session_version:
+            return False
+        stored = session_store.load(interview_id)
+    except Exception as e:
+        debug_sidebar.error(f"Error checking session store: {str(e)}")
+        return False
+    if stored is None:
+        return False
+    restore_session(stored)
+    return True
+
+# Resume an unfinished interview from the session store in a new browser session
+stored_session = None
+if persist_progress and "interview_data" not in st.session_state:
+    try:
+        stored_session = session_store.load(interview_id)
+    except Exception as e:
+        debug_sidebar.error(f"Error loading session: {str(e)}")
+        stored_session = None
+    if stored_session and not stored_session["state"].get("interview_complete"):
+        restore_session(stored_session)
+        debug_sidebar.info(f"Resumed interview at question {st.session_state.question_index}")
 
 # Initialize interview data structure
 if "interview_data" not in st.session_state:
@@ -273,23 +443,28 @@ if "interview_data" not in st.session_state:
 
 st.title(f"{candidate_name} | {role_name} Interview")
 
+# The greeting template is read from disk once per process
+@st.cache_resource
+def load_greeting_template():
+    with open("greeting_text.txt", "r") as file:
+        return file.read()
+
 # Function to load greeting text from file with parameter interpolation
 def load_greeting_text(candidate_name, role_name):
     try:
-        with open("greeting_text.txt", "r") as file:
-            greeting_template = file.read()
-            # Create a context dictionary with all the variables that can be interpolated
-            context = {
-                "candidate_name": candidate_name,
-                "role_name": role_name,
-                "interview_date": datetime.now().strftime("%Y-%m-%d"),
-                "formatted_role_name": formatted_role_name
-            }
-            # Use str.format_map to interpolate variables from the dictionary
-            greeting = greeting_template.format_map(context)
-            return greeting
+        greeting_template = load_greeting_template()
+        # Create a context dictionary with all the variables that can be interpolated
+        context = {
+            "candidate_name": candidate_name,
+            "role_name": role_name,
+            "interview_date": datetime.now().strftime("%Y-%m-%d"),
+            "formatted_role_name": formatted_role_name
+        }
+        # Use str.format_map to interpolate variables from the dictionary
+        greeting = greeting_template.format_map(context)
+        return greeting
     except Exception as e:
-        st.sidebar.error(f"Error loading greeting text: {str(e)}")
+        debug_sidebar.error(f"Error loading greeting text: {str(e)}")
         # Fallback greeting if file cannot be read
         return f"Good morning, {candidate_name}! Welcome to The Candidate's interview platform!"
 
@@ -302,20 +477,74 @@ if "messages" not in st.session_state:
         {"role": "assistant", "content": greeting}
     ]
     # Fetch questions from API
-    st.session_state.interview_questions = fetch_interview_questions(interview_id)
+    with deadline_scope(PAGE_LOAD_DEADLINE_SECONDS, "question fetch"):
+        st.session_state.interview_questions = fetch_interview_questions(interview_id)
     st.session_state.question_index = 0
     st.session_state.interview_complete = False
+    
+    # Every answer is journaled as it is submitted (see answer_journal.py); pick up where an
+    # interrupted session for this interview left off
+    journal = get_answer_journal()
+    journal_state = journal.load()
+    if journal_state["complete"] or stored_session is not None:
+        # A completed interview opened again starts a fresh take. An unfinished stored
+        # session was restored above, so one still here is complete, and this journal is
+        # an earlier take another replica finished.
+        journal.archive()
+        journal_state = journal.load()
+    elif journal_state["answers"]:
+        st.session_state.interview_data["responses"] = AnswerJournal.responses(journal_state)
+        st.session_state.interview_data["interview_date"] = (journal_state["interview_date"]
+                                                             or st.session_state.interview_data["interview_date"])
+        for response in st.session_state.interview_data["responses"]:
+            st.session_state.messages.append({"role": "assistant", "content": response["question"]})
+            st.session_state.messages.append({"role": "user", "content": response["answer"]})
+        # Continue with the question after the last one answered
+        st.session_state.question_index = st.session_state.interview_data["responses"][-1]["question_number"]
+        debug_sidebar.info(f"Resumed interview with {len(journal_state['answers'])} saved answers")
+    st.session_state.journal_state = journal_state
+    st.session_state.outbox_keys = []
+    # A new take replaces any stored session for this interview
+    st.session_state.session_version = None
+
+# Function to queue a journaled block of the answers file for the append blob
+def queue_answer_block(record):
+    journal_id = st.session_state.journal_state["journal_id"]
+    key = f"{interview_id}:{journal_id}:append:{record['offset']}"
+    completion_outbox.enqueue(key, "answers_append", {
+        "blob_path": get_answers_path(st.session_state.interview_data),
+        "journal_id": journal_id,
+        "offset": record["offset"],
+        "content": record["text"]
+    })
+    st.session_state.outbox_keys.append(key)
 
-# Display chat messages from history on app rerun
-for message in st.session_state.messages:
-    with st.chat_message(message["role"]):
-        st.markdown(message["content"])
+# Function to start the answer journal with the answers file header
+def start_answer_journal():
+    journal_state = st.session_state.journal_state
+    if journal_state["journal_id"] is None:
+        interview_data = st.session_state.interview_data
+        record = get_answer_journal().start(journal_state, render_interview_header(interview_data),
+                                                   interview_data["interview_date"])
+        queue_answer_block(record)
+    return journal_state
+
+# Function to durably record an answer as soon as it is submitted
+def record_answer(response):
+    try:
+        journal_state = start_answer_journal()
+        record = get_answer_journal().append_answer(
+            journal_state, response["question_number"], response["question"], response["answer"],
+            render_answer_block(len(journal_state["answers"]) + 1, response))
+        queue_answer_block(record)
+    except Exception as e:
+        debug_sidebar.error(f"Error saving answer: {str(e)}")
 
 # Function to update interview status and rank
 def update_interview_status():
     try:
         # Log what we're doing
-        st.sidebar.write("Updating interview status to Complete...")
+        debug_sidebar.write("Submitting interview...")
         
         # Generate a random interview rank between 1 and 5
         interview_rank = random.randint(1, 5)
@@ -336,37 +565,45 @@ def update_interview_status():
             "CV Name": st.session_state.interview_data.get("cv_filename")  # Include CV filename in API update
         }
         
-        st.sidebar.write("Sending PATCH request:")
-        st.sidebar.code(json.dumps(update_payload, indent=2))
-        
-        # Send the PATCH request
-        patch_response = requests.patch(INTERVIEW_URL, headers=HEADERS, json=update_payload)
-        
-        if patch_response.status_code == 200:
-            st.sidebar.success(f"✓ Interview status updated to Complete with rank {interview_rank}")
-            st.sidebar.success(f"✓ Interview answers submitted to API")
-            
-            # Save all responses to a text file when interview completes
-            file_path = save_interview_responses(st.session_state.interview_data)
-            if file_path:
-                st.sidebar.success(f"✓ All responses saved to: {file_path}")
-                st.session_state.interview_data["final_file_path"] = file_path
-            
-            return True
-        else:
-            st.sidebar.error(f"✗ Failed to update status. Status code: {patch_response.status_code}")
-            st.sidebar.error(f"Error response: {patch_response.text}")
-            return False
+        debug_sidebar.write("Queueing PATCH request:")
+        debug_sidebar.code(json.dumps(update_payload, indent=2))
+        
+        # The journal ID of this take keys the outbox entries, so reruns never queue the
+        # same work twice while a retaken interview is still saved again. The answers blob
+        # already holds every block queued so far; the local answers file is built from the
+        # journal, and a delayed check rebuilds the blob from it if an append gave up.
+        journal_state = start_answer_journal()
+        submission_id = journal_state["journal_id"]
+        answers_path = get_answers_path(st.session_state.interview_data)
+        transcript = AnswerJournal.transcript(journal_state)
+        outbox_keys = [f"{interview_id}:{submission_id}:{kind}"
+                       for kind in ("interview_update", "answers_file", "answers_blob_check")]
+        completion_outbox.enqueue(outbox_keys[0], "interview_update", {"record": update_payload})
+        completion_outbox.enqueue(outbox_keys[1], "answers_file", {"path": answers_path, "content": transcript})
+        completion_outbox.enqueue(outbox_keys[2], "answers_blob_check", {
+            "blob_path": answers_path,
+            "journal_id": submission_id,
+            "content": transcript
+        }, delay=ANSWERS_BLOB_CHECK_DELAY_SECONDS)
+        get_answer_journal().mark_complete()
+        journal_state["complete"] = True
+        st.session_state.outbox_keys.extend(outbox_keys)
+        st.session_state.interview_data["final_file_path"] = answers_path
+        
+        debug_sidebar.success(f"✓ Interview submitted with rank {interview_rank}; "
+                           f"status update and answers are being saved in the background")
+        return True
             
     except Exception as e:
-        st.sidebar.error(f"Error updating interview status: {str(e)}")
+        debug_sidebar.error(f"Error submitting interview: {str(e)}")
         return False
 
 # Add a button in the sidebar to test the blob storage functionality
-if st.sidebar.button("Save Responses to Azure Blob"):
-    blob_path = save_to_blob_storage(st.session_state.interview_data)
+if debug_sidebar.button("Save Responses to Azure Blob"):
+    with deadline_scope(MANUAL_SAVE_DEADLINE_SECONDS, "blob upload"):
+        blob_path = save_to_blob_storage(st.session_state.interview_data)
     if blob_path:
-        st.sidebar.success(f"Responses manually saved to Azure Blob: {blob_path}")
+        debug_sidebar.success(f"Responses manually saved to Azure Blob: {blob_path}")
 
 
 # Function to ask the next question
@@ -398,58 +635,84 @@ def ask_next_question():
         st.session_state.interview_complete = True
         update_interview_status()
 
-# Start conversation with first question
-if "greeted" not in st.session_state:
-    st.session_state.greeted = True
-    # Skip the additional greeting and go straight to the first question
-    ask_next_question()
-
-# Accept user input
-if prompt := st.chat_input("Your response here..."):
-    # Add user message to chat history
-    st.session_state.messages.append({"role": "user", "content": prompt})
-    
-    # Display user message in chat message container
-    with st.chat_message("user"):
-        st.markdown(prompt)
+# The chat pane is a fragment: submitting an answer reruns only this function, not the
+# page setup and sidebar above and below it
+@st.fragment
+def chat_pane():
+    # Display chat messages from history
+    for message in st.session_state.messages:
+        with st.chat_message(message["role"]):
+            st.markdown(message["content"])
     
-    # Store the response in the interview data
-    if st.session_state.question_index > 0 and st.session_state.question_index <= len(st.session_state.interview_questions):
-        current_question = st.session_state.interview_questions[st.session_state.question_index - 1]
-        
-        # Add the question-answer pair to the responses list
-        st.session_state.interview_data["responses"].append({
-            "question": current_question,
-            "answer": prompt,
-            "question_number": st.session_state.question_index
-        })
-
-    # Ask the next question
-    ask_next_question()
-
-# Display debug information
-st.sidebar.title("Dev Debug")
-st.sidebar.write(f"Current role: {role_name}")
-st.sidebar.write(f"Current candidate: {candidate_name}")
-st.sidebar.write(f"Interview ID: {interview_id}")
-st.sidebar.write(f"CV Filename: {cv_filename or 'Not provided'}")
-st.sidebar.write(f"Formatted Role Name: {formatted_role_name or 'Not provided'}")
-st.sidebar.write(f"Question index: {st.session_state.question_index}/{len(st.session_state.interview_questions)}")
-st.sidebar.write(f"API Token: {API_TOKEN[:5]}..." if API_TOKEN else "No API token found")
-
-# Button to manually save responses
-if st.sidebar.button("Save Responses to File"):
-    file_path = save_interview_responses(st.session_state.interview_data)
-    if file_path:
-        st.sidebar.success(f"Responses manually saved to: {file_path}")
-
-# Display current interview data
-if st.sidebar.checkbox("Show interview data"):
-    st.sidebar.write("Current interview data:")
-    st.sidebar.code(json.dumps(st.session_state.interview_data, indent=2))
-
-# Display current questions
-if st.sidebar.checkbox("Show questions"):
-    st.sidebar.write("Interview questions:")
-    for i, q in enumerate(st.session_state.interview_questions):
-        st.sidebar.write(f"{i+1}. {q}")
\ No newline at end of file
+    # Start conversation with first question
+    if "greeted" not in st.session_state:
+        st.session_state.greeted = True
+        # Skip the additional greeting and go straight to the first question
+        ask_next_question()
+        save_session()
+
+    # Accept user input
+    if prompt := st.chat_input("Your response here..."):
+        # The interview moved on in another tab or replica: continue from there and drop
+        # this submission, which answered an earlier question
+        if reload_session_if_stale():
+            st.rerun()
+        
+        # Add user message to chat history
+        st.session_state.messages.append({"role": "user", "content": prompt})
+        
+        # Display user message in chat message container
+        with st.chat_message("user"):
+            st.markdown(prompt)
+        
+        # Store the response in the interview data
+        if st.session_state.question_index > 0 and st.session_state.question_index <= len(st.session_state.interview_questions):
+            current_question = st.session_state.interview_questions[st.session_state.question_index - 1]
+            
+            # Add the question-answer pair to the responses list
+            st.session_state.interview_data["responses"].append({
+                "question": current_question,
+                "answer": prompt,
+                "question_number": st.session_state.question_index
+            })
+            if not st.session_state.interview_complete:
+                record_answer(st.session_state.interview_data["responses"][-1])
+
+        # Ask the next question
+        ask_next_question()
+        save_session()
+
+chat_pane()
+
+# Display debug information (refreshed on full reruns, not after each answer)
+if not PRODUCTION_MODE:
+    debug_sidebar.title("Dev Debug")
+    debug_sidebar.write(f"Current role: {role_name}")
+    debug_sidebar.write(f"Current candidate: {candidate_name}")
+    debug_sidebar.write(f"Interview ID: {interview_id}")
+    debug_sidebar.write(f"CV Filename: {cv_filename or 'Not provided'}")
+    debug_sidebar.write(f"Formatted Role Name: {formatted_role_name or 'Not provided'}")
+    debug_sidebar.write(f"Question index: {st.session_state.question_index}/{len(st.session_state.interview_questions)}")
+    debug_sidebar.write(f"API Token: {nocodb.token[:5]}..." if nocodb.token else "No API token found")
+    if st.session_state.outbox_keys:
+        for key, entry in completion_outbox.get_status(st.session_state.outbox_keys).items():
+            debug_sidebar.write(f"Outbox {key.split(':', 2)[2]}: {entry['status']} after {entry['attempts']} attempts"
+                                + (f" ({entry['last_error']})" if entry['last_error'] else ""))
+
+    # Button to manually save responses
+    if debug_sidebar.button("Save Responses to File"):
+        with deadline_scope(MANUAL_SAVE_DEADLINE_SECONDS, "manual save"):
+            file_path = save_interview_responses(st.session_state.interview_data)
+        if file_path:
+            debug_sidebar.success(f"Responses manually saved to: {file_path}")
+
+    # Display current interview data
+    if debug_sidebar.checkbox("Show interview data"):
+        debug_sidebar.write("Current interview data:")
+        debug_sidebar.code(json.dumps(st.session_state.interview_data, indent=2))
+
+    # Display current questions
+    if debug_sidebar.checkbox("Show questions"):
+        debug_sidebar.write("Interview questions:")
+        for i, q in enumerate(st.session_state.interview_questions):
+            debug_sidebar.write(f"{i+1}. {q}")
\ No newline at end of file
@@ -0,0 +1,192 @@
+#!/usr/bin/env python
+"""
+Scale benchmark for refresh_website.py
+
+Runs the interview scheduler against the local fake NocoDB (fake_nocodb.py) at several
+data set sizes and reports, per scheduling phase, the wall time, the requests the server
+received and the scheduler's peak memory:
+
+- full: a full reconciliation over a table where every pair already has its interview
+- idle: an incremental cycle with nothing changed
+- new links: an incremental cycle after 1% new CV links that leave the job row's
+  UpdatedAt alone, as NocoDB often does, including the background candidate links
+  being written. The jobs feed does not see these links; they are found through the
+  link table's CreatedAt feed, or with --no-links-table by scanning every job's links.
+- reconcile: a full reconciliation, which should find nothing the previous cycle missed
+- touched links: an incremental cycle after another 1% new links that do touch the job
+  row, the idealized path
+
+It also reports how long new links take to be picked up in polling mode: links the next
+incremental cycle finds wait at most one check interval plus that cycle, the rest wait
+for the next full reconciliation. Webhook mode is not measured.
+
+Each scale runs in its own process, with the fake server in another, so memory figures
+belong to the scheduler alone.
+
+    python benchmarks/bench_refresh_website.py
+    python benchmarks/bench_refresh_website.py --scales small large --latency-ms 20 --json results.json
+    python benchmarks/bench_refresh_website.py --scales small --no-links-table
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import tempfile
+import subprocess
+import urllib.request
+from typing import Dict, List
+
+from fake_nocodb import JOB_CV_LINKS_TABLE
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+
+SCALES = {
+    "small": {"jobs": 100, "candidates": 5000, "interviews": 10000},
+    "medium": {"jobs": 500, "candidates": 20000, "interviews": 50000},
+    "large": {"jobs": 1000, "candidates": 50000, "interviews": 100000},
+}
+
+def bench_request(base_url: str, path: str, method: str = "GET") -> Dict:
+    request = urllib.request.Request(f"{base_url}{path}", method=method, data=b"" if method == "POST" else None)
+    with urllib.request.urlopen(request) as response:
+        return json.load(response)
+
+def start_fake_server(scale: Dict, latency_ms: float):
+    """Start fake_nocodb.py in its own process and return (process, base URL)."""
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(BENCH_DIR, "fake_nocodb.py"), "--port", "0",
+         "--jobs", str(scale["jobs"]), "--candidates", str(scale["candidates"]),
+         "--interviews", str(scale["interviews"]), "--latency-ms", str(latency_ms)],
+        stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()
+    if not line.startswith("Fake NocoDB on "):
+        process.kill()
+        raise RuntimeError(f"Fake NocoDB failed to start: {line!r}")
+    return process, line.split()[3]
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def run_scale(name: str, latency_ms: float, links_table: bool = True) -> Dict:
+    """Run every phase for one scale in this process and return the measurements. Without
+    links_table the scheduler is not told about the link table and scans every job's links."""
+    scale = SCALES[name]
+    process, base_url = start_fake_server(scale, latency_ms)
+    try:
+        # refresh_website logs to ./interview_scheduler.log and reads ./interview_questions.txt
+        os.chdir(tempfile.mkdtemp(prefix="bench_refresh_website_"))
+        os.environ.setdefault("REFRESH_STATE_PATH", "")
+        os.environ["NOCODB_URL"] = base_url
+        os.environ.setdefault("NOCODB_TOKEN", "bench")
+        os.environ["NOCODB_JOB_CV_LINKS_TABLE"] = JOB_CV_LINKS_TABLE if links_table else ""
+        sys.path.insert(0, REPO_DIR)
+        import logging
+        import refresh_website as rw
+        logging.getLogger().setLevel(logging.WARNING)
+
+        new_links = max(10, scale["interviews"] // 100)
+        phases = []
+
+        def run_phase(phase: str, action):
+            before = bench_request(base_url, "/_bench/stats")
+            started = time.perf_counter()
+            created = action()
+            elapsed = time.perf_counter() - started
+            after = bench_request(base_url, "/_bench/stats")
+            requests_made = {key: count - before["requests"].get(key, 0)
+                             for key, count in after["requests"].items()
+                             if count - before["requests"].get(key, 0)}
+            phases.append({
+                "phase": phase,
+                "seconds": round(elapsed, 3),
+                "requests": sum(requests_made.values()),
+                "requests_by_type": requests_made,
+                "created": created,
+                "peak_rss_mb": round(peak_rss_mb(), 1),
+            })
+
+        def new_links_phase(touch_job: int, seed: int):
+            bench_request(base_url, f"/_bench/add_links?count={new_links}&seed={seed}&touch_job={touch_job}", "POST")
+            created = rw.check_and_create_interviews()
+            rw.wait_for_pending_links(600)
+            return created
+
+        def reconcile_phase():
+            created = rw.check_and_create_interviews(force_full_sync=True)
+            rw.wait_for_pending_links(600)
+            return created
+
+        run_phase("full", lambda: rw.check_and_create_interviews(force_full_sync=True))
+        run_phase("idle", rw.check_and_create_interviews)
+        run_phase("new links", lambda: new_links_phase(0, 7))
+        run_phase("reconcile", reconcile_phase)
+        run_phase("touched links", lambda: new_links_phase(1, 8))
+
+        by_phase = {phase["phase"]: phase for phase in phases}
+        missed = by_phase["reconcile"]["created"]
+        pickup = {
+            "by_incremental": by_phase["new links"]["created"],
+            "by_reconciliation": missed,
+            "worst_case_seconds": round(rw.full_reconciliation_interval + by_phase["reconcile"]["seconds"]
+                                        if missed else rw.check_interval_seconds + by_phase["new links"]["seconds"], 1),
+            "touched_by_incremental": by_phase["touched links"]["created"],
+            "touched_worst_case_seconds": round(rw.check_interval_seconds + by_phase["touched links"]["seconds"], 1),
+        }
+
+        return {"scale": name, **scale, "latency_ms": latency_ms, "links_table": links_table,
+                "new_links": new_links, "phases": phases, "pickup": pickup}
+    finally:
+        process.kill()
+
+def print_results(results: List[Dict]) -> None:
+    print(f"{'scale':<8} {'jobs':>6} {'cands':>7} {'ivws':>7} {'phase':<13} "
+          f"{'seconds':>9} {'requests':>9} {'created':>8} {'rss MB':>8}")
+    for result in results:
+        for phase in result["phases"]:
+            print(f"{result['scale']:<8} {result['jobs']:>6} {result['candidates']:>7} {result['interviews']:>7} "
+                  f"{phase['phase']:<13} {phase['seconds']:>9.2f} {phase['requests']:>9} "
+                  f"{phase['created']:>8} {phase['peak_rss_mb']:>8.1f}")
+    print()
+    print("Pickup of new links in polling mode:")
+    for result in results:
+        pickup = result["pickup"]
+        print(f"  {result['scale']}: {pickup['by_incremental']} of {result['new_links']} untouched links found by "
+              f"the next incremental cycle, {pickup['by_reconciliation']} only by full reconciliation "
+              f"(worst case ~{pickup['worst_case_seconds']:.0f}s); {pickup['touched_by_incremental']} of "
+              f"{result['new_links']} links that touch the job within ~{pickup['touched_worst_case_seconds']:.0f}s")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark refresh_website against a fake NocoDB')
+    parser.add_argument('--scales', nargs='+', choices=list(SCALES), default=["small", "medium"],
+                        help='Data set sizes to run (default: small medium)')
+    parser.add_argument('--latency-ms', type=float, default=0, help='Latency added to every request')
+    parser.add_argument('--json', help='Also write the results to this JSON file')
+    parser.add_argument('--no-links-table', action='store_true',
+                        help="Don't tell the scheduler about the link table, so it scans every job's links")
+    parser.add_argument('--run-scale', choices=list(SCALES), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_scale:
+        # Child process: run one scale and report it on stdout
+        print(json.dumps(run_scale(args.run_scale, args.latency_ms, not args.no_links_table)))
+        sys.exit(0)
+
+    results = []
+    for scale_name in args.scales:
+        print(f"Running {scale_name} ({SCALES[scale_name]})...", file=sys.stderr)
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--run-scale", scale_name,
+             "--latency-ms", str(args.latency_ms)] + (["--no-links-table"] if args.no_links_table else []),
+            stdout=subprocess.PIPE, text=True, check=True).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    print_results(results)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,447 @@
+#!/usr/bin/env python
+"""
+Fake NocoDB
+
+A local, in-memory stand-in for the NocoDB v2 API used by refresh_website.py, for
+benchmarks. It serves the jobs, candidates (CVs), interviews and jobs <-> CVs link tables
+plus the interview -> candidate link endpoint, with:
+
+- offset/limit paging with pageInfo, `fields`, `sort=Id` / `sort=-Id` and the subset of the `where`
+  syntax the scheduler uses ((Field,eq|neq|gt|gte|lt|lte,[exactDate,]value), (Field,blank|notblank),
+  groups, ~and / ~or)
+- nested nc_92rx___nc_m2m_JobDescription_CVs relations on job records. Linking a CV
+  leaves the job row's UpdatedAt alone unless touch_job_on_link is set, since NocoDB does
+  not always touch it; each link also adds a row (JobDescription_id, CVs_id, CreatedAt) to
+  the link table
+- array POST and PATCH on the records endpoints
+- table metadata (column titles only) at /api/v2/meta/tables/{table}
+- a configurable per-request latency
+- per-method request counters, and /_bench endpoints to read them and to add links
+
+    python benchmarks/fake_nocodb.py --jobs 100 --candidates 5000 --interviews 10000 --port 8090
+"""
+
+import re
+import json
+import operator
+import time
+import random
+import hashlib
+import argparse
+import threading
+from datetime import datetime, timedelta, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse, parse_qs
+
+JOBS_TABLE = "mgwvuug18vkrhg0"
+INTERVIEWS_TABLE = "mpims4p3zrwsarx"
+CANDIDATES_TABLE = "m0ro5phcebcdbt7"
+JOB_CV_LINKS_TABLE = "mlnk92rxjobcvs0"
+CANDIDATE_LINK_FIELD = "c4gkn9aehmsg1n5"
+JOBS_CV_RELATION_FIELD = "nc_92rx___nc_m2m_JobDescription_CVs"
+
+RECORDS_PATH = re.compile(r"^/api/v2/tables/(\w+)/records/?$")
+LINKS_PATH = re.compile(r"^/api/v2/tables/(\w+)/links/(\w+)/records/(\d+)/?$")
+META_PATH = re.compile(r"^/api/v2/meta/tables/(\w+)/?$")
+
+# Columns reported by the table metadata endpoint, on top of those of the stored rows
+TABLE_COLUMNS = {
+    JOBS_TABLE: ["Id", "Job Title", "Client", "CreatedAt", "UpdatedAt", JOBS_CV_RELATION_FIELD],
+    INTERVIEWS_TABLE: ["Id", "Title", "Interview Key", "Interview Portal Link", "Questions", "CreatedAt",
+                       "UpdatedAt", CANDIDATE_LINK_FIELD],
+    CANDIDATES_TABLE: ["Id", "First Name", "Last Name", "CV", "CreatedAt", "UpdatedAt"],
+    JOB_CV_LINKS_TABLE: ["Id", "JobDescription_id", "CVs_id", "CreatedAt", "UpdatedAt"],
+}
+
+# Maximum page size, like NocoDB's default limit cap
+MAX_PAGE_SIZE = 1000
+
+def timestamp(moment: datetime) -> str:
+    """Format a UTC time the way NocoDB returns timestamps."""
+    return moment.strftime("%Y-%m-%d %H:%M:%S+00:00")
+
+def parse_where(where: str) -> Callable[[Dict], bool]:
+    """
+    Compile a NocoDB where clause into a predicate over records.
+
+    Args:
+        where (str): Clause such as (Status,eq,Complete)~and((A,eq,1)~or(A,eq,2))
+
+    Returns:
+        Callable: Predicate taking a record and returning whether it matches
+    """
+    position = 0
+
+    def parse_expression() -> Callable[[Dict], bool]:
+        nonlocal position
+        predicate = parse_term()
+        while where.startswith("~and", position) or where.startswith("~or", position):
+            is_and = where.startswith("~and", position)
+            position += 4 if is_and else 3
+            left, right = predicate, parse_term()
+            predicate = (lambda l, r: lambda rec: l(rec) and r(rec))(left, right) if is_and else \
+                        (lambda l, r: lambda rec: l(rec) or r(rec))(left, right)
+        return predicate
+
+    def parse_term() -> Callable[[Dict], bool]:
+        nonlocal position
+        if where[position] != "(":
+            raise ValueError(f"Expected '(' at {position} in {where}")
+        position += 1
+        if where[position] == "(":
+            predicate = parse_expression()
+        else:
+            end = where.index(")", position)
+            predicate = parse_condition(where[position:end])
+            position = end
+        if where[position] != ")":
+            raise ValueError(f"Expected ')' at {position} in {where}")
+        position += 1
+        return predicate
+
+    predicate = parse_expression()
+    if position != len(where):
+        raise ValueError(f"Unexpected trailing input at {position} in {where}")
+    return predicate
+
+COMPARISONS = {"gt": operator.gt, "gte": operator.ge, "lt": operator.lt, "lte": operator.le}
+
+def parse_condition(condition: str) -> Callable[[Dict], bool]:
+    parts = condition.split(",", 2)
+    field, op = parts[0], parts[1]
+    value = parts[2] if len(parts) > 2 else None
+    if value is not None and value.startswith("exactDate,"):
+        value = value[len("exactDate,"):]
+
+    def as_text(record: Dict) -> Optional[str]:
+        current = record.get(field)
+        return None if current is None else str(current)
+
+    if op == "blank":
+        return lambda record: record.get(field) in (None, "", [])
+    if op == "notblank":
+        return lambda record: record.get(field) not in (None, "", [])
+    if op == "eq":
+        return lambda record: as_text(record) == value
+    if op == "neq":
+        return lambda record: as_text(record) != value
+    if op in COMPARISONS:
+        compare_values = COMPARISONS[op]
+        def compare(record: Dict) -> bool:
+            current = as_text(record)
+            if current is None:
+                return False
+            if field == "Id":
+                return compare_values(int(current), int(value))
+            return compare_values(current, value)
+        return compare
+    raise ValueError(f"Unsupported operator {op}")
+
+class FakeNocoDB:
+    """In-memory tables and request counters behind the fake HTTP API."""
+
+    def __init__(self, latency: float = 0.0, touch_job_on_link: bool = False):
+        self.latency = latency
+        self.touch_job_on_link = touch_job_on_link
+        self.lock = threading.Lock()
+        self.tables: Dict[str, Dict[int, Dict]] = {JOBS_TABLE: {}, INTERVIEWS_TABLE: {}, CANDIDATES_TABLE: {},
+                                                   JOB_CV_LINKS_TABLE: {}}
+        self.next_ids = {JOBS_TABLE: 1, INTERVIEWS_TABLE: 1, CANDIDATES_TABLE: 1, JOB_CV_LINKS_TABLE: 1}
+        # job Id -> candidate Ids linked to it, with the time each link was made
+        self.job_links: Dict[int, List[Tuple[int, str]]] = {}
+        self.interview_links: Dict[int, List[int]] = {}
+        self.request_counts: Dict[str, int] = {}
+
+    def insert(self, table: str, record: Dict) -> Dict:
+        with self.lock:
+            record_id = self.next_ids[table]
+            self.next_ids[table] += 1
+            now = timestamp(datetime.now(timezone.utc))
+            stored = dict(record, Id=record_id, CreatedAt=now, UpdatedAt=now)
+            self.tables[table][record_id] = stored
+            return stored
+
+    def link_cv(self, job_id: int, candidate_id: int, linked_at: Optional[datetime] = None,
+                touch_job: Optional[bool] = None) -> None:
+        """Link a CV to a job, adding a link table row. The job's UpdatedAt is only touched if
+        touch_job (by default touch_job_on_link) is set."""
+        linked = timestamp(linked_at or datetime.now(timezone.utc))
+        if touch_job is None:
+            touch_job = self.touch_job_on_link
+        with self.lock:
+            self.job_links.setdefault(job_id, []).append((candidate_id, linked))
+            link_id = self.next_ids[JOB_CV_LINKS_TABLE]
+            self.next_ids[JOB_CV_LINKS_TABLE] += 1
+            self.tables[JOB_CV_LINKS_TABLE][link_id] = {"Id": link_id, "JobDescription_id": job_id,
+                                                        "CVs_id": candidate_id, "CreatedAt": linked,
+                                                        "UpdatedAt": linked}
+            if touch_job:
+                self.tables[JOBS_TABLE][job_id]["UpdatedAt"] = linked
+
+    def count(self, name: str) -> None:
+        with self.lock:
+            self.request_counts[name] = self.request_counts.get(name, 0) + 1
+
+    def render_job(self, job: Dict) -> Dict:
+        candidates = self.tables[CANDIDATES_TABLE]
+        relations = []
+        for candidate_id, linked_at in self.job_links.get(job["Id"], []):
+            candidate = candidates[candidate_id]
+            relations.append({"CreatedAt": linked_at, "CV": {
+                "Id": candidate_id,
+                "First Name": candidate["First Name"],
+                "Last Name": candidate["Last Name"],
+                "CV": candidate["CV"],
+            }})
+        return dict(job, **{JOBS_CV_RELATION_FIELD: relations})
+
+    def list_records(self, table: str, query: Dict[str, str]) -> Dict:
+        offset = int(query.get("offset", 0))
+        limit = min(int(query.get("limit", 25)), MAX_PAGE_SIZE)
+        predicate = parse_where(query["where"]) if query.get("where") else None
+        with self.lock:
+            # Records are kept in Id order; Id and -Id are the only sorts the scheduler asks for
+            rows = list(self.tables[table].values())
+            if query.get("sort") == "-Id":
+                rows.reverse()
+            if predicate:
+                rows = [row for row in rows if predicate(row)]
+            total = len(rows)
+            page = rows[offset:offset + limit]
+            if table == JOBS_TABLE:
+                page = [self.render_job(row) for row in page]
+        if query.get("fields"):
+            fields = set(query["fields"].split(","))
+            page = [{key: value for key, value in row.items() if key in fields} for row in page]
+        return {"list": page, "pageInfo": {"totalRows": total, "page": offset // limit + 1,
+                                           "pageSize": limit, "isFirstPage": offset == 0,
+                                           "isLastPage": offset + limit >= total}}
+
+    def insert_records(self, table: str, body: Any) -> Any:
+        records = body if isinstance(body, list) else [body]
+        inserted = [{"Id": self.insert(table, record)["Id"]} for record in records]
+        return inserted if isinstance(body, list) else inserted[0]
+
+    def update_records(self, table: str, body: Any) -> Any:
+        records = body if isinstance(body, list) else [body]
+        now = timestamp(datetime.now(timezone.utc))
+        with self.lock:
+            for record in records:
+                stored = self.tables[table].get(int(record["Id"]))
+                if stored is None:
+                    raise KeyError(f"Record {record['Id']} not found")
+                stored.update(record, UpdatedAt=now)
+        updated = [{"Id": record["Id"]} for record in records]
+        return updated if isinstance(body, list) else updated[0]
+
+    def link_records(self, record_id: int, body: Any) -> Any:
+        with self.lock:
+            if record_id not in self.tables[INTERVIEWS_TABLE]:
+                raise KeyError(f"Record {record_id} not found")
+            self.interview_links.setdefault(record_id, []).extend(int(item["Id"]) for item in body)
+        return True
+
+    def table_meta(self, table: str) -> Dict:
+        with self.lock:
+            titles = list(TABLE_COLUMNS.get(table, []))
+            for row in self.tables[table].values():
+                titles.extend(title for title in row if title not in titles)
+        return {"id": table, "columns": [{"title": title} for title in titles]}
+
+    def stats(self) -> Dict:
+        with self.lock:
+            return {
+                "requests": dict(self.request_counts),
+                "rows": {table: len(rows) for table, rows in self.tables.items()},
+                "links": sum(len(ids) for ids in self.interview_links.values()),
+            }
+
+def get_interview_key(role_id, candidate_id, cv_filename=None, first_name=None, last_name=None) -> str:
+    """Same key as refresh_website.get_interview_key(), duplicated to keep the server standalone."""
+    if candidate_id is not None:
+        identity = f"candidate:{candidate_id}"
+    elif cv_filename:
+        identity = f"cv:{cv_filename}"
+    else:
+        identity = f"name:{first_name} {last_name}"
+    return hashlib.sha1(f"role:{role_id}|{identity}".encode('utf-8')).hexdigest()
+
+def populate(db: FakeNocoDB, jobs: int, candidates: int, interviews: int, seed: int = 42) -> None:
+    """
+    Fill the tables with a realistic data set.
+
+    Every job gets the same number of linked CVs, so there are about `interviews`
+    candidate-job pairs in total, and every pair already has its interview. New pairs can
+    then be added with add_links() to measure how quickly they are picked up.
+
+    Args:
+        db (FakeNocoDB): Database to fill
+        jobs (int): Number of jobs
+        candidates (int): Number of candidates (CVs)
+        interviews (int): Number of existing interviews (and linked pairs)
+        seed (int): Random seed, so runs are comparable
+    """
+    rng = random.Random(seed)
+    start = datetime.now(timezone.utc) - timedelta(days=30)
+    for i in range(candidates):
+        db.insert(CANDIDATES_TABLE, {
+            "First Name": f"First{i}",
+            "Last Name": f"Last{i}",
+            "CV": [{"title": f"{100000 + i}_original_cv.pdf", "mimetype": "application/pdf"}],
+        })
+    clients = [f"Client {i}" for i in range(max(1, jobs // 10))]
+    for i in range(jobs):
+        db.insert(JOBS_TABLE, {"Job Title": f"Role {i}", "Client": rng.choice(clients)})
+        db.tables[JOBS_TABLE][i + 1]["UpdatedAt"] = timestamp(start)
+
+    per_job = max(1, interviews // max(1, jobs))
+    created = 0
+    for job_id in range(1, jobs + 1):
+        job = db.tables[JOBS_TABLE][job_id]
+        for candidate_id in rng.sample(range(1, candidates + 1), min(per_job, candidates)):
+            if created >= interviews:
+                break
+            linked_at = start + timedelta(seconds=created)
+            db.link_cv(job_id, candidate_id, linked_at)
+            candidate = db.tables[CANDIDATES_TABLE][candidate_id]
+            name = f"{candidate['First Name']} {candidate['Last Name']}"
+            title = f"{job['Client']} - {job['Job Title']}: {name}"
+            interview = db.insert(INTERVIEWS_TABLE, {
+                "Title": title,
+                "Interview Key": get_interview_key(job_id, candidate_id),
+                "Interview Status": rng.choice(["Complete", "Ready for Interview", "In Progress"]),
+                "Questions": "1. Tell me about yourself.",
+                "CV Name": candidate["CV"][0]["title"],
+                "Interview Rank": None,
+            })
+            # Existing data was last touched when it was created, well in the past
+            interview["UpdatedAt"] = interview["CreatedAt"] = timestamp(linked_at)
+            db.interview_links[interview["Id"]] = [candidate_id]
+            created += 1
+
+def add_links(db: FakeNocoDB, count: int, seed: int = 7, touch_job: Optional[bool] = None) -> int:
+    """Link `count` new CVs to random jobs, creating pairs that have no interview yet.
+    touch_job overrides the database's touch_job_on_link for these links."""
+    rng = random.Random(seed)
+    job_ids = list(db.tables[JOBS_TABLE])
+    candidate_ids = list(db.tables[CANDIDATES_TABLE])
+    added = 0
+    attempts = 0
+    while added < count and attempts < count * 20:
+        attempts += 1
+        job_id = rng.choice(job_ids)
+        candidate_id = rng.choice(candidate_ids)
+        if any(linked == candidate_id for linked, _ in db.job_links.get(job_id, [])):
+            continue
+        db.link_cv(job_id, candidate_id, touch_job=touch_job)
+        added += 1
+    return added
+
+def make_handler(db: FakeNocoDB):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body are written separately; without this keep-alive clients stall
+        # on delayed ACKs
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            pass
+
+        def send_json(self, status: int, data: Any) -> None:
+            body = json.dumps(data).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def read_json(self) -> Any:
+            length = int(self.headers.get("Content-Length") or 0)
+            return json.loads(self.rfile.read(length) or b"null")
+
+        def handle_request(self, method: str) -> None:
+            url = urlparse(self.path)
+            query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            if url.path.startswith("/_bench/"):
+                return self.handle_bench(method, url.path, query)
+
+            if db.latency:
+                time.sleep(db.latency)
+            try:
+                match = RECORDS_PATH.match(url.path)
+                if match and match.group(1) in db.tables:
+                    table = match.group(1)
+                    db.count(f"{method} records")
+                    if method == "GET":
+                        return self.send_json(200, db.list_records(table, query))
+                    if method == "POST":
+                        return self.send_json(200, db.insert_records(table, self.read_json()))
+                    if method == "PATCH":
+                        return self.send_json(200, db.update_records(table, self.read_json()))
+                match = META_PATH.match(url.path)
+                if match and match.group(1) in db.tables and method == "GET":
+                    db.count("GET meta")
+                    return self.send_json(200, db.table_meta(match.group(1)))
+                match = LINKS_PATH.match(url.path)
+                if match and method == "POST":
+                    db.count("POST links")
+                    return self.send_json(200, db.link_records(int(match.group(3)), self.read_json()))
+                self.send_json(404, {"msg": f"No route for {method} {url.path}"})
+            except (KeyError, ValueError) as e:
+                self.send_json(400, {"msg": str(e)})
+
+        def handle_bench(self, method: str, path: str, query: Dict[str, str]) -> None:
+            if path == "/_bench/stats":
+                return self.send_json(200, db.stats())
+            if path == "/_bench/reset_counts" and method == "POST":
+                with db.lock:
+                    db.request_counts.clear()
+                return self.send_json(200, {})
+            if path == "/_bench/add_links" and method == "POST":
+                touch_job = query["touch_job"] == "1" if "touch_job" in query else None
+                return self.send_json(200, {"added": add_links(db, int(query.get("count", 1)),
+                                                               int(query.get("seed", 7)), touch_job)})
+            if path == "/_bench/latency" and method == "POST":
+                db.latency = float(query.get("seconds", 0))
+                return self.send_json(200, {})
+            self.send_json(404, {"msg": f"No route for {method} {path}"})
+
+        def do_GET(self):
+            self.handle_request("GET")
+
+        def do_POST(self):
+            self.handle_request("POST")
+
+        def do_PATCH(self):
+            self.handle_request("PATCH")
+
+    return Handler
+
+def serve(db: FakeNocoDB, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """Start serving the database on a background thread. Port 0 picks a free port."""
+    server = ThreadingHTTPServer((host, port), make_handler(db))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="fake-nocodb", daemon=True).start()
+    return server
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Serve a fake NocoDB with generated data')
+    parser.add_argument('--jobs', type=int, default=100)
+    parser.add_argument('--candidates', type=int, default=5000)
+    parser.add_argument('--interviews', type=int, default=10000)
+    parser.add_argument('--latency-ms', type=float, default=0, help='Added latency per request')
+    parser.add_argument('--touch-job-on-link', action='store_true',
+                        help="Bump a job's UpdatedAt when a CV is linked to it")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    args = parser.parse_args()
+
+    database = FakeNocoDB(latency=args.latency_ms / 1000, touch_job_on_link=args.touch_job_on_link)
+    populate(database, args.jobs, args.candidates, args.interviews)
+    http_server = serve(database, args.host, args.port)
+    print(f"Fake NocoDB on http://{args.host}:{http_server.server_address[1]} with {database.stats()['rows']}", flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        http_server.shutdown()
@@ -0,0 +1,294 @@
+#!/usr/bin/env python
+"""
+Load test for the candidate portal (app.py)
+
+Simulates N candidates taking interviews at the same time in one app process, end to end:
+each opens the interview link, answers every question and completes. app.py is driven
+through Streamlit's AppTest, one AppTest (one browser session) per candidate, against the
+local fake NocoDB (fake_nocodb.py) and an in-memory Azure Blob stand-in. For each
+concurrency level it reports:
+
+- page load and answer turn latency (p50/p95/max), measured from submit to rerun done,
+  and the script run time alone
+- throughput in answer turns and completed interviews per second
+- RSS per session: the process's resident memory growth while all sessions are live,
+  divided by N. AppTest keeps each session's element tree, so this is an upper bound.
+- outbox entries due but still pending when the last interview completed
+
+AppTest swaps a process-wide runtime in and out on every run, so runs from different
+sessions are serialized through a lock. Candidates still run concurrently (sessions stay
+live, think time between answers, background outbox workers), and latency includes the
+time a turn waits behind other sessions' runs. A real server overlaps runs that wait on
+I/O, so with --latency-ms these latencies are pessimistic; without it, turns are CPU bound
+and the GIL serializes them much the same way.
+
+Each level runs in its own process (with the fake server in another) so memory figures
+are not skewed by earlier levels. Questions stream with no delay by default, so the
+latency is the server's own work; pass --stream-delay to include it.
+
+    python benchmarks/load_test_app.py
+    python benchmarks/load_test_app.py --concurrency 1 10 50 --questions 8 --latency-ms 20 --json results.json
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import sqlite3
+import argparse
+import tempfile
+import threading
+import subprocess
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+from bench_refresh_website import REPO_DIR, start_fake_server, bench_request, peak_rss_mb
+
+INTERVIEWS_TABLE_ID = "mpims4p3zrwsarx"
+
+# Serializes AppTest runs (see above)
+APP_RUN_LOCK = threading.Lock()
+
+def current_rss_mb() -> float:
+    """Resident memory of this process now (peak on platforms without /proc)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except OSError:
+        return peak_rss_mb()
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+def latency_summary(values: List[float]) -> Dict[str, float]:
+    return {"p50_ms": round(percentile(values, 0.5) * 1000, 1),
+            "p95_ms": round(percentile(values, 0.95) * 1000, 1),
+            "max_ms": round(max(values, default=0) * 1000, 1)}
+
+def set_interview_questions(base_url: str, interviews: int, questions: int) -> None:
+    """Give interviews 1..interviews a numbered list of questions."""
+    questions_text = "\n".join(f"{i}. Tell me about a project where you used skill number {i}."
+                               for i in range(1, questions + 1))
+    records = [{"Id": interview_id, "Questions": questions_text} for interview_id in range(1, interviews + 1)]
+    request = urllib.request.Request(f"{base_url}/api/v2/tables/{INTERVIEWS_TABLE_ID}/records", method="PATCH",
+                                     data=json.dumps(records).encode(), headers={"Content-Type": "application/json"})
+    urllib.request.urlopen(request).read()
+
+def install_fake_blob_storage() -> Dict[str, bytearray]:
+    """
+    Replace the Azure Blob client that app.py imports with an in-memory stand-in.
+
+    Supports the calls app.py makes (block upload, append blob create, append and
+    properties). Returns the dict of blob name -> content it writes to.
+    """
+    import azure.storage.blob
+    from azure.core.exceptions import ResourceNotFoundError
+    from azure.storage.blob import BlobType
+
+    blobs: Dict[str, bytearray] = {}
+    blob_info: Dict[str, Dict] = {}
+    lock = threading.Lock()
+
+    class FakeBlobProperties:
+        def __init__(self, name: str):
+            self.size = len(blobs[name])
+            self.blob_type = blob_info[name]["blob_type"]
+            self.metadata = dict(blob_info[name]["metadata"])
+
+    class FakeBlobClient:
+        def __init__(self, name: str):
+            self.name = name
+
+        def upload_blob(self, data, overwrite=False, **kwargs):
+            with lock:
+                blobs[self.name] = bytearray(data.encode("utf-8") if isinstance(data, str) else data)
+                blob_info[self.name] = {"blob_type": BlobType.BLOCKBLOB, "metadata": {}}
+
+        def get_blob_properties(self, **kwargs):
+            with lock:
+                if self.name not in blobs:
+                    raise ResourceNotFoundError("The specified blob does not exist.")
+                return FakeBlobProperties(self.name)
+
+        def create_append_blob(self, metadata=None, **kwargs):
+            with lock:
+                blobs[self.name] = bytearray()
+                blob_info[self.name] = {"blob_type": BlobType.APPENDBLOB, "metadata": dict(metadata or {})}
+
+        def append_block(self, data, appendpos_condition=None, **kwargs):
+            with lock:
+                if appendpos_condition is not None and len(blobs[self.name]) != appendpos_condition:
+                    raise Exception("The append position condition specified was not met.")
+                blobs[self.name] += data
+
+    class FakeContainerClient:
+        def get_blob_client(self, name: str):
+            return FakeBlobClient(name)
+
+    class FakeBlobServiceClient:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def get_container_client(self, container: str):
+            return FakeContainerClient()
+
+    azure.storage.blob.BlobServiceClient = FakeBlobServiceClient
+    return blobs
+
+def timed_run(runnable) -> Tuple[float, float]:
+    """Run an AppTest (or a widget change) and return (latency, script run time) in seconds."""
+    queued = time.perf_counter()
+    with APP_RUN_LOCK:
+        started = time.perf_counter()
+        runnable.run()
+        finished = time.perf_counter()
+    return finished - queued, finished - started
+
+def run_interview(interview_id: int, base_url: str, answer_words: int, think_time: float, results: Dict) -> None:
+    """Take one interview through AppTest, recording page load and turn latencies."""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.join(REPO_DIR, "app.py"), default_timeout=120)
+    at.query_params["interview_id"] = str(interview_id)
+    at.query_params["candidate"] = f"Candidate {interview_id}"
+    at.query_params["role"] = "Load Test Role"
+    at.query_params["role_path"] = "1_Load_Test_Role"
+    at.secrets["azure"] = {"storage_account_name": "loadtest", "storage_account_key": "loadtestkey",
+                           "container_name": "landing"}
+
+    latency, _ = timed_run(at)
+    results["page_loads"].append(latency)
+    answer = " ".join(["word"] * answer_words)
+    while not at.session_state.interview_complete:
+        if at.exception:
+            raise RuntimeError(f"Interview {interview_id}: {at.exception[0].value}")
+        time.sleep(think_time)
+        latency, run_time = timed_run(at.chat_input[0].set_value(f"{answer} {interview_id}"))
+        results["turns"].append(latency)
+        results["turn_runs"].append(run_time)
+    # Keep the session alive until every interview is done, as real browser sessions are
+    results["sessions"].append(at)
+
+def run_level(concurrency: int, questions: int, answer_words: int, think_time: float, latency_ms: float,
+              stream_delay: float) -> Dict:
+    """Run one concurrency level in this process and return the measurements."""
+    # One job with a CV per candidate, so the fake server creates every interview
+    scale = {"jobs": 1, "candidates": concurrency + 1, "interviews": concurrency + 1}
+    process, base_url = start_fake_server(scale, latency_ms)
+    try:
+        # app.py keeps its outbox, journals, session store and answers files under the working directory
+        os.chdir(tempfile.mkdtemp(prefix="load_test_app_"))
+        shutil.copy(os.path.join(REPO_DIR, "greeting_text.txt"), "greeting_text.txt")
+        os.environ["NOCODB_URL"] = base_url
+        os.environ.setdefault("NOCODB_TOKEN", "bench")
+        os.environ.setdefault("INTERVIEW_APP_MODE", "production")
+        os.environ["INTERVIEW_STREAM_CHUNK_DELAY"] = str(stream_delay)
+        sys.path.insert(0, REPO_DIR)
+        import logging
+        logging.getLogger().setLevel(logging.ERROR)
+
+        set_interview_questions(base_url, concurrency + 1, questions)
+        blobs = install_fake_blob_storage()
+
+        # Warm up imports and process-wide caches with one interview outside the measurement
+        run_interview(concurrency + 1, base_url, answer_words, 0,
+                      {"page_loads": [], "turns": [], "turn_runs": [], "sessions": []})
+        bench_request(base_url, "/_bench/reset_counts", "POST")
+        baseline_rss = current_rss_mb()
+
+        results = {"page_loads": [], "turns": [], "turn_runs": [], "sessions": []}
+        errors = []
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = [executor.submit(run_interview, interview_id, base_url, answer_words, think_time, results)
+                       for interview_id in range(1, concurrency + 1)]
+            for future in futures:
+                try:
+                    future.result()
+                except Exception as e:
+                    errors.append(str(e))
+        elapsed = time.perf_counter() - started
+        live_rss = current_rss_mb()
+
+        outbox = sqlite3.connect(".interview_outbox.sqlite3")
+        # Blob checks are scheduled a minute after completion; only count entries already due
+        pending = outbox.execute("SELECT COUNT(*) FROM outbox WHERE status = 'pending' AND next_attempt_at <= ?",
+                                 (time.time(),)).fetchone()[0]
+        requests_made = sum(bench_request(base_url, "/_bench/stats")["requests"].values())
+        completed = len(results["sessions"])
+
+        return {
+            "concurrency": concurrency,
+            "questions": questions,
+            "think_time": think_time,
+            "latency_ms": latency_ms,
+            "stream_delay": stream_delay,
+            "completed": completed,
+            "errors": errors[:5],
+            "seconds": round(elapsed, 2),
+            "page_load": latency_summary(results["page_loads"]),
+            "turn": latency_summary(results["turns"]),
+            "turn_run": latency_summary(results["turn_runs"]),
+            "turns_per_second": round(len(results["turns"]) / elapsed, 1) if elapsed else 0,
+            "interviews_per_second": round(completed / elapsed, 2) if elapsed else 0,
+            "rss_per_session_mb": round((live_rss - baseline_rss) / max(1, completed), 2),
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+            "nocodb_requests": requests_made,
+            "blobs_written": len(blobs),
+            "outbox_pending": pending,
+        }
+    finally:
+        process.kill()
+
+def print_results(results: List[Dict]) -> None:
+    print(f"{'sessions':>8} {'done':>5} {'seconds':>8} {'load p50':>9} {'load p95':>9} {'turn p50':>9} "
+          f"{'turn p95':>9} {'run p50':>8} {'turns/s':>8} {'ivw/s':>7} {'MB/sess':>8} {'peak MB':>8} {'pending':>8}")
+    for r in results:
+        print(f"{r['concurrency']:>8} {r['completed']:>5} {r['seconds']:>8.2f} {r['page_load']['p50_ms']:>9.1f} "
+              f"{r['page_load']['p95_ms']:>9.1f} {r['turn']['p50_ms']:>9.1f} {r['turn']['p95_ms']:>9.1f} "
+              f"{r['turn_run']['p50_ms']:>8.1f} {r['turns_per_second']:>8.1f} {r['interviews_per_second']:>7.2f} {r['rss_per_session_mb']:>8.2f} "
+              f"{r['peak_rss_mb']:>8.1f} {r['outbox_pending']:>8}")
+        for error in r["errors"]:
+            print(f"  error: {error}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Load test app.py with concurrent simulated interviews')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 5, 10],
+                        help='Numbers of simultaneous interviews to run (default: 1 5 10)')
+    parser.add_argument('--questions', type=int, default=6, help='Questions per interview')
+    parser.add_argument('--answer-words', type=int, default=80, help='Words per answer')
+    parser.add_argument('--think-time', type=float, default=0,
+                        help='Seconds each candidate waits before answering (default 0: saturate the app)')
+    parser.add_argument('--latency-ms', type=float, default=0, help='Latency added to every NocoDB request')
+    parser.add_argument('--stream-delay', type=float, default=0,
+                        help='Seconds between streamed chunks of each question (app default: 0.05)')
+    parser.add_argument('--json', help='Also write the results to this JSON file')
+    parser.add_argument('--run-level', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_level:
+        # Child process: run one level and report it on stdout
+        print(json.dumps(run_level(args.run_level, args.questions, args.answer_words, args.think_time,
+                                   args.latency_ms, args.stream_delay)))
+        sys.exit(0)
+
+    results = []
+    for concurrency in args.concurrency:
+        print(f"Running {concurrency} concurrent interviews...", file=sys.stderr)
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--run-level", str(concurrency),
+             "--questions", str(args.questions), "--answer-words", str(args.answer_words),
+             "--think-time", str(args.think_time),
+             "--latency-ms", str(args.latency_ms), "--stream-delay", str(args.stream_delay)],
+            stdout=subprocess.PIPE, text=True, check=True).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    print_results(results)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,225 @@
+#!/usr/bin/env python
+"""
+Completion Outbox
+
+Durable outbox for the side effects of completing an interview (the NocoDB status update,
+the local answers file and the Azure blob upload). The Streamlit script only records the
+work in a local SQLite file and returns. Background workers then carry it out and retry
+failures with exponential backoff. The answers are on disk from the moment the candidate
+submits, so a slow or failing NocoDB or Azure never blocks the candidate or loses data.
+
+Each entry has an idempotency key: enqueueing the same key twice is a no-op, and every
+handler must be safe to run more than once (an entry can be retried after a partial
+failure, or after a crash mid-attempt). Claims expire, so entries left behind by a
+stopped process are picked up by the next one. Entries that keep failing are marked
+failed after max_attempts and kept for inspection.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from deadlines import deadline_scope
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_PATH = os.environ.get('INTERVIEW_OUTBOX_PATH', os.path.join(os.getcwd(), ".interview_outbox.sqlite3"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    key TEXT UNIQUE,
+    kind TEXT,
+    payload TEXT,
+    status TEXT DEFAULT 'pending',
+    attempts INTEGER DEFAULT 0,
+    next_attempt_at REAL,
+    claimed_until REAL,
+    last_error TEXT,
+    created_at REAL,
+    done_at REAL
+);
+CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_attempt_at);
+"""
+
+class CompletionOutbox:
+    """SQLite-backed outbox with background workers. Safe to share between threads."""
+
+    def __init__(self, db_path: str = OUTBOX_PATH, workers: int = 2, max_attempts: int = 10,
+                 base_delay: float = 2, max_delay: float = 300, attempt_deadline: float = 60,
+                 poll_interval: float = 1, retention_seconds: float = 7 * 24 * 3600):
+        """
+        Args:
+            db_path (str): SQLite file holding the outbox
+            workers (int): Number of background worker threads
+            max_attempts (int): Attempts before an entry is marked failed
+            base_delay (float): Seconds before the first retry, doubled after each failure
+            max_delay (float): Longest wait between retries
+            attempt_deadline (float): Time budget for one attempt (see deadlines.py)
+            poll_interval (float): Seconds between checks for due retries when idle
+            retention_seconds (float): How long completed entries are kept
+        """
+        self.db_path = db_path
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.attempt_deadline = attempt_deadline
+        self.poll_interval = poll_interval
+        self.handlers: Dict[str, Callable[[Dict[str, Any]], Any]] = {}
+        self.threads = []
+        self.stop_event = threading.Event()
+        self.wake_event = threading.Event()
+
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        # Autocommit mode; claims use explicit immediate transactions so several processes
+        # sharing the file never claim the same entry
+        self.conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self.lock = threading.Lock()
+        with self.lock:
+            self.conn.execute("DELETE FROM outbox WHERE status = 'done' AND done_at < ?",
+                              (time.time() - retention_seconds,))
+
+    def register(self, kind: str, handler: Callable[[Dict[str, Any]], Any]) -> None:
+        """Register the handler for entries of a kind. It receives the payload and raises on failure."""
+        self.handlers[kind] = handler
+
+    def enqueue(self, key: str, kind: str, payload: Dict[str, Any], delay: float = 0) -> bool:
+        """
+        Durably record a side effect to carry out in the background.
+
+        Args:
+            key (str): Idempotency key; an entry with the same key is never added twice
+            kind (str): Handler to run
+            payload (dict): JSON-serialisable handler input
+            delay (float): Seconds before the first attempt
+
+        Returns:
+            bool: False if an entry with this key already existed
+        """
+        now = time.time()
+        with self.lock:
+            cursor = self.conn.execute(
+                "INSERT OR IGNORE INTO outbox (key, kind, payload, next_attempt_at, created_at) VALUES (?, ?, ?, ?, ?)",
+                (key, kind, json.dumps(payload), now + delay, now))
+        self.wake_event.set()
+        return cursor.rowcount > 0
+
+    def get_status(self, keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Return status, attempts and last error of the given entries, keyed by key."""
+        keys = list(keys)
+        if not keys:
+            return {}
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT key, status, attempts, last_error FROM outbox WHERE key IN ({','.join('?' * len(keys))})",
+                keys).fetchall()
+        return {key: {"status": status, "attempts": attempts, "last_error": last_error}
+                for key, status, attempts, last_error in rows}
+
+    def count_pending(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM outbox WHERE status = 'pending'").fetchone()[0]
+
+    def start(self) -> None:
+        """Start the background workers."""
+        self.stop_event.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker_loop, name=f"outbox-worker-{i}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        logger.info(f"Completion outbox started with {self.workers} workers, "
+                    f"{self.count_pending()} entries pending")
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self.stop_event.set()
+        self.wake_event.set()
+        for thread in self.threads:
+            thread.join(timeout)
+        self.threads = []
+
+    def process_due(self) -> int:
+        """Run every entry that is due on the caller's thread. Returns the number attempted."""
+        attempted = 0
+        while True:
+            entry = self._claim_next()
+            if entry is None:
+                return attempted
+            self._attempt(entry)
+            attempted += 1
+
+    def _worker_loop(self) -> None:
+        failures = 0
+        while not self.stop_event.is_set():
+            try:
+                processed = self.process_due()
+            except Exception as e:
+                # E.g. the outbox file is locked or the disk is full. Claimed entries are
+                # picked up again once their claim lapses, so keep the worker alive and back off.
+                failures += 1
+                delay = min(self.max_delay, self.base_delay * (2 ** (failures - 1)))
+                logger.error(f"✗ Outbox worker error, retrying in {delay:.0f}s: {str(e)}")
+                self.stop_event.wait(delay)
+                continue
+            failures = 0
+            if processed == 0:
+                self.wake_event.wait(self.poll_interval)
+                self.wake_event.clear()
+
+    def _claim_next(self) -> Optional[Dict[str, Any]]:
+        kinds = list(self.handlers)
+        if not kinds:
+            return None
+        now = time.time()
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self.conn.execute(
+                    f"SELECT id, key, kind, payload, attempts FROM outbox "
+                    f"WHERE status = 'pending' AND next_attempt_at <= ? "
+                    f"AND (claimed_until IS NULL OR claimed_until < ?) AND kind IN ({','.join('?' * len(kinds))}) "
+                    f"ORDER BY next_attempt_at, id LIMIT 1", [now, now] + kinds).fetchone()
+                if row is not None:
+                    # The claim outlives one attempt, so only a crashed process lets it lapse
+                    self.conn.execute("UPDATE outbox SET claimed_until = ? WHERE id = ?",
+                                      (now + self.attempt_deadline * 2, row[0]))
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        entry_id, key, kind, payload, attempts = row
+        return {"id": entry_id, "key": key, "kind": kind, "payload": json.loads(payload), "attempts": attempts}
+
+    def _attempt(self, entry: Dict[str, Any]) -> None:
+        try:
+            with deadline_scope(self.attempt_deadline, f"outbox {entry['kind']}"):
+                self.handlers[entry["kind"]](entry["payload"])
+        except Exception as e:
+            attempts = entry["attempts"] + 1
+            if attempts >= self.max_attempts:
+                logger.error(f"✗ Outbox entry {entry['key']} failed after {attempts} attempts: {str(e)}")
+                status, next_attempt_at = "failed", None
+            else:
+                delay = min(self.max_delay, self.base_delay * (2 ** (attempts - 1)))
+                logger.warning(f"Outbox entry {entry['key']} failed (attempt {attempts} of {self.max_attempts}), "
+                               f"retrying in {delay:.0f}s: {str(e)}")
+                status, next_attempt_at = "pending", time.time() + delay
+            with self.lock:
+                self.conn.execute(
+                    "UPDATE outbox SET status = ?, attempts = ?, next_attempt_at = ?, claimed_until = NULL, "
+                    "last_error = ? WHERE id = ?", (status, attempts, next_attempt_at, str(e), entry["id"]))
+            return
+
+        with self.lock:
+            self.conn.execute(
+                "UPDATE outbox SET status = 'done', attempts = ?, claimed_until = NULL, last_error = NULL, "
+                "done_at = ? WHERE id = ?", (entry["attempts"] + 1, time.time(), entry["id"]))
+        logger.info(f"✓ Outbox entry {entry['key']} done")
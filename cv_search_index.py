@@ -0,0 +1,328 @@
+#!/usr/bin/env python
+"""
+CV Search Index
+
+Maintains an incremental full-text index (SQLite FTS5) over the CVs and job descriptions
+downloaded under roles/<role_id>_<role_name>/cvs|jd, keyed by role and candidate.
+
+Files are only re-indexed when their content hash changes. The index can be queried from
+Python with search() or from the command line:
+
+    python cv_search_index.py index
+    python cv_search_index.py search "project management" --role-id 12
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import hashlib
+import logging
+import argparse
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from pypdf import PdfReader
+except ImportError:  # PDF text extraction is optional
+    PdfReader = None
+
+logger = logging.getLogger(__name__)
+
+ROLES_DIR = os.path.join(os.getcwd(), "roles")
+SEARCH_INDEX_PATH = os.environ.get('CV_SEARCH_INDEX_PATH', os.path.join(ROLES_DIR, ".search_index.sqlite3"))
+
+# File types we can extract text from
+INDEXABLE_EXTENSIONS = ('.pdf', '.txt')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    path TEXT PRIMARY KEY,
+    role_id TEXT,
+    role_name TEXT,
+    kind TEXT,
+    candidate TEXT,
+    sha256 TEXT,
+    size INTEGER,
+    mtime REAL,
+    indexed_at TEXT
+);
+CREATE INDEX IF NOT EXISTS documents_role ON documents (role_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+    content, candidate, role_name, tokenize='porter unicode61'
+);
+"""
+
+def get_connection(db_path: str = SEARCH_INDEX_PATH) -> sqlite3.Connection:
+    """
+    Open the search index, creating its schema if needed.
+
+    Args:
+        db_path (str): Path to the SQLite index file
+
+    Returns:
+        sqlite3.Connection: Open connection with rows returned as sqlite3.Row
+    """
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+    # Sharded workers may index concurrently, so wait for locks rather than failing
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+def parse_role_path(file_path: str) -> Optional[Tuple[str, str, str]]:
+    """
+    Extract role ID, role name and document kind from a roles/<id>_<name>/<kind>/ path.
+
+    Args:
+        file_path (str): Path to a downloaded file
+
+    Returns:
+        Tuple[str, str, str]: Role ID, role name and kind ("cvs" or "jd"), or None
+    """
+    path_parts = os.path.abspath(file_path).split(os.sep)
+    if "roles" not in path_parts:
+        return None
+    roles_index = len(path_parts) - 1 - path_parts[::-1].index("roles")
+    if roles_index + 2 >= len(path_parts):
+        return None
+    role_parts = path_parts[roles_index + 1].split('_', 1)
+    if len(role_parts) < 2:
+        return None
+    return role_parts[0], role_parts[1], path_parts[roles_index + 2]
+
+def extract_text(file_path: str) -> Optional[str]:
+    """
+    Extract plain text from a PDF or text file.
+
+    Args:
+        file_path (str): Path to the file
+
+    Returns:
+        str: Extracted text, or None if the file type is not supported
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension == '.txt':
+        with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+            return f.read()
+    if extension == '.pdf':
+        if PdfReader is None:
+            logger.warning(f"pypdf is not installed, cannot extract text from {file_path}")
+            return None
+        reader = PdfReader(file_path)
+        return "\n".join(page.extract_text() or "" for page in reader.pages)
+    return None
+
+def index_file(conn: sqlite3.Connection, file_path: str, candidate: str = None) -> str:
+    """
+    Add or refresh a single file in the index if its content changed.
+
+    Args:
+        conn (sqlite3.Connection): Open index connection
+        file_path (str): Path to the file to index
+        candidate (str, optional): Candidate name for CVs; kept from the previous
+            index entry (or derived from the filename) if not given
+
+    Returns:
+        str: "indexed", "unchanged" or "skipped"
+    """
+    file_path = os.path.abspath(file_path)
+    role_info = parse_role_path(file_path)
+    if role_info is None or not file_path.lower().endswith(INDEXABLE_EXTENSIONS):
+        return "skipped"
+    role_id, role_name, kind = role_info
+
+    stat = os.stat(file_path)
+    existing = conn.execute(
+        "SELECT rowid, sha256, size, mtime, candidate FROM documents WHERE path = ?", (file_path,)
+    ).fetchone()
+
+    # Cheap check first: same size and mtime means the file was not touched
+    if existing and existing["size"] == stat.st_size and existing["mtime"] == stat.st_mtime \
+            and (candidate is None or candidate == existing["candidate"]):
+        return "unchanged"
+
+    with open(file_path, 'rb') as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+
+    if candidate is None:
+        if existing and existing["candidate"]:
+            candidate = existing["candidate"]
+        elif kind == "cvs":
+            candidate = os.path.splitext(os.path.basename(file_path))[0]
+
+    if existing and existing["sha256"] == digest and candidate == existing["candidate"]:
+        conn.execute("UPDATE documents SET size = ?, mtime = ? WHERE rowid = ?",
+                     (stat.st_size, stat.st_mtime, existing["rowid"]))
+        return "unchanged"
+
+    text = extract_text(file_path)
+    if text is None:
+        return "skipped"
+
+    values = (role_id, role_name, kind, candidate, digest, stat.st_size, stat.st_mtime,
+              datetime.now().isoformat())
+    if existing:
+        rowid = existing["rowid"]
+        conn.execute(
+            "UPDATE documents SET role_id = ?, role_name = ?, kind = ?, candidate = ?, sha256 = ?, "
+            "size = ?, mtime = ?, indexed_at = ? WHERE rowid = ?", values + (rowid,))
+        conn.execute("DELETE FROM documents_fts WHERE rowid = ?", (rowid,))
+    else:
+        rowid = conn.execute(
+            "INSERT INTO documents (path, role_id, role_name, kind, candidate, sha256, size, mtime, "
+            "indexed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", (file_path,) + values).lastrowid
+    conn.execute("INSERT INTO documents_fts (rowid, content, candidate, role_name) VALUES (?, ?, ?, ?)",
+                 (rowid, text, candidate or "", role_name.replace('_', ' ')))
+    return "indexed"
+
+def index_files(file_paths: List[str], candidates: Dict[str, str] = None,
+                db_path: str = SEARCH_INDEX_PATH) -> Dict[str, int]:
+    """
+    Index a batch of downloaded files, re-indexing only those whose hash changed.
+
+    Args:
+        file_paths (List[str]): Paths of downloaded files
+        candidates (Dict[str, str], optional): Candidate name for each CV path
+        db_path (str): Path to the SQLite index file
+
+    Returns:
+        Dict[str, int]: Number of files indexed, unchanged, skipped and failed
+    """
+    candidates = candidates or {}
+    counts = {"indexed": 0, "unchanged": 0, "skipped": 0, "failed": 0}
+    conn = get_connection(db_path)
+    try:
+        for file_path in file_paths:
+            try:
+                outcome = index_file(conn, file_path, candidates.get(file_path))
+                counts[outcome] += 1
+            except Exception as e:
+                logger.error(f"Error indexing {file_path}: {str(e)}")
+                counts["failed"] += 1
+            conn.commit()
+    finally:
+        conn.close()
+    logger.info(f"Search index updated: {counts['indexed']} indexed, {counts['unchanged']} unchanged, "
+                f"{counts['skipped']} skipped, {counts['failed']} failed")
+    return counts
+
+def index_roles_directory(roles_dir: str = ROLES_DIR, db_path: str = SEARCH_INDEX_PATH) -> Dict[str, int]:
+    """
+    Index every CV and job description under the roles directory and drop entries for
+    files that no longer exist.
+
+    Args:
+        roles_dir (str): Top-level "roles" directory
+        db_path (str): Path to the SQLite index file
+
+    Returns:
+        Dict[str, int]: Counts from index_files plus the number of removed entries
+    """
+    file_paths = []
+    for role_dir in sorted(os.listdir(roles_dir)) if os.path.isdir(roles_dir) else []:
+        for kind in ("cvs", "jd"):
+            kind_dir = os.path.join(roles_dir, role_dir, kind)
+            if os.path.isdir(kind_dir):
+                file_paths.extend(os.path.join(kind_dir, name) for name in sorted(os.listdir(kind_dir)))
+    counts = index_files(file_paths, db_path=db_path)
+
+    conn = get_connection(db_path)
+    try:
+        removed = 0
+        for row in conn.execute("SELECT rowid, path FROM documents").fetchall():
+            if not os.path.exists(row["path"]):
+                conn.execute("DELETE FROM documents WHERE rowid = ?", (row["rowid"],))
+                conn.execute("DELETE FROM documents_fts WHERE rowid = ?", (row["rowid"],))
+                removed += 1
+        conn.commit()
+    finally:
+        conn.close()
+    counts["removed"] = removed
+    return counts
+
+def build_match_query(query: str) -> str:
+    """Quote each search term so user input cannot break FTS5 query syntax."""
+    return " ".join('"{}"'.format(term.replace('"', '""')) for term in query.split())
+
+def search(query: str, limit: int = 20, role_id: str = None, kind: str = None, raw: bool = False,
+           db_path: str = SEARCH_INDEX_PATH) -> List[Dict]:
+    """
+    Search indexed CVs and job descriptions, best matches first.
+
+    Args:
+        query (str): Search terms; all terms must match
+        limit (int): Maximum number of hits
+        role_id (str, optional): Restrict results to one role
+        kind (str, optional): Restrict results to "cvs" or "jd"
+        raw (bool): Pass the query to FTS5 unchanged (allows OR, NEAR, prefix* etc.)
+        db_path (str): Path to the SQLite index file
+
+    Returns:
+        List[Dict]: Hits with role, candidate, path, score and a highlighted snippet; empty if
+        the query has no search terms
+    """
+    match_query = query if raw else build_match_query(query)
+    if not match_query.strip():
+        # An empty MATCH is an FTS5 syntax error
+        return []
+    sql = ("SELECT d.role_id, d.role_name, d.kind, d.candidate, d.path, "
+           "bm25(documents_fts) AS score, "
+           "snippet(documents_fts, 0, '[', ']', '...', 12) AS snippet "
+           "FROM documents_fts JOIN documents d ON d.rowid = documents_fts.rowid "
+           "WHERE documents_fts MATCH ?")
+    args = [match_query]
+    if role_id is not None:
+        sql += " AND d.role_id = ?"
+        args.append(str(role_id))
+    if kind is not None:
+        sql += " AND d.kind = ?"
+        args.append(kind)
+    sql += " ORDER BY score LIMIT ?"
+    args.append(limit)
+
+    conn = get_connection(db_path)
+    try:
+        return [dict(row) for row in conn.execute(sql, args).fetchall()]
+    finally:
+        conn.close()
+
+def main():
+    """Command-line entry point for indexing and searching."""
+    parser = argparse.ArgumentParser(description='Full-text search over downloaded CVs and job descriptions')
+    parser.add_argument('--db', default=SEARCH_INDEX_PATH, help='Path to the search index')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    index_parser = subparsers.add_parser('index', help='Index new and changed files under roles/')
+    index_parser.add_argument('--roles-dir', default=ROLES_DIR, help='Top-level roles directory')
+
+    search_parser = subparsers.add_parser('search', help='Search the index')
+    search_parser.add_argument('query', help='Search terms')
+    search_parser.add_argument('--role-id', help='Restrict results to one role')
+    search_parser.add_argument('--kind', choices=['cvs', 'jd'], help='Restrict results to CVs or JDs')
+    search_parser.add_argument('--limit', type=int, default=20, help='Maximum number of hits')
+    search_parser.add_argument('--raw', action='store_true', help='Use raw FTS5 query syntax')
+
+    args = parser.parse_args()
+
+    if args.command == 'index':
+        logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+        counts = index_roles_directory(args.roles_dir, args.db)
+        print(f"Indexed {counts['indexed']}, unchanged {counts['unchanged']}, "
+              f"skipped {counts['skipped']}, failed {counts['failed']}, removed {counts['removed']}")
+        return 0
+
+    start = time.perf_counter()
+    hits = search(args.query, args.limit, args.role_id, args.kind, args.raw, args.db)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    for hit in hits:
+        print(f"{hit['score']:8.3f}  role {hit['role_id']} {hit['role_name']}  "
+              f"[{hit['kind']}] {hit['candidate'] or '-'}")
+        print(f"          {hit['path']}")
+        print(f"          {' '.join(hit['snippet'].split())}")
+    print(f"{len(hits)} hits in {elapsed_ms:.1f} ms")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
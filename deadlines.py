@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+"""
+Deadlines
+
+Time budgets for units of work that make outbound calls: a webhook job, a scheduling
+cycle, or a page render in the Streamlit app. The unit opens a deadline_scope(). Inside
+that scope, every outbound call caps its own connect/read timeout to the time remaining,
+and once the budget is spent it raises DeadlineExceeded before sending anything. Work
+that cannot finish in time is therefore cancelled and reported, not left piling up
+behind a hung connection.
+
+The current deadline is a context variable. Work handed to thread pools must run in a
+copy of the caller's context to stay within the budget, e.g. through
+contextvars.copy_context().run or scheduler_metrics.propagate_context(). Threads started
+directly begin with an empty context and so have no deadline.
+"""
+
+import time
+import contextvars
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+class DeadlineExceeded(Exception):
+    """Raised when work is attempted after its deadline has passed."""
+
+class Deadline:
+    """A point in time (on the monotonic clock) by which a unit of work must finish."""
+
+    def __init__(self, seconds: float, name: str = "work"):
+        self.name = name
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        """Seconds left, never negative."""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def check(self) -> None:
+        """Raise DeadlineExceeded if the deadline has passed."""
+        if self.expired():
+            raise DeadlineExceeded(f"{self.name} exceeded its {self.seconds:g}s deadline")
+
+    def cap(self, timeout: float) -> float:
+        """Return timeout limited to the time remaining. Raises DeadlineExceeded if none is left."""
+        self.check()
+        return min(timeout, self.remaining())
+
+_current_deadline: contextvars.ContextVar[Optional[Deadline]] = contextvars.ContextVar(
+    "current_deadline", default=None)
+
+def current_deadline() -> Optional[Deadline]:
+    """Return the deadline of the innermost deadline_scope(), if any."""
+    return _current_deadline.get()
+
+@contextmanager
+def deadline_scope(seconds: Optional[float], name: str = "work") -> Iterator[Optional[Deadline]]:
+    """
+    Run the enclosed block under a deadline.
+
+    A scope nested inside another never extends the outer budget: the earlier deadline wins.
+
+    Args:
+        seconds (float): Budget for the block, or None for no deadline of its own
+        name (str): Name of the unit of work, used in DeadlineExceeded messages
+
+    Yields:
+        Deadline: The deadline in force inside the block (None if there is none)
+    """
+    outer = _current_deadline.get()
+    deadline = Deadline(seconds, name) if seconds is not None else outer
+    if outer is not None and deadline is not None and outer.expires_at < deadline.expires_at:
+        deadline = outer
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+def check_deadline() -> None:
+    """Raise DeadlineExceeded if the current deadline (if any) has passed."""
+    deadline = _current_deadline.get()
+    if deadline is not None:
+        deadline.check()
+
+def deadline_expired() -> bool:
+    """Whether the current deadline (if any) has passed."""
+    deadline = _current_deadline.get()
+    return deadline is not None and deadline.expired()
+
+def call_timeout(timeout: float) -> float:
+    """Return a per-call timeout capped by the current deadline (if any).
+    Raises DeadlineExceeded if the deadline has already passed."""
+    deadline = _current_deadline.get()
+    return deadline.cap(timeout) if deadline is not None else timeout
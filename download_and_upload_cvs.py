@@ -8,16 +8,22 @@ and then uploads them to Azure Blob Storage using credentials from .streamlit/se
 """
 
 import os
-import requests
+import hashlib
 import logging
 import time
 import json
 import toml
 import traceback
+import fcntl
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from azure.storage.blob import BlobServiceClient
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 from flask import Flask, request, jsonify
+from lease_store import LeaseStore, FileLeaseStore, LeaseKeeper, default_owner_id
+from cv_search_index import index_files
+from nocodb_client import NocoDBClient, NocoDBError, JOBS_TABLE
+from deadlines import deadline_scope, deadline_expired, call_timeout
 
 # Configure logging
 logging.basicConfig(
@@ -30,25 +36,11 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# API Token
-TOKEN = 'EgEls5yPpzOqhGdtL1CDcZkNolXhQhIFfwd4DIe0'
-
-# API configuration
-headers = {
-    'accept': 'application/json',
-    'xc-token': TOKEN,
-    'Content-Type': 'application/json'  # Add Content-Type for PATCH requests
-}
-
-# Base URLs
-BASE_API_URL = "http://20.254.105.163:8080/api/v2"
-BASE_URL = "http://20.254.105.163:8080"
-
-# Table and field IDs from example URL
-TABLE_ID = "m0ro5phcebcdbt7"  # From example URL
+# Shared pooled NocoDB client (see nocodb_client.py for the NOCODB_* settings)
+nocodb = NocoDBClient()
 
 # API endpoints
-jobs_url = f"{BASE_API_URL}/tables/mgwvuug18vkrhg0/records"
+jobs_url = nocodb.records_url(JOBS_TABLE)
 
 # Load Azure Storage settings from .streamlit/secrets.toml
 secrets_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.streamlit', 'secrets.toml')
@@ -62,64 +54,50 @@ except Exception as e:
     logger.error(f"Error loading Azure credentials from secrets file: {str(e)}")
     raise ValueError("Azure Storage credentials not available in .streamlit/secrets.toml")
 
-def fetch_data(url: str, params: Dict = None) -> List[Dict]:
-    """Fetch data from API with pagination support."""
-    if params is None:
-        params = {}
-    
-    default_params = {
-        'limit': 100,
-        'shuffle': 0,
-        'offset': 0
-    }
-    
-    # Merge default params with provided params
-    for key, value in default_params.items():
-        if key not in params:
-            params[key] = value
-    
+# Generated text artifacts (AM Comments, JD error notes) are only rewritten and re-uploaded
+# when their content changes. Set CV_NO_DISK=1 to skip the local copies entirely and
+# upload them straight from memory.
+NO_DISK_MODE = os.environ.get('CV_NO_DISK', '').lower() in ('1', 'true', 'yes')
+
+# Manifest of blob path -> SHA-256 of the last uploaded version of each text artifact.
+# Each run reads it afresh and tracks its own uploads (see new_artifact_run), so runs on
+# webhook threads never share state.
+ARTIFACT_MANIFEST_PATH = os.path.join(os.getcwd(), "roles", ".artifact_manifest.json")
+
+# Lease store used to give each role a single owner across workers. Point CV_LEASE_DIR at a
+# shared directory to coordinate workers on several hosts. A role's lease is held, and renewed
+# every third of its TTL, while its files are downloaded and uploaded.
+LEASE_DIR = os.environ.get('CV_LEASE_DIR', os.path.join(os.getcwd(), "roles", ".leases"))
+ROLE_LEASE_TTL_SECONDS = int(os.environ.get('CV_ROLE_LEASE_TTL', 900))
+
+# Index downloaded CVs and JDs for full-text search (see cv_search_index.py)
+SEARCH_INDEX_ENABLED = os.environ.get('CV_SEARCH_INDEX', '1').lower() not in ('0', 'false', 'no')
+
+# Timeouts for Azure Blob Storage calls, and the overall time budget of one webhook job.
+# A job that runs out of time stops downloading and uploading, reports what it could not
+# finish and leaves the role status unchanged; the next run picks up the rest.
+AZURE_CONNECT_TIMEOUT = float(os.environ.get('AZURE_CONNECT_TIMEOUT', 10))
+AZURE_READ_TIMEOUT = float(os.environ.get('AZURE_READ_TIMEOUT', 120))
+WEBHOOK_JOB_DEADLINE_SECONDS = float(os.environ.get('CV_WEBHOOK_DEADLINE', 900))
+
+def fetch_data(table: str, params: Dict = None) -> List[Dict]:
+    """Fetch every record of a table, following pagination."""
     all_records = []
-    offset = 0
-    total_records = None
-    
-    while True:
-        params['offset'] = offset
-        response = requests.get(url, headers=headers, params=params)
-        
-        if response.status_code != 200:
-            logger.error(f"Failed to fetch data. Status code: {response.status_code}")
-            logger.error(f"Error: {response.text}")
-            break
-            
-        data = response.json()
-        records = data.get('list', [])
-        all_records.extend(records)
-        
-        # Set total records count if not yet set
-        if total_records is None:
-            total_records = data.get('pageInfo', {}).get('totalRows', 0)
-            
-        # Break if we've fetched all records or no records returned
-        if not records or len(all_records) >= total_records:
-            break
-            
-        offset += len(records)
+    try:
+        all_records.extend(nocodb.iter_records(table, params))
+    except Exception as e:
+        logger.error(f"Failed to fetch data from table {table}: {str(e)}")
     
-    logger.info(f"Fetched {len(all_records)} records from {url}")
+    logger.info(f"Fetched {len(all_records)} records from table {table}")
     return all_records
 
-def download_cv(cv_url: str, output_path: str) -> bool:
-    """Download CV file from the given URL."""
+def download_cv(cv_path: str, output_path: str) -> bool:
+    """Download a CV (or other attachment) from its NocoDB path or URL."""
     try:
-        # Make a copy of the headers for the download request
-        download_headers = headers.copy()
-        # For file downloads, we need different accept header
-        download_headers['accept'] = '*/*'
+        logger.info(f"Download path: {cv_path}")
         
-        logger.info(f"Download URL: {cv_url}")
-        
-        # Get the file with the authentication token
-        response = requests.get(cv_url, headers=download_headers, stream=True)
+        # Get the file with the authentication token over the pooled session
+        response = nocodb.download(cv_path)
         
         if response.status_code != 200:
             logger.error(f"Failed to download CV. Status code: {response.status_code}")
@@ -151,60 +129,193 @@ def sanitize_filename(filename: str) -> str:
     filename = filename.replace(' ', '_')
     return filename
 
-def save_am_comments_to_file(role_id: str, role_title: str, comments) -> str:
+def get_role_dir_path(role_id: str, role_title: str, subdirectory: str) -> str:
     """
-    Save AM Comments to a text file in the jd directory.
+    Build the local directory path for a role subdirectory (cvs, jd, ...).
     
     Args:
         role_id (str): ID of the role
         role_title (str): Title of the role
-        comments: AM Comments to save (any type, will be converted to string)
+        subdirectory (str): Subdirectory inside the role directory
         
     Returns:
-        str: Path to the saved file
+        str: Path in the form roles/<role_id>_<role_title>/<subdirectory>
     """
-    # Create a top-level "roles" directory
-    base_dir = os.path.join(os.getcwd(), "roles")
+    role_dir_name = f"{role_id}_{sanitize_filename(role_title)}"
+    return os.path.join(os.getcwd(), "roles", role_dir_name, subdirectory)
+
+def get_role_blob_path(role_id: str, role_name: str, subdirectory: str, filename: str) -> str:
+    """Build the blob path roles/<role_id>_<role_name>/<subdirectory>/<filename>."""
+    return f"roles/{role_id}_{sanitize_filename(role_name)}/{subdirectory}/{filename}"
+
+def content_hash(content: bytes) -> str:
+    """Return the SHA-256 hex digest of the given content."""
+    return hashlib.sha256(content).hexdigest()
+
+def file_hash(file_path: str) -> Optional[str]:
+    """Return the SHA-256 hex digest of a local file, or None if it does not exist."""
+    try:
+        with open(file_path, 'rb') as f:
+            return content_hash(f.read())
+    except FileNotFoundError:
+        return None
+
+def load_artifact_manifest() -> Dict[str, str]:
+    """
+    Read the manifest of uploaded text artifacts from disk, under the manifest's file lock
+    so a concurrent save is never read half-written.
     
-    # Sanitize role name for directory creation
-    sanitized_role_title = sanitize_filename(role_title)
-    role_dir_name = f"{role_id}_{sanitized_role_title}"
+    Returns:
+        Dict[str, str]: Mapping of blob path to the hash of the last uploaded content
+    """
+    try:
+        os.makedirs(os.path.dirname(ARTIFACT_MANIFEST_PATH), exist_ok=True)
+        with open(f"{ARTIFACT_MANIFEST_PATH}.lock", 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_SH)
+            try:
+                with open(ARTIFACT_MANIFEST_PATH, 'r') as f:
+                    return json.load(f)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        logger.warning(f"Could not read artifact manifest, starting fresh: {str(e)}")
+        return {}
+
+def new_artifact_run() -> Dict[str, Any]:
+    """
+    Start tracking the text artifacts of one run.
     
-    # Create role directory structure with jd subdirectory
-    role_dir_path = os.path.join(base_dir, role_dir_name)
-    jd_dir_path = os.path.join(role_dir_path, "jd")
+    Returns:
+        Dict[str, Any]: "manifest", the manifest as read at the start of the run, and
+        "uploaded", the blob paths this run uploaded
+    """
+    return {"manifest": load_artifact_manifest(), "uploaded": []}
+
+def save_artifact_manifest(artifacts: Dict[str, Any]) -> None:
+    """
+    Atomically persist the entries a run uploaded.
     
-    # Create directory structure if it doesn't exist
-    os.makedirs(jd_dir_path, exist_ok=True)
+    They are merged into the manifest on disk under a file lock, so sharded workers and
+    concurrent runs never drop each other's entries.
+    
+    Args:
+        artifacts (Dict[str, Any]): The run's artifact state from new_artifact_run
+    """
+    if not artifacts["uploaded"]:
+        return
+    try:
+        os.makedirs(os.path.dirname(ARTIFACT_MANIFEST_PATH), exist_ok=True)
+        with open(f"{ARTIFACT_MANIFEST_PATH}.lock", 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                try:
+                    with open(ARTIFACT_MANIFEST_PATH, 'r') as f:
+                        merged = json.load(f)
+                except (FileNotFoundError, ValueError):
+                    merged = {}
+                for blob_filename in artifacts["uploaded"]:
+                    merged[blob_filename] = artifacts["manifest"][blob_filename]
+                
+                tmp_path = f"{ARTIFACT_MANIFEST_PATH}.{os.getpid()}.tmp"
+                with open(tmp_path, 'w') as f:
+                    json.dump(merged, f, indent=2, sort_keys=True)
+                os.replace(tmp_path, ARTIFACT_MANIFEST_PATH)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+    except Exception as e:
+        logger.error(f"Error saving artifact manifest: {str(e)}")
+
+def sync_text_artifact(role_id: str, role_title: str, filename: str, content: str,
+                       artifacts: Dict[str, Any]) -> Optional[str]:
+    """
+    Write and upload a generated text artifact only when its content has changed.
+    
+    The content is rendered in memory by the caller and compared by hash with the local
+    copy and with the version last uploaded to blob storage. In no-disk mode the local
+    copy is skipped and the content is uploaded straight from memory.
+    
+    Args:
+        role_id (str): ID of the role
+        role_title (str): Title of the role
+        filename (str): Name of the artifact inside the role's jd directory
+        content (str): Rendered artifact content
+        artifacts (Dict[str, Any]): The run's artifact state from new_artifact_run
+        
+    Returns:
+        str: Local path of the artifact (blob path in no-disk mode)
+    """
+    data = content.encode('utf-8')
+    digest = content_hash(data)
+    blob_filename = get_role_blob_path(role_id, role_title, "jd", filename)
+    location = blob_filename
+    
+    if not NO_DISK_MODE:
+        jd_dir_path = get_role_dir_path(role_id, role_title, "jd")
+        os.makedirs(jd_dir_path, exist_ok=True)
+        location = os.path.join(jd_dir_path, filename)
+        
+        if file_hash(location) == digest:
+            logger.info(f"Unchanged, skipping write: {location}")
+        else:
+            with open(location, 'wb') as f:
+                f.write(data)
+            logger.info(f"Wrote {location}")
+    
+    manifest = artifacts["manifest"]
+    if manifest.get(blob_filename) == digest:
+        logger.info(f"Unchanged since last upload, skipping: {blob_filename}")
+        return location
     
-    # Create output file path
-    output_path = os.path.join(jd_dir_path, "am_insight.txt")
+    if upload_content_to_blob_storage(data, blob_filename):
+        manifest[blob_filename] = digest
+        artifacts["uploaded"].append(blob_filename)
+    return location
+
+def render_am_comments(comments) -> str:
+    """
+    Render AM Comments as the text stored in am_insight.txt.
     
-    # Convert comments to string and write to file
+    Args:
+        comments: AM Comments from the API (any type, will be converted to string)
+        
+    Returns:
+        str: Rendered comments
+    """
     try:
         # Handle various types that might come from the API
         if comments is None:
-            comments_str = "No AM comments available"
+            return "No AM comments available"
         elif isinstance(comments, (dict, list)):
-            comments_str = json.dumps(comments, indent=2)
+            return json.dumps(comments, indent=2)
         else:
-            comments_str = str(comments)
-            
-        # Write to file
-        with open(output_path, 'w') as f:
-            f.write(comments_str)
-        
-        logger.info(f"Saved AM Comments to {output_path}")
-        return output_path
+            return str(comments)
     except Exception as e:
-        logger.error(f"Error saving AM Comments: {str(e)}")
+        logger.error(f"Error rendering AM Comments: {str(e)}")
         logger.error(f"Comments type: {type(comments)}")
-        # Create empty file to avoid future issues
-        with open(output_path, 'w') as f:
-            f.write("Error processing AM Comments")
-        return output_path
+        return "Error processing AM Comments"
 
-def download_job_description(jd_file, role_id: str, role_title: str) -> str:
+def save_am_comments_to_file(role_id: str, role_title: str, comments, artifacts: Dict[str, Any]) -> str:
+    """
+    Save AM Comments to a text file in the jd directory and upload it if it changed.
+    
+    Args:
+        role_id (str): ID of the role
+        role_title (str): Title of the role
+        comments: AM Comments to save (any type, will be converted to string)
+        artifacts (Dict[str, Any]): The run's artifact state from new_artifact_run
+        
+    Returns:
+        str: Path to the saved file (blob path in no-disk mode)
+    """
+    output_path = sync_text_artifact(role_id, role_title, "am_insight.txt", render_am_comments(comments),
+                                     artifacts)
+    logger.info(f"AM Comments synced for role {role_id}: {output_path}")
+    return output_path
+
+def download_job_description(jd_file, role_id: str, role_title: str,
+                             artifacts: Dict[str, Any]) -> Optional[str]:
     """
     Download Job Description PDF file and save it to the jd directory.
     
@@ -212,6 +323,7 @@ def download_job_description(jd_file, role_id: str, role_title: str) -> str:
         jd_file: Job Description file information (dict or other type)
         role_id (str): ID of the role
         role_title (str): Title of the role
+        artifacts (Dict[str, Any]): The run's artifact state, for the error note
         
     Returns:
         str: Path to the downloaded file or None if failed
@@ -220,21 +332,13 @@ def download_job_description(jd_file, role_id: str, role_title: str) -> str:
         # Check if jd_file is a dictionary
         if not isinstance(jd_file, dict):
             logger.warning(f"Job Description file is not a dictionary: {type(jd_file)}")
-            # If not a dict, create an empty JD file with error message
-            base_dir = os.path.join(os.getcwd(), "roles")
-            sanitized_role_title = sanitize_filename(role_title)
-            role_dir_name = f"{role_id}_{sanitized_role_title}"
-            role_dir_path = os.path.join(base_dir, role_dir_name)
-            jd_dir_path = os.path.join(role_dir_path, "jd")
-            os.makedirs(jd_dir_path, exist_ok=True)
-            output_path = os.path.join(jd_dir_path, "jd_error.txt")
-            
-            with open(output_path, 'w') as f:
-                f.write(f"Error: Job Description is not in expected format. Type: {type(jd_file)}\n")
-                f.write(f"Value: {str(jd_file)}")
-            
-            logger.info(f"Created error file for Job Description: {output_path}")
-            return output_path
+            # If not a dict, record an error note instead. It is uploaded by
+            # sync_text_artifact, so it is not returned as a downloaded file.
+            error_text = (f"Error: Job Description is not in expected format. Type: {type(jd_file)}\n"
+                          f"Value: {str(jd_file)}")
+            output_path = sync_text_artifact(role_id, role_title, "jd_error.txt", error_text, artifacts)
+            logger.info(f"Synced error file for Job Description: {output_path}")
+            return None
             
         # Create a top-level "roles" directory
         base_dir = os.path.join(os.getcwd(), "roles")
@@ -260,15 +364,12 @@ def download_job_description(jd_file, role_id: str, role_title: str) -> str:
         file_title = jd_file.get("title", "job_description.pdf")
         file_title = sanitize_filename(file_title)
         
-        # Create full download URL
-        download_url = f"{BASE_URL}/{file_path}"
-        
         # Create output file path
         output_path = os.path.join(jd_dir_path, file_title)
         
         # Download the file
         logger.info(f"Downloading Job Description: {file_title}")
-        success = download_cv(download_url, output_path)
+        success = download_cv(file_path, output_path)
         
         if success:
             logger.info(f"Successfully downloaded Job Description to {output_path}")
@@ -282,158 +383,270 @@ def download_job_description(jd_file, role_id: str, role_title: str) -> str:
         logger.error(f"Job Description file data: {str(jd_file)[:200]}...")
         return None
 
-def process_roles_and_cvs() -> Tuple[int, List[str]]:
+def get_role_shard(role: Dict, shard_count: int, partition_by: str = "id") -> int:
+    """
+    Map a role to a shard using a stable hash of its ID or client.
+    
+    Args:
+        role (Dict): Role record from the API
+        shard_count (int): Total number of shards
+        partition_by (str): "id" to partition by role ID, "client" to keep a client's roles together
+        
+    Returns:
+        int: Shard index in the range [0, shard_count)
+    """
+    key = (role.get("Client") or "") if partition_by == "client" else role.get("Id")
+    digest = hashlib.md5(str(key).encode('utf-8')).hexdigest()
+    return int(digest, 16) % shard_count
+
+def process_role(role: Dict, base_dir: str, artifacts: Dict[str, Any],
+                 lease: LeaseKeeper = None) -> Dict[str, Any]:
+    """
+    Download the CVs, AM Comments, and Job Descriptions for a single role.
+    
+    Args:
+        role (Dict): Role record from the API, including its CV relations
+        base_dir (str): Top-level "roles" directory
+        artifacts (Dict[str, Any]): The run's artifact state from new_artifact_run
+        lease (LeaseKeeper, optional): The role's lease; CV downloads stop if it is lost
+        
+    Returns:
+        Dict[str, Any]: Counts of CVs found/downloaded, JDs downloaded, downloaded file paths,
+        and the candidate name for each downloaded CV
+    """
+    role_id = role.get("Id")  # Note: "Id" is capitalized in the API response
+    role_title = role.get("Job Title")
+    
+    total_cvs = 0
+    downloaded_cvs = 0
+    downloaded_jds = 0
+    downloaded_paths = []
+    candidates = {}
+    
+    # Sanitize role name for directory creation
+    sanitized_role_title = sanitize_filename(role_title)
+    role_dir_name = f"{role_id}_{sanitized_role_title}"
+    
+    # Create role directory structure with cvs subdirectory
+    role_dir_path = os.path.join(base_dir, role_dir_name)
+    cv_dir_path = os.path.join(role_dir_path, "cvs")
+    jd_dir_path = os.path.join(role_dir_path, "jd")
+    
+    # Create directory structure if it doesn't exist
+    os.makedirs(cv_dir_path, exist_ok=True)
+    os.makedirs(jd_dir_path, exist_ok=True)
+    
+    # Log the role being processed
+    client = role.get("Client", "No Client")
+    logger.info(f"Processing role: {role_title} (ID: {role_id}) for client: {client}")
+    
+    # Process AM Comments
+    try:
+        am_comments = role.get("AM Comments")
+        # Process even if None or empty - our function will handle this
+        logger.info(f"Processing AM Comments for role: {role_title}")
+        save_am_comments_to_file(role_id, role_title, am_comments, artifacts)
+    except Exception as e:
+        logger.error(f"Error processing AM Comments for role {role_title}: {str(e)}")
+            
+    # Process Job Description PDF
+    try:
+        jd_files = role.get("JobDescription (PDF)")
+        if jd_files:
+            logger.info(f"Found Job Description files for role: {role_title}")
+            
+            if isinstance(jd_files, list):
+                # Process each JD file if it's a list
+                logger.info(f"Processing {len(jd_files)} Job Description files")
+                for jd_file in jd_files:
+                    try:
+                        jd_path = download_job_description(jd_file, role_id, role_title, artifacts)
+                        if jd_path:
+                            downloaded_paths.append(jd_path)
+                            downloaded_jds += 1
+                            logger.info(f"Downloaded Job Description to: {jd_path}")
+                    except Exception as jd_err:
+                        logger.error(f"Error downloading a Job Description file: {str(jd_err)}")
+            
+            elif isinstance(jd_files, dict):
+                # Process a single JD file
+                logger.info("Processing single Job Description file")
+                jd_path = download_job_description(jd_files, role_id, role_title, artifacts)
+                if jd_path:
+                    downloaded_paths.append(jd_path)
+                    downloaded_jds += 1
+                    logger.info(f"Downloaded Job Description to: {jd_path}")
+                    
+            else:
+                # Handle unexpected types
+                logger.warning(f"Unexpected Job Description data type: {type(jd_files)}")
+                logger.warning(f"Job Description data: {jd_files}")
+        else:
+            logger.info(f"No Job Description files found for role: {role_title}")
+    except Exception as e:
+        logger.error(f"Error processing Job Description files for role {role_title}: {str(e)}")
+    
+    # Get CV relations for this role
+    cv_relations = role.get("nc_92rx___nc_m2m_JobDescription_CVs", [])
+    logger.info(f"Found {len(cv_relations)} CV relations for this role")
+    
+    for relation in cv_relations:
+        if deadline_expired():
+            logger.warning(f"Deadline reached, skipping the remaining CVs of role {role_title}")
+            break
+        if lease is not None and not lease.held():
+            logger.warning(f"✗ Lost the lease of role {role_title}, skipping its remaining CVs")
+            break
+        
+        cv = relation.get("CV")
+        if not cv:
+            continue
+            
+        # Get candidate name
+        first_name = cv.get("First Name", "")
+        last_name = cv.get("Last Name", "")
+        candidate_name = f"{first_name}_{last_name}".replace(" ", "_")
+        
+        # Process CV files - handle both null and array cases
+        cv_files = cv.get("CV")
+        if cv_files is None:
+            logger.warning(f"No CV files found for candidate {candidate_name}")
+            continue
+            
+        # Ensure cv_files is a list even if there's only one item
+        if not isinstance(cv_files, list):
+            logger.warning(f"CV field is not an array for candidate {candidate_name}")
+            continue
+            
+        if not cv_files:
+            logger.warning(f"Empty CV files array for candidate {candidate_name}")
+            continue
+            
+        # Process each CV file
+        for cv_file in cv_files:
+            total_cvs += 1
+            
+            # Get CV file path
+            file_path = cv_file.get("path")
+            if not file_path:
+                logger.warning(f"No path found for CV file")
+                continue
+            
+            # Get the file title (filename)
+            file_title = cv_file.get("title", "unknown.pdf")
+            
+            # Use the original filename without modification
+            output_path = os.path.join(cv_dir_path, file_title)
+            
+            # Download the CV
+            logger.info(f"Downloading CV for {candidate_name}: {file_title}")
+            success = download_cv(file_path, output_path)
+            if success:
+                downloaded_cvs += 1
+                downloaded_paths.append(output_path)
+                candidates[output_path] = f"{first_name} {last_name}".strip()
+                
+            # Add a small delay to avoid overwhelming the server
+            time.sleep(0.5)
+    
+    return {
+        "cvs_found": total_cvs,
+        "cvs_downloaded": downloaded_cvs,
+        "jds_downloaded": downloaded_jds,
+        "downloaded_paths": downloaded_paths,
+        "candidates": candidates
+    }
+
+def process_roles_and_cvs(shard_index: int = None, shard_count: int = 1, partition_by: str = "id",
+                          lease_store: LeaseStore = None) -> Tuple[int, List[str], int]:
     """
-    Process all roles and download associated CVs, AM Comments, and Job Descriptions.
+    Process all roles: download associated CVs, AM Comments, and Job Descriptions and
+    upload them to Azure Blob Storage.
+    
+    Generated text artifacts (AM Comments, JD error notes) are uploaded when their
+    content changed, and counted with the uploaded files.
     
+    In sharded mode only the roles mapped to shard_index are processed. Every role is
+    downloaded and uploaded under a lease that is renewed while the work runs, so
+    overlapping runs or workers never handle the same role at the same time; roles
+    leased by another worker are skipped.
+    
+    Args:
+        shard_index (int, optional): Shard to process, or None to process every role
+        shard_count (int): Total number of shards
+        partition_by (str): Partition key for sharding, "id" or "client"
+        lease_store (LeaseStore, optional): Lease store for role ownership
+        
     Returns:
-        Tuple[int, List[str]]: Number of downloaded files and list of downloaded file paths
+        Tuple[int, List[str], int]: Number of processed files, list of downloaded file paths,
+        and number of files uploaded (including text artifacts)
     """
     # Create a top-level "roles" directory for CVs
     base_dir = os.path.join(os.getcwd(), "roles")
     os.makedirs(base_dir, exist_ok=True)
+    artifacts = new_artifact_run()
     
     # Fetch all jobs (roles)
     logger.info("Fetching roles from API...")
-    roles = fetch_data(jobs_url)
+    roles = fetch_data(JOBS_TABLE)
     logger.info(f"Found {len(roles)} roles")
     
     total_cvs = 0
     downloaded_cvs = 0
     downloaded_jds = 0
     downloaded_paths = []
+    candidates = {}
+    uploaded_files = 0
+    processed_roles = 0
+    skipped_roles = 0
+    cancelled_roles = 0
+    
+    if lease_store is None:
+        lease_store = FileLeaseStore(LEASE_DIR)
+    owner = default_owner_id()
     
     # Process each role
     for role in roles:
-        role_id = role.get("Id")  # Note: "Id" is capitalized in the API response
+        role_id = role.get("Id")
         role_title = role.get("Job Title")
         if not role_title or not role_id:
             logger.warning("Role without ID or title found, skipping")
             continue
-            
-        # Sanitize role name for directory creation
-        sanitized_role_title = sanitize_filename(role_title)
-        role_dir_name = f"{role_id}_{sanitized_role_title}"
         
-        # Create role directory structure with cvs subdirectory
-        role_dir_path = os.path.join(base_dir, role_dir_name)
-        cv_dir_path = os.path.join(role_dir_path, "cvs")
-        jd_dir_path = os.path.join(role_dir_path, "jd")
+        if shard_index is not None and get_role_shard(role, shard_count, partition_by) != shard_index:
+            continue
         
-        # Create directory structure if it doesn't exist
-        os.makedirs(cv_dir_path, exist_ok=True)
-        os.makedirs(jd_dir_path, exist_ok=True)
+        if deadline_expired():
+            cancelled_roles += 1
+            continue
         
-        # Log the role being processed
-        client = role.get("Client", "No Client")
-        logger.info(f"Processing role: {role_title} (ID: {role_id}) for client: {client}")
+        lease_key = f"role-{role_id}"
+        if not lease_store.acquire(lease_key, owner, ROLE_LEASE_TTL_SECONDS):
+            logger.info(f"Role {role_title} (ID: {role_id}) is leased by another worker, skipping")
+            skipped_roles += 1
+            continue
         
-        # Process AM Comments
-        try:
-            am_comments = role.get("AM Comments")
-            # Process even if None or empty - our function will handle this
-            logger.info(f"Processing AM Comments for role: {role_title}")
-            am_comments_path = save_am_comments_to_file(role_id, role_title, am_comments)
-            if am_comments_path:
-                downloaded_paths.append(am_comments_path)
-                logger.info(f"AM Comments file created at: {am_comments_path}")
-        except Exception as e:
-            logger.error(f"Error processing AM Comments for role {role_title}: {str(e)}")
-                
-        # Process Job Description PDF
+        with LeaseKeeper(lease_store, lease_key, owner, ROLE_LEASE_TTL_SECONDS) as lease:
+            role_result = process_role(role, base_dir, artifacts, lease)
+            uploaded_files += upload_downloaded_files(role_result["downloaded_paths"], lease)
+        
+        processed_roles += 1
+        total_cvs += role_result["cvs_found"]
+        downloaded_cvs += role_result["cvs_downloaded"]
+        downloaded_jds += role_result["jds_downloaded"]
+        downloaded_paths.extend(role_result["downloaded_paths"])
+        candidates.update(role_result["candidates"])
+    
+    save_artifact_manifest(artifacts)
+    artifacts_uploaded = len(artifacts["uploaded"])
+    uploaded_files += artifacts_uploaded
+    
+    # Keep the full-text search index in step with the downloaded files
+    if SEARCH_INDEX_ENABLED:
         try:
-            jd_files = role.get("JobDescription (PDF)")
-            if jd_files:
-                logger.info(f"Found Job Description files for role: {role_title}")
-                
-                if isinstance(jd_files, list):
-                    # Process each JD file if it's a list
-                    logger.info(f"Processing {len(jd_files)} Job Description files")
-                    for jd_file in jd_files:
-                        try:
-                            jd_path = download_job_description(jd_file, role_id, role_title)
-                            if jd_path:
-                                downloaded_paths.append(jd_path)
-                                downloaded_jds += 1
-                                logger.info(f"Downloaded Job Description to: {jd_path}")
-                        except Exception as jd_err:
-                            logger.error(f"Error downloading a Job Description file: {str(jd_err)}")
-                
-                elif isinstance(jd_files, dict):
-                    # Process a single JD file
-                    logger.info("Processing single Job Description file")
-                    jd_path = download_job_description(jd_files, role_id, role_title)
-                    if jd_path:
-                        downloaded_paths.append(jd_path)
-                        downloaded_jds += 1
-                        logger.info(f"Downloaded Job Description to: {jd_path}")
-                        
-                else:
-                    # Handle unexpected types
-                    logger.warning(f"Unexpected Job Description data type: {type(jd_files)}")
-                    logger.warning(f"Job Description data: {jd_files}")
-            else:
-                logger.info(f"No Job Description files found for role: {role_title}")
+            index_files(downloaded_paths, candidates)
         except Exception as e:
-            logger.error(f"Error processing Job Description files for role {role_title}: {str(e)}")
-        
-        # Get CV relations for this role
-        cv_relations = role.get("nc_92rx___nc_m2m_JobDescription_CVs", [])
-        logger.info(f"Found {len(cv_relations)} CV relations for this role")
-        
-        for relation in cv_relations:
-            cv = relation.get("CV")
-            if not cv:
-                continue
-                
-            # Get candidate name
-            first_name = cv.get("First Name", "")
-            last_name = cv.get("Last Name", "")
-            candidate_name = f"{first_name}_{last_name}".replace(" ", "_")
-            
-            # Process CV files - handle both null and array cases
-            cv_files = cv.get("CV")
-            if cv_files is None:
-                logger.warning(f"No CV files found for candidate {candidate_name}")
-                continue
-                
-            # Ensure cv_files is a list even if there's only one item
-            if not isinstance(cv_files, list):
-                logger.warning(f"CV field is not an array for candidate {candidate_name}")
-                continue
-                
-            if not cv_files:
-                logger.warning(f"Empty CV files array for candidate {candidate_name}")
-                continue
-                
-            # Process each CV file
-            for cv_file in cv_files:
-                total_cvs += 1
-                
-                # Get CV file path
-                file_path = cv_file.get("path")
-                if not file_path:
-                    logger.warning(f"No path found for CV file")
-                    continue
-                
-                # Get the file title (filename)
-                file_title = cv_file.get("title", "unknown.pdf")
-                
-                # Create full download URL
-                download_url = f"{BASE_URL}/{file_path}"
-                
-                # Use the original filename without modification
-                output_path = os.path.join(cv_dir_path, file_title)
-                
-                # Download the CV
-                logger.info(f"Downloading CV for {candidate_name}: {file_title}")
-                success = download_cv(download_url, output_path)
-                if success:
-                    downloaded_cvs += 1
-                    downloaded_paths.append(output_path)
-                    
-                # Add a small delay to avoid overwhelming the server
-                time.sleep(0.5)
+            logger.error(f"Error updating search index: {str(e)}")
     
     # Log file paths for debugging
     if downloaded_paths:
@@ -445,16 +658,57 @@ def process_roles_and_cvs() -> Tuple[int, List[str]]:
     
     # Log summary
     logger.info("=== Download Summary ===")
-    logger.info(f"Total roles processed: {len(roles)}")
+    if shard_index is not None:
+        logger.info(f"Shard: {shard_index + 1} of {shard_count} (partitioned by {partition_by})")
+    logger.info(f"Total roles processed: {processed_roles} of {len(roles)}")
+    logger.info(f"Roles skipped (leased by another worker): {skipped_roles}")
+    if cancelled_roles:
+        logger.warning(f"✗ Roles not processed (deadline exceeded): {cancelled_roles}")
     logger.info(f"Total CVs found: {total_cvs}")
     logger.info(f"Total CVs successfully downloaded: {downloaded_cvs}")
     logger.info(f"Total Job Descriptions downloaded: {downloaded_jds}")
-    logger.info(f"Total AM Comments files created: {len([p for p in downloaded_paths if p.endswith('am_insight.txt')])}")
+    logger.info(f"Total text artifacts changed and uploaded: {artifacts_uploaded}")
     
-    total_files = downloaded_cvs + downloaded_jds + len([p for p in downloaded_paths if p.endswith('am_insight.txt')])
+    total_files = downloaded_cvs + downloaded_jds + artifacts_uploaded
     logger.info(f"Total files processed: {total_files}")
+    logger.info(f"Total files uploaded to Azure: {uploaded_files}")
+    
+    return total_files, downloaded_paths, uploaded_files
+
+def get_blob_container_client():
+    """Create a container client for the configured Azure Blob Storage container."""
+    account_url = f"https://{AZURE_STORAGE_ACCOUNT_NAME}.blob.core.windows.net"
+    # The read timeout is capped by the current deadline, so create a client per upload
+    blob_service_client = BlobServiceClient(account_url=account_url, credential=AZURE_STORAGE_ACCOUNT_KEY,
+                                            connection_timeout=AZURE_CONNECT_TIMEOUT,
+                                            read_timeout=call_timeout(AZURE_READ_TIMEOUT))
+    return blob_service_client.get_container_client(AZURE_CONTAINER_NAME)
+
+def blob_operation_timeout() -> int:
+    """Server-side timeout in whole seconds for one blob operation, capped by the current deadline."""
+    return max(1, int(call_timeout(AZURE_READ_TIMEOUT)))
+
+def upload_content_to_blob_storage(content: bytes, blob_filename: str) -> str:
+    """
+    Upload in-memory content to Azure Blob Storage.
+    
+    Args:
+        content (bytes): Content to upload
+        blob_filename (str): Destination blob path
+        
+    Returns:
+        str: Blob path if successful, None otherwise
+    """
+    try:
+        blob_client = get_blob_container_client().get_blob_client(blob_filename)
+        blob_client.upload_blob(content, overwrite=True, timeout=blob_operation_timeout())
+        
+        logger.info(f"Successfully uploaded in-memory content to {AZURE_CONTAINER_NAME}/{blob_filename}")
+        return blob_filename
     
-    return total_files, downloaded_paths
+    except Exception as e:
+        logger.error(f"Error uploading to blob storage: {str(e)}")
+        return None
 
 def upload_file_to_blob_storage(file_path: str, role_id: str, role_name: str, filename: str = None) -> str:
     """
@@ -493,21 +747,14 @@ def upload_file_to_blob_storage(file_path: str, role_id: str, role_name: str, fi
         subdirectory = "cvs"
     
     # Create blob path with roles/roleid_rolename/subdirectory/<filename> structure
-    blob_filename = f"roles/{role_id}_{sanitized_role_name}/{subdirectory}/{filename}"
+    blob_filename = get_role_blob_path(role_id, sanitized_role_name, subdirectory, filename)
     
     try:    
-        # Connect to blob storage
-        account_url = f"https://{AZURE_STORAGE_ACCOUNT_NAME}.blob.core.windows.net"
-        blob_service_client = BlobServiceClient(account_url=account_url, credential=AZURE_STORAGE_ACCOUNT_KEY)
-        
-        # Get container client
-        container_client = blob_service_client.get_container_client(AZURE_CONTAINER_NAME)
-        
         # Upload the file to blob storage
-        blob_client = container_client.get_blob_client(blob_filename)
+        blob_client = get_blob_container_client().get_blob_client(blob_filename)
         
         with open(file_path, 'rb') as data:
-            blob_client.upload_blob(data, overwrite=True)
+            blob_client.upload_blob(data, overwrite=True, timeout=blob_operation_timeout())
         
         logger.info(f"Successfully uploaded {file_path} to {AZURE_CONTAINER_NAME}/{blob_filename}")
         return blob_filename
@@ -516,19 +763,28 @@ def upload_file_to_blob_storage(file_path: str, role_id: str, role_name: str, fi
         logger.error(f"Error uploading to blob storage: {str(e)}")
         return None
 
-def upload_downloaded_files(downloaded_paths: List[str]) -> int:
+def upload_downloaded_files(downloaded_paths: List[str], lease: LeaseKeeper = None) -> int:
     """
     Upload all downloaded files to Azure Blob Storage.
     
     Args:
         downloaded_paths (List[str]): List of paths to downloaded files (CVs, JDs, AM Comments)
+        lease (LeaseKeeper, optional): Lease of the role the files belong to; uploads stop if
+            it is lost
         
     Returns:
         int: Number of successfully uploaded files
     """
     successful_uploads = 0
     
-    for file_path in downloaded_paths:
+    for index, file_path in enumerate(downloaded_paths):
+        if deadline_expired():
+            logger.warning(f"✗ Deadline reached, {len(downloaded_paths) - index} files not uploaded")
+            break
+        if lease is not None and not lease.held():
+            logger.warning(f"✗ Role lease lost, {len(downloaded_paths) - index} files not uploaded")
+            break
+        
         try:
             # Extract role information from directory structure 
             # Expected path structures: 
@@ -578,19 +834,23 @@ def upload_downloaded_files(downloaded_paths: List[str]) -> int:
     
     return successful_uploads
 
-def process_cvs():
-    """Run the download and upload process."""
+def process_cvs(shard_index: int = None, shard_count: int = 1, partition_by: str = "id"):
+    """
+    Run the download and upload process.
+    
+    Args:
+        shard_index (int, optional): Shard to process, or None to process every role
+        shard_count (int): Total number of shards
+        partition_by (str): Partition key for sharding, "id" or "client"
+    """
     logger.info("=== Starting Download and Upload Process ===")
     logger.info(f"Azure Storage Account: {AZURE_STORAGE_ACCOUNT_NAME}")
     logger.info(f"Azure Container: {AZURE_CONTAINER_NAME}")
     
-    # Download files (CVs, JDs, AM Comments)
-    logger.info("Starting download process...")
-    total_files, downloaded_paths = process_roles_and_cvs()
-    
-    # Upload all files
-    logger.info("Starting upload process...")
-    uploaded_files = upload_downloaded_files(downloaded_paths)
+    # Download files (CVs, JDs, AM Comments) and upload them role by role, under each role's lease
+    logger.info("Starting download and upload process...")
+    total_files, downloaded_paths, uploaded_files = process_roles_and_cvs(
+        shard_index, shard_count, partition_by)
     
     # Log final summary
     logger.info("=== Process Summary ===")
@@ -601,8 +861,46 @@ def process_cvs():
     return {
         "success": total_files > 0 and uploaded_files > 0,
         "files_downloaded": total_files,
-        "files_uploaded": uploaded_files
+        "files_uploaded": uploaded_files,
+        "deadline_exceeded": deadline_expired()
+    }
+
+def process_cvs_sharded(workers: int, partition_by: str = "id"):
+    """
+    Run the download and upload process across several local worker processes.
+    
+    Roles are partitioned into one shard per worker. To spread the shards over several
+    hosts instead, run `shard --shard-index i --shard-count N` on each host with a shared
+    CV_LEASE_DIR.
+    
+    Args:
+        workers (int): Number of worker processes (and shards)
+        partition_by (str): Partition key for sharding, "id" or "client"
+        
+    Returns:
+        Dict: Combined result of all shards
+    """
+    logger.info(f"=== Starting Sharded Process with {workers} workers (partitioned by {partition_by}) ===")
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(process_cvs, shard_index, workers, partition_by)
+                   for shard_index in range(workers)]
+        results = []
+        for shard_index, future in enumerate(futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                logger.error(f"Shard {shard_index} failed: {str(e)}")
+                results.append({"success": False, "files_downloaded": 0, "files_uploaded": 0})
+    
+    combined = {
+        "success": all(r["success"] for r in results),
+        "files_downloaded": sum(r["files_downloaded"] for r in results),
+        "files_uploaded": sum(r["files_uploaded"] for r in results),
+        "shards": results
     }
+    logger.info(f"=== Sharded Process Completed: {combined['files_downloaded']} downloaded, "
+                f"{combined['files_uploaded']} uploaded ===")
+    return combined
 
 # Create Flask app
 app = Flask(__name__)
@@ -632,18 +930,13 @@ def find_job_by_uuid(uuid_string):
         clean_uuid = uuid_string.strip('"\'').strip()
         logger.info(f"Using cleaned UUID for search: {clean_uuid}")
         
-        # Fetch all jobs with a larger limit to ensure we get all available jobs
-        fetch_response = requests.get(jobs_url, headers=headers, params={'limit': 500})
-        if fetch_response.status_code != 200:
-            logger.error(f"Failed to fetch jobs. Status code: {fetch_response.status_code}")
+        # Fetch all jobs, following pagination
+        try:
+            jobs_list = list(nocodb.iter_records(JOBS_TABLE))
+        except NocoDBError as e:
+            logger.error(f"Failed to fetch jobs: {str(e)}")
             return None
-            
-        jobs_data = fetch_response.json()
         
-        # Log response structure for debugging
-        logger.info(f"API response structure - top level keys: {list(jobs_data.keys())}")
-        
-        jobs_list = jobs_data.get('list', [])
         logger.info(f"Retrieved {len(jobs_list)} jobs, searching for a match")
         
         # Log available fields in the first job for debugging
@@ -811,17 +1104,20 @@ def update_role_status(role_id_or_uuid, new_status: str = "Generating Questions"
             fetch_url = f"{jobs_url}/{direct_id}"
             logger.info(f"Verifying job existence at: {fetch_url}")
             
-            fetch_response = requests.get(fetch_url, headers=headers)
+            try:
+                job = nocodb.get_record(JOBS_TABLE, direct_id)
+            except NocoDBError as e:
+                logger.warning(f"Error fetching job {direct_id}: {str(e)}")
+                job = None
             
-            if fetch_response.status_code == 200:
+            if job:
                 # Job exists, use its data
-                job = fetch_response.json()
                 job_id = job.get('Id')  # Use the ID from the response
                 current_status = job.get('Status', 'Unknown')
                 logger.info(f"Verified job ID: {job_id}, current status: {current_status}")
             else:
                 # Job doesn't exist by direct ID, try UUID lookup as fallback
-                logger.warning(f"Failed to verify job ID {direct_id}. Status: {fetch_response.status_code}")
+                logger.warning(f"Failed to verify job ID {direct_id}")
                 logger.warning(f"Trying UUID lookup as fallback...")
                 
                 job = find_job_by_uuid(role_id_or_uuid)
@@ -870,11 +1166,7 @@ def update_role_status(role_id_or_uuid, new_status: str = "Generating Questions"
         logger.info(f"Update payload: {json.dumps(update_payload)}")
         
         # Send PATCH request to update the job
-        update_headers = headers.copy()
-        update_headers['Content-Type'] = 'application/json'
-        
-        # Try the update
-        response = requests.patch(jobs_url, headers=update_headers, json=update_payload)
+        response = nocodb.request("PATCH", jobs_url, json=update_payload)
         
         # Log the response
         logger.info(f"Update response status code: {response.status_code}")
@@ -886,7 +1178,7 @@ def update_role_status(role_id_or_uuid, new_status: str = "Generating Questions"
             
             # Verify the update
             verify_url = f"{jobs_url}/{api_job_id}"
-            verify_response = requests.get(verify_url, headers=headers)
+            verify_response = nocodb.request("GET", verify_url)
             
             if verify_response.status_code == 200:
                 verify_data = verify_response.json()
@@ -923,7 +1215,7 @@ def update_role_status(role_id_or_uuid, new_status: str = "Generating Questions"
                 update_payload["Id"] = string_job_id
                 logger.info(f"Retrying with payload: {json.dumps(update_payload)}")
                 
-                retry_response = requests.patch(jobs_url, headers=update_headers, json=update_payload)
+                retry_response = nocodb.request("PATCH", jobs_url, json=update_payload)
                 logger.info(f"Retry response status code: {retry_response.status_code}")
                 
                 if retry_response.status_code >= 200 and retry_response.status_code < 300:
@@ -937,7 +1229,7 @@ def update_role_status(role_id_or_uuid, new_status: str = "Generating Questions"
                 update_payload["Id"] = int_job_id
                 logger.info(f"Retrying with payload: {json.dumps(update_payload)}")
                 
-                retry_response = requests.patch(jobs_url, headers=update_headers, json=update_payload)
+                retry_response = nocodb.request("PATCH", jobs_url, json=update_payload)
                 logger.info(f"Retry response status code: {retry_response.status_code}")
                 
                 if retry_response.status_code >= 200 and retry_response.status_code < 300:
@@ -1072,21 +1364,28 @@ def cv_uploader():
     else:
         logger.warning("No ID field found in the request data after deep search")
     
-    # Run the process to download and upload files
-    logger.info("Starting CV download and upload process...")
-    result = process_cvs()
-    
-    # Update role status if we have a role ID
-    if role_id:
-        logger.info(f"Attempting to update status for role ID: {role_id}")
-        status_updated = update_role_status(role_id)
-        result["role_id"] = role_id
-        result["status_updated"] = status_updated
-        result["id_source"] = id_source
-    else:
-        logger.warning("No role ID found, skipping status update")
-        result["status_updated"] = False
-        result["role_id"] = None
+    # Run the process to download and upload files, and update the status, within the
+    # job's time budget
+    with deadline_scope(WEBHOOK_JOB_DEADLINE_SECONDS, "CV upload job"):
+        logger.info("Starting CV download and upload process...")
+        result = process_cvs()
+        
+        # Update role status if we have a role ID
+        if result["deadline_exceeded"]:
+            # Some of the role's files may be missing, so don't move it on to question generation
+            logger.warning(f"✗ Job exceeded its {WEBHOOK_JOB_DEADLINE_SECONDS:g}s deadline, not updating role status")
+            result["status_updated"] = False
+            result["role_id"] = role_id
+        elif role_id:
+            logger.info(f"Attempting to update status for role ID: {role_id}")
+            status_updated = update_role_status(role_id)
+            result["role_id"] = role_id
+            result["status_updated"] = status_updated
+            result["id_source"] = id_source
+        else:
+            logger.warning("No role ID found, skipping status update")
+            result["status_updated"] = False
+            result["role_id"] = None
     
     # Add timestamp to result
     result["timestamp"] = datetime.now().isoformat()
@@ -1105,6 +1404,7 @@ def main():
     - No args: Run download and upload process
     - --webhook: Run as Flask webhook server
     - --status <role_id>: Update status for a specific role
+    - shard: Run the process across several worker processes or hosts
     """
     import sys
     import argparse
@@ -1126,6 +1426,17 @@ def main():
     status_parser.add_argument('--status', type=str, default="Generating Questions",
                               help='New status value (default: "Generating Questions")')
     
+    # Add shard command
+    shard_parser = subparsers.add_parser('shard', help='Run the process in sharded mode')
+    shard_parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                              help='Number of local worker processes (default: CPU count)')
+    shard_parser.add_argument('--shard-index', type=int, default=None,
+                              help='Run only this shard (for spreading shards across hosts)')
+    shard_parser.add_argument('--shard-count', type=int, default=None,
+                              help='Total number of shards when using --shard-index')
+    shard_parser.add_argument('--partition-by', choices=['id', 'client'], default='id',
+                              help='Partition roles by role ID hash or by client (default: id)')
+    
     # Parse arguments
     if len(sys.argv) > 1:
         args = parser.parse_args()
@@ -1140,6 +1451,14 @@ def main():
             success = update_role_status(args.role_id, args.status)
             logger.info(f"Status update {'successful' if success else 'failed'}")
             return 0 if success else 1
+        elif args.command == 'shard':
+            if args.shard_index is not None:
+                if not args.shard_count or not 0 <= args.shard_index < args.shard_count:
+                    parser.error("--shard-index requires --shard-count greater than the index")
+                result = process_cvs(args.shard_index, args.shard_count, args.partition_by)
+            else:
+                result = process_cvs_sharded(args.workers, args.partition_by)
+            return 0 if result["success"] else 1
     else:
         # Default behavior - run download and upload process
         logger.info("Running CV download and upload process")
@@ -0,0 +1,293 @@
+#!/usr/bin/env python
+"""
+Lease Store
+
+Lease-based ownership for work that must only be done by one process at a time, such as
+processing a role's CVs. A lease is held by an owner for a TTL and must be renewed before
+it expires. Once expired it can be taken over by another owner, so a crashed worker never
+blocks its work for longer than the TTL.
+
+The file-backed store keeps one JSON lease file per key in a directory. Pointing several
+hosts at the same shared directory turns it into a shared lock store. The in-memory store
+is a stand-in for tests. LeaderElector builds leader election on top of any store, and
+LeaseKeeper keeps a lease alive while a long piece of work runs.
+"""
+
+import os
+import json
+import time
+import uuid
+import fcntl
+import socket
+import logging
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+def default_owner_id() -> str:
+    """Build a unique owner ID for this process in the form host:pid:random."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+class LeaseStore(ABC):
+    """Interface for lease stores."""
+
+    @abstractmethod
+    def acquire(self, key: str, owner: str, ttl_seconds: float) -> bool:
+        """
+        Acquire or extend a lease.
+
+        Args:
+            key (str): Name of the leased resource
+            owner (str): ID of the caller
+            ttl_seconds (float): How long the lease is valid for
+
+        Returns:
+            bool: True if the caller holds the lease afterwards
+        """
+
+    @abstractmethod
+    def renew(self, key: str, owner: str, ttl_seconds: float) -> bool:
+        """Extend a lease the caller already holds. Returns False if it was lost."""
+
+    @abstractmethod
+    def release(self, key: str, owner: str) -> bool:
+        """Release a lease held by the caller. Returns False if it was not held."""
+
+    @abstractmethod
+    def get_lease(self, key: str) -> Optional[Dict]:
+        """Return the current lease record for a key, or None if it is free or expired."""
+
+class FileLeaseStore(LeaseStore):
+    """Lease store backed by one JSON file per key, guarded by an flock."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def _lease_path(self, key: str) -> str:
+        safe_key = "".join(c if c.isalnum() or c in "-_." else "_" for c in key)
+        return os.path.join(self.directory, f"{safe_key}.lease")
+
+    @contextmanager
+    def _locked(self, key: str):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(f"{self._lease_path(key)}.lock", 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read(self, key: str) -> Optional[Dict]:
+        try:
+            with open(self._lease_path(key), 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Unreadable lease for {key}, treating as free: {str(e)}")
+            return None
+
+    def _write(self, key: str, owner: str, ttl_seconds: float) -> None:
+        path = self._lease_path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({"owner": owner, "expires_at": time.time() + ttl_seconds}, f)
+        os.replace(tmp_path, path)
+
+    def acquire(self, key: str, owner: str, ttl_seconds: float) -> bool:
+        with self._locked(key):
+            lease = self._read(key)
+            if lease and lease.get("owner") != owner and lease.get("expires_at", 0) > time.time():
+                return False
+            if lease and lease.get("owner") != owner:
+                logger.info(f"Taking over expired lease {key} from {lease.get('owner')}")
+            self._write(key, owner, ttl_seconds)
+            return True
+
+    def renew(self, key: str, owner: str, ttl_seconds: float) -> bool:
+        with self._locked(key):
+            lease = self._read(key)
+            if not lease or lease.get("owner") != owner:
+                return False
+            self._write(key, owner, ttl_seconds)
+            return True
+
+    def release(self, key: str, owner: str) -> bool:
+        with self._locked(key):
+            lease = self._read(key)
+            if not lease or lease.get("owner") != owner:
+                return False
+            os.remove(self._lease_path(key))
+            return True
+
+    def get_lease(self, key: str) -> Optional[Dict]:
+        lease = self._read(key)
+        if lease and lease.get("expires_at", 0) > time.time():
+            return lease
+        return None
+
+class InMemoryLeaseStore(LeaseStore):
+    """Lease store held in process memory. Stands in for a shared store in tests and
+    single-process runs; every owner must share the same instance."""
+
+    def __init__(self):
+        self.leases: Dict[str, Dict] = {}
+        self.lock = threading.Lock()
+
+    def acquire(self, key: str, owner: str, ttl_seconds: float) -> bool:
+        with self.lock:
+            lease = self.leases.get(key)
+            if lease and lease["owner"] != owner and lease["expires_at"] > time.time():
+                return False
+            self.leases[key] = {"owner": owner, "expires_at": time.time() + ttl_seconds}
+            return True
+
+    def renew(self, key: str, owner: str, ttl_seconds: float) -> bool:
+        with self.lock:
+            lease = self.leases.get(key)
+            if not lease or lease["owner"] != owner:
+                return False
+            lease["expires_at"] = time.time() + ttl_seconds
+            return True
+
+    def release(self, key: str, owner: str) -> bool:
+        with self.lock:
+            lease = self.leases.get(key)
+            if not lease or lease["owner"] != owner:
+                return False
+            del self.leases[key]
+            return True
+
+    def get_lease(self, key: str) -> Optional[Dict]:
+        with self.lock:
+            lease = self.leases.get(key)
+            if lease and lease["expires_at"] > time.time():
+                return dict(lease)
+            return None
+
+class LeaseKeeper:
+    """Keeps a lease the caller has just acquired alive for the length of a with block.
+
+    A background thread renews the lease every renew_interval seconds and the lease is
+    released when the block exits. held() turns False once a renewal finds the lease taken
+    or the last successful renewal is older than the TTL, so the work can stop before
+    another owner takes over.
+    """
+
+    def __init__(self, store: LeaseStore, key: str, owner: str, ttl_seconds: float,
+                 renew_interval: Optional[float] = None):
+        self.store = store
+        self.key = key
+        self.owner = owner
+        self.ttl_seconds = ttl_seconds
+        self.renew_interval = renew_interval or ttl_seconds / 3
+        self.valid_until = 0.0
+        self.lost = False
+        self.stop_event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def held(self) -> bool:
+        return not self.lost and time.monotonic() < self.valid_until
+
+    def __enter__(self) -> "LeaseKeeper":
+        self.valid_until = time.monotonic() + self.ttl_seconds
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name=f"lease-{self.key}", daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.stop_event.set()
+        self.thread.join(self.renew_interval + 1)
+        if not self.lost:
+            try:
+                self.store.release(self.key, self.owner)
+            except Exception as e:
+                logger.error(f"Error releasing lease {self.key}: {str(e)}")
+
+    def _run(self) -> None:
+        while not self.stop_event.wait(self.renew_interval):
+            attempted_at = time.monotonic()
+            try:
+                renewed = self.store.renew(self.key, self.owner, self.ttl_seconds)
+            except Exception as e:
+                # Keep trying; held() turns False if the TTL runs out first
+                logger.error(f"Error renewing lease {self.key}: {str(e)}")
+                continue
+            if not renewed:
+                logger.warning(f"Lost lease {self.key} as {self.owner}")
+                self.lost = True
+                return
+            self.valid_until = attempted_at + self.ttl_seconds
+
+class LeaderElector:
+    """Keeps trying to hold a single lease and reports whether this process is the leader.
+
+    A background thread renews the lease every renew_interval seconds while leading and
+    tries to acquire it otherwise, so a standby takes over at most ttl + renew_interval
+    seconds after the leader stops renewing. Leadership is only reported while the last
+    successful renewal is younger than the TTL, so a leader whose renewals stall stops
+    acting before anyone else can take over.
+    """
+
+    def __init__(self, store: LeaseStore, key: str, owner: Optional[str] = None,
+                 ttl_seconds: float = 15, renew_interval: Optional[float] = None,
+                 on_change: Optional[Callable[[bool], None]] = None):
+        self.store = store
+        self.key = key
+        self.owner = owner or default_owner_id()
+        self.ttl_seconds = ttl_seconds
+        self.renew_interval = renew_interval or ttl_seconds / 3
+        self.on_change = on_change
+        self.valid_until = 0.0
+        self.leading = False
+        self.stop_event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def is_leader(self) -> bool:
+        return self.leading and time.monotonic() < self.valid_until
+
+    def try_acquire(self) -> bool:
+        """Acquire or renew the lease once and update the leadership state."""
+        attempted_at = time.monotonic()
+        try:
+            if self.leading:
+                held = self.store.renew(self.key, self.owner, self.ttl_seconds)
+            else:
+                held = self.store.acquire(self.key, self.owner, self.ttl_seconds)
+        except Exception as e:
+            logger.error(f"Error renewing lease {self.key}: {str(e)}")
+            held = False
+
+        was_leading = self.leading
+        if held:
+            self.valid_until = attempted_at + self.ttl_seconds
+        self.leading = held
+        if self.leading != was_leading:
+            logger.info(f"{'Acquired' if self.leading else 'Lost'} lease {self.key} as {self.owner}")
+            if self.on_change:
+                self.on_change(self.leading)
+        return self.leading
+
+    def start(self) -> None:
+        """Make one acquisition attempt, then keep the lease up to date in the background."""
+        self.stop_event.clear()
+        self.try_acquire()
+        self.thread = threading.Thread(target=self._run, name=f"lease-{self.key}", daemon=True)
+        self.thread.start()
+
+    def stop(self, release: bool = True) -> None:
+        """Stop renewing and, by default, release the lease so a standby takes over at once."""
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(self.renew_interval + 1)
+        if release and self.leading:
+            self.store.release(self.key, self.owner)
+        self.leading = False
+
+    def _run(self) -> None:
+        while not self.stop_event.wait(self.renew_interval):
+            self.try_acquire()
@@ -0,0 +1,308 @@
+#!/usr/bin/env python
+"""
+NocoDB Client
+
+Shared client for the NocoDB v2 API used by app.py, download_and_upload_cvs.py and
+refresh_website.py. One client holds a pooled keep-alive requests.Session, so repeated
+calls reuse connections. Transient failures (connection errors, 429 and 5xx responses) are
+retried with exponential backoff. Every request has a connect and a read timeout, both
+capped by the current deadline (see deadlines.py), and no request is sent once that
+deadline has passed. The helpers are table-aware: list, iterate, get, bulk
+insert, bulk update, link and download.
+
+Configuration comes from the environment:
+
+    NOCODB_URL            Base URL of the NocoDB server
+    NOCODB_TOKEN          API token (falls back to API_TOKEN); required
+    NOCODB_POOL_SIZE      Connections kept open per host (default 16)
+    NOCODB_RETRIES        Retries for transient failures (default 3)
+    NOCODB_RETRY_BACKOFF  Backoff factor in seconds, doubled per retry (default 0.5)
+    NOCODB_CONNECT_TIMEOUT  Seconds to wait for a connection (default 5)
+    NOCODB_READ_TIMEOUT   Seconds to wait for response data (default 30)
+    NOCODB_JOB_CV_LINKS_TABLE  ID of the jobs <-> CVs link table, if it is exposed
+"""
+
+import os
+import logging
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib3.exceptions import MaxRetryError, ResponseError
+from deadlines import DeadlineExceeded, current_deadline, deadline_expired
+
+logger = logging.getLogger(__name__)
+
+NOCODB_URL = os.environ.get('NOCODB_URL', "http://20.254.105.163:8080").rstrip('/')
+NOCODB_TOKEN = os.environ.get('NOCODB_TOKEN', os.environ.get('API_TOKEN', ''))
+NOCODB_POOL_SIZE = int(os.environ.get('NOCODB_POOL_SIZE', 16))
+NOCODB_RETRIES = int(os.environ.get('NOCODB_RETRIES', 3))
+NOCODB_RETRY_BACKOFF = float(os.environ.get('NOCODB_RETRY_BACKOFF', 0.5))
+NOCODB_CONNECT_TIMEOUT = float(os.environ.get('NOCODB_CONNECT_TIMEOUT', 5))
+NOCODB_READ_TIMEOUT = float(os.environ.get('NOCODB_READ_TIMEOUT', 30))
+
+# Table and field IDs
+JOBS_TABLE = "mgwvuug18vkrhg0"
+INTERVIEWS_TABLE = "mpims4p3zrwsarx"
+CANDIDATES_TABLE = "m0ro5phcebcdbt7"
+INTERVIEW_CANDIDATE_LINK_FIELD = "c4gkn9aehmsg1n5"  # Interviews -> candidates link field
+# Jobs <-> CVs link table and its job column. Linking a CV adds a row here without touching
+# the job row; empty if the link table is not exposed through the API.
+JOB_CV_LINKS_TABLE = os.environ.get('NOCODB_JOB_CV_LINKS_TABLE', '')
+JOB_CV_LINKS_JOB_FIELD = os.environ.get('NOCODB_JOB_CV_LINKS_JOB_FIELD', 'JobDescription_id')
+
+# Default page size for list requests
+DEFAULT_PAGE_SIZE = 100
+
+class NocoDBError(Exception):
+    """A NocoDB request that failed with a non-2xx response."""
+
+    def __init__(self, status_code: int, text: str):
+        super().__init__(f"Status code {status_code}: {text[:200]}")
+        self.status_code = status_code
+        self.text = text
+
+class DeadlineRetry(Retry):
+    """Retry policy that gives up early when the current deadline leaves no time to wait
+    for the next attempt. urllib3 retries on the caller's thread, so the deadline is visible."""
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        retry = super().increment(method, url, response, error, _pool, _stacktrace)
+        deadline = current_deadline()
+        if deadline is not None:
+            wait = retry.get_backoff_time()
+            if response is not None:
+                wait = max(wait, retry.get_retry_after(response) or 0)
+            if deadline.remaining() <= wait:
+                # Handled like exhausted retries: the last response or error is returned
+                reason = error or ResponseError(f"no time left to retry before the {deadline.name} deadline")
+                raise MaxRetryError(_pool, url, reason)
+        return retry
+
+class NocoDBClient:
+    """Pooled, retrying client for one NocoDB server."""
+
+    def __init__(self, base_url: str = NOCODB_URL, token: Optional[str] = None,
+                 pool_size: int = NOCODB_POOL_SIZE, retries: int = NOCODB_RETRIES,
+                 backoff: float = NOCODB_RETRY_BACKOFF,
+                 connect_timeout: float = NOCODB_CONNECT_TIMEOUT, read_timeout: float = NOCODB_READ_TIMEOUT,
+                 on_request: Optional[Callable[[str], None]] = None):
+        """
+        Args:
+            base_url (str): Server URL, e.g. http://host:8080
+            token (str, optional): API token sent as xc-token; defaults to NOCODB_TOKEN
+                (or API_TOKEN) from the environment
+            pool_size (int): Connections kept open per host
+            retries (int): Retries for connection errors, 429 and 5xx responses
+            backoff (float): Backoff factor; retry n waits backoff * 2 ** (n - 1) seconds
+            connect_timeout (float): Default seconds to wait for a connection
+            read_timeout (float): Default seconds to wait for response data
+            on_request (Callable, optional): Called with the HTTP method before every request,
+                e.g. to count API calls
+        
+        Raises:
+            ValueError: If no token is given and neither NOCODB_TOKEN nor API_TOKEN is set
+        """
+        self.base_url = base_url.rstrip('/')
+        self.token = token or NOCODB_TOKEN
+        if not self.token:
+            raise ValueError("No NocoDB API token: set NOCODB_TOKEN (or API_TOKEN)")
+        self.pool_size = pool_size
+        self.retries = retries
+        self.backoff = backoff
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.on_request = on_request
+        self._session: Optional[requests.Session] = None
+        self._session_pid: Optional[int] = None
+
+    @property
+    def session(self) -> requests.Session:
+        # Pooled sockets must not be shared with forked worker processes, so each process
+        # builds its own session
+        if self._session is None or self._session_pid != os.getpid():
+            self._session = self._build_session()
+            self._session_pid = os.getpid()
+        return self._session
+
+    def _build_session(self) -> requests.Session:
+        # POSTs are only retried when the connection failed before the request was sent;
+        # GET and PATCH (which sets field values) are safe to repeat
+        retry = DeadlineRetry(total=self.retries, connect=self.retries, read=self.retries, status=self.retries,
+                      backoff_factor=self.backoff, status_forcelist=(429, 500, 502, 503, 504),
+                      allowed_methods=frozenset({"GET", "HEAD", "PATCH"}), raise_on_status=False,
+                      respect_retry_after_header=True)
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size, max_retries=retry)
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update({'accept': 'application/json', 'xc-token': self.token})
+        return session
+
+    def records_url(self, table: str) -> str:
+        return f"{self.base_url}/api/v2/tables/{table}/records"
+
+    def link_url(self, table: str, link_field: str, record_id: Union[int, str]) -> str:
+        return f"{self.base_url}/api/v2/tables/{table}/links/{link_field}/records/{record_id}"
+
+    def table_meta_url(self, table: str) -> str:
+        return f"{self.base_url}/api/v2/meta/tables/{table}"
+
+    def timeout(self, timeout: Optional[Union[float, Tuple[float, float]]] = None) -> Tuple[float, float]:
+        """
+        Resolve the (connect, read) timeout for one request: the given timeout (a number
+        applies to both) or the client defaults, capped by the current deadline.
+
+        Raises:
+            DeadlineExceeded: If the current deadline has already passed
+        """
+        if timeout is None:
+            connect, read = self.connect_timeout, self.read_timeout
+        elif isinstance(timeout, tuple):
+            connect, read = timeout
+        else:
+            connect = read = timeout
+        deadline = current_deadline()
+        if deadline is not None:
+            connect, read = deadline.cap(connect), deadline.cap(read)
+        return connect, read
+
+    def request(self, method: str, url: str, timeout: Optional[Union[float, Tuple[float, float]]] = None,
+                **kwargs) -> requests.Response:
+        """
+        Send a request through the pooled session and return the raw response.
+
+        A retry (see _build_session) gets the same timeout as the first attempt and is only
+        made if the deadline leaves time for its backoff.
+
+        Args:
+            timeout (float or tuple, optional): Timeout in seconds, or (connect, read);
+                defaults to the client's timeouts
+
+        Raises:
+            DeadlineExceeded: If the current deadline has passed, before sending or while
+                waiting on a call whose timeout it had cut short
+            requests.Timeout: If the server did not connect or respond in time
+        """
+        timeout = self.timeout(timeout)
+        if self.on_request:
+            self.on_request(method)
+        try:
+            return self.session.request(method, url, timeout=timeout, **kwargs)
+        except requests.RequestException as e:
+            # A timeout capped by the deadline is the deadline running out, not a server fault
+            if deadline_expired():
+                deadline = current_deadline()
+                raise DeadlineExceeded(f"{deadline.name} exceeded its {deadline.seconds:g}s deadline "
+                                       f"during {method} {url}") from e
+            raise
+
+    def _checked(self, method: str, url: str, **kwargs) -> Any:
+        response = self.request(method, url, **kwargs)
+        if not 200 <= response.status_code < 300:
+            raise NocoDBError(response.status_code, response.text)
+        return response.json() if response.content else None
+
+    def list_records(self, table: str, params: Optional[Dict] = None) -> Dict:
+        """
+        Fetch one page of records.
+
+        Returns:
+            dict: The raw response with 'list' and 'pageInfo'
+        """
+        page_params = {'limit': DEFAULT_PAGE_SIZE, 'shuffle': 0, 'offset': 0}
+        page_params.update(params or {})
+        return self._checked("GET", self.records_url(table), params=page_params)
+
+    def iter_records(self, table: str, params: Optional[Dict] = None, parallelism: int = 1) -> Iterator[Dict]:
+        """
+        Stream every record of a table, page by page.
+
+        The first page is fetched on its own to learn the page size and row count. The
+        remaining pages are fetched in windows of up to `parallelism` concurrent requests and
+        yielded in order, so at most one window of records is held in memory. Records are
+        sorted by Id unless the caller asks otherwise, which keeps offsets stable while paging.
+
+        Args:
+            table (str): Table ID
+            params (dict): Extra query parameters (where, fields, sort, limit, ...)
+            parallelism (int): Maximum number of pages fetched concurrently
+
+        Yields:
+            dict: One record at a time
+        """
+        page_params = dict(params or {})
+        page_params.setdefault('sort', 'Id')
+
+        def fetch(offset: int) -> Dict:
+            return self.list_records(table, dict(page_params, offset=offset))
+
+        data = fetch(0)
+        page = data.get('list', [])
+        yield from page
+        page_info = data.get('pageInfo', {})
+        if not page or page_info.get('isLastPage', True):
+            return
+
+        page_size = len(page)
+        next_offset = page_size
+        with ThreadPoolExecutor(max_workers=max(1, parallelism)) as executor:
+            while True:
+                # Only request pages we expect to exist; fall back to one page at a time if
+                # the row count is unknown or the table grew while we were paging
+                total_rows = page_info.get('totalRows') or 0
+                remaining_pages = -(-(total_rows - next_offset) // page_size)
+                window = [next_offset + i * page_size for i in range(max(1, min(parallelism, remaining_pages)))]
+
+                # Workers run in a copy of the caller's context, so context-scoped
+                # instrumentation still sees their requests
+                futures = [executor.submit(contextvars.copy_context().run, fetch, offset) for offset in window]
+                for future in futures:
+                    data = future.result()
+                    page = data.get('list', [])
+                    yield from page
+                    page_info = data.get('pageInfo', {})
+                    if not page or page_info.get('isLastPage', True):
+                        return
+                    next_offset += len(page)
+
+    def get_record(self, table: str, record_id: Union[int, str], fields: Optional[str] = None) -> Optional[Dict]:
+        """Fetch a single record by ID, or None if it does not exist."""
+        try:
+            return self._checked("GET", f"{self.records_url(table)}/{record_id}",
+                                 params={'fields': fields} if fields else None)
+        except NocoDBError as e:
+            if e.status_code == 404:
+                return None
+            raise
+
+    def get_column_titles(self, table: str) -> List[str]:
+        """Return the titles of a table's columns, as used for record fields."""
+        meta = self._checked("GET", self.table_meta_url(table))
+        return [column.get('title') for column in meta.get('columns', [])]
+
+    def insert_records(self, table: str, records: Union[Dict, List[Dict]]) -> Any:
+        """Insert one record or a list of records with a single POST. Returns the created IDs."""
+        return self._checked("POST", self.records_url(table), json=records)
+
+    def update_records(self, table: str, records: Union[Dict, List[Dict]]) -> Any:
+        """Update one record or a list of records (each with its Id) with a single PATCH."""
+        return self._checked("PATCH", self.records_url(table), json=records)
+
+    def link_records(self, table: str, link_field: str, record_id: Union[int, str],
+                     linked_ids: Iterable[Union[int, str]]) -> Any:
+        """Link a record to records of the related table through a link field."""
+        return self._checked("POST", self.link_url(table, link_field, record_id),
+                             json=[{"Id": linked_id} for linked_id in linked_ids])
+
+    def download(self, path_or_url: str, **kwargs) -> requests.Response:
+        """
+        Download an attachment. Relative paths (as stored in attachment fields) are
+        resolved against the server URL. The response is streamed; check its status.
+        """
+        url = path_or_url if path_or_url.startswith(("http://", "https://")) \
+            else f"{self.base_url}/{path_or_url.lstrip('/')}"
+        return self.request("GET", url, headers={'accept': '*/*'}, stream=True, **kwargs)
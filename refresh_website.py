@@ -1,11 +1,27 @@
-import requests
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import json
 import urllib.parse
 import time
 import logging
 import random
-from typing import Dict, Any, Optional, List
+import hashlib
+import hmac
+import argparse
+import os
+import threading
+import queue
+import itertools
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, Any, Iterable, Iterator, Optional, List, Set, Tuple
+from flask import Flask, request, jsonify
+from task_scheduler import Scheduler, format_stats
+from state_store import StateStore, STATE_STORE_PATH
+from lease_store import LeaseStore, FileLeaseStore, LeaderElector
+from scheduler_metrics import (metrics, count_api_call, api_call_scope, propagate_context,
+                               COUNT_BUCKETS, LAG_BUCKETS)
+from deadlines import DeadlineExceeded, deadline_scope, check_deadline
+from nocodb_client import (NocoDBClient, JOBS_TABLE, INTERVIEWS_TABLE, CANDIDATES_TABLE,
+                           INTERVIEW_CANDIDATE_LINK_FIELD, JOB_CV_LINKS_TABLE, JOB_CV_LINKS_JOB_FIELD)
 
 # Configure logging
 logging.basicConfig(
@@ -25,31 +41,136 @@ SPECIAL_CV_FILES = [
     "111467_original_cv.pdf"
 ]
 
-# API Token
-TOKEN = 'EgEls5yPpzOqhGdtL1CDcZkNolXhQhIFfwd4DIe0'
+# Number of pages fetched concurrently when streaming a table
+page_fetch_parallelism = 4
 
-# API configuration
-headers = {
-    'accept': 'application/json',
-    'xc-token': TOKEN
+# Missing interviews are created in batches of this size, by this many concurrent batch
+# workers, with this many concurrent link calls
+interview_batch_size = 50
+interview_create_workers = 4
+link_parallelism = 4
+
+# Maximum number of records sent in one array PATCH
+bulk_update_batch_size = 100
+
+# Maximum number of job Ids in one (Id,eq,...) filter
+job_id_filter_batch_size = 50
+
+# Interview field holding the idempotency key of the (role, candidate) pair it was created for
+interview_key_field = "Interview Key"
+
+# Candidate links are written by background workers. A failed link call is retried with
+# short exponential backoff rather than waiting up front for new records to settle.
+link_retry_attempts = 6
+link_retry_base_delay = 0.25  # seconds, doubled after each failed attempt
+link_queue_state = {
+    "queue": queue.Queue(),
+    "condition": threading.Condition(),
+    "pending": 0,
+    "started": False
 }
 
-params = {
-    'limit': 100,
-    'shuffle': 0,
-    'offset': 0
+# Field holding the jobs <-> CVs relation
+jobs_cv_relation_field = "nc_92rx___nc_m2m_JobDescription_CVs"
+
+# Change-data-capture state for check_and_create_interviews(). Between full
+# reconciliations each cycle only reads rows whose UpdatedAt is past the high-water mark.
+# Linking a CV to a job does not touch the job row, so new links are found through the link
+# table's own CreatedAt feed (links_watermark), and the jobs they belong to are re-read.
+# Without a link table every incremental cycle scans the links of every job instead.
+full_reconciliation_interval = 900  # seconds
+sync_state = {
+    "jobs_watermark": None,
+    "interviews_watermark": None,
+    "ranks_watermark": None,
+    "links_watermark": None,
+    "existing_keys": set(),
+    "legacy_titles": set(),
+    "last_full_sync": None,
+    # Jobs with pairs whose interview could not be created; the next incremental cycle
+    # re-reads them even though the jobs watermark has moved past them
+    "retry_job_ids": set(),
+    # Ids of the records already read at each watermark's exact UpdatedAt. Feeds read from
+    # the watermark inclusively, so rows updated in the same second as the last one read
+    # are not lost, and skip these Ids instead.
+    "watermark_ids": {}
 }
 
-# URLs
-jobs_url = "http://20.254.105.163:8080/api/v2/tables/mgwvuug18vkrhg0/records"
-interview_url = "http://20.254.105.163:8080/api/v2/tables/mpims4p3zrwsarx/records"
-candidates_url = "http://20.254.105.163:8080/api/v2/tables/m0ro5phcebcdbt7/records"
-portal_base_url = "http://20.254.105.163:8501/"
+# Local SQLite copy of sync_state, the candidate map and pending links, so a restart
+# resumes with an incremental cycle (see state_store.py). Opened by open_state_store().
+state_store: Optional[StateStore] = None
+candidate_index_max_age = 900  # seconds before the stored candidate map is refetched
+
+# High availability (--ha / --partitions): instances elect a leader per partition through
+# a lease store, and only the leader of a partition creates its interviews. Jobs are
+# split between partitions by Id. Instances started for the same partition are hot
+# standbys that take over within roughly leader_lease_ttl seconds. Instance-wide work
+# (rank checks, question backfill) is done by the leader of partition 0. Point
+# REFRESH_LEASE_DIR at a directory shared by all hosts.
+leader_lease_dir = os.environ.get('REFRESH_LEASE_DIR', os.path.join(os.getcwd(), ".leases"))
+leader_lease_ttl = float(os.environ.get('REFRESH_LEASE_TTL', 15))  # seconds
+partition_state = {
+    "partition": 0,
+    "partitions": 1,
+    "elector": None
+}
+
+# Metrics (see scheduler_metrics.py) are served at /metrics in webhook mode and written
+# to a JSON stats file every metrics_write_interval seconds in both modes
+metrics_path = os.environ.get('REFRESH_METRICS_PATH', os.path.join(os.getcwd(), "refresh_metrics.json"))
+metrics_write_interval = 30  # seconds
+metrics.describe("interview_cycle_duration_seconds", "Duration of interview scheduling cycles")
+metrics.describe("interview_cycle_api_calls", "NocoDB requests made by one scheduling cycle")
+metrics.describe("interview_cycle_pairs_scanned", "Candidate-job pairs scanned by one cycle")
+metrics.describe("interview_cycle_interviews_created", "Interviews created by one cycle")
+metrics.describe("interview_link_to_interview_lag_seconds",
+                 "Time from a CV being linked to a job until its interview exists")
+metrics.describe("nocodb_requests_total", "NocoDB API requests by HTTP method")
+
+# Serialises scheduling checks between the polling loop and webhook events
+scheduling_lock = threading.Lock()
+
+# Event-driven mode: NocoDB row events for the jobs/CV link tables are posted to
+# /interview_webhook, debounced, and processed for just the affected jobs. A full
+# reconciliation runs every webhook_reconciliation_interval as a safety net for missed events.
+webhook_debounce_seconds = 2
+webhook_reconciliation_interval = 300  # seconds
+# Shared secret NocoDB must send in the webhook_secret_header of every event; the webhook
+# server does not start without one
+webhook_secret = os.environ.get('REFRESH_WEBHOOK_SECRET', '')
+webhook_secret_header = 'X-Webhook-Secret'
+
+# Periodic task cadences (seconds) and the random jitter added to each run
+check_interval_seconds = 10
+rank_check_interval = 60
+reload_questions_interval = 300
+question_backfill_interval = 300
+stats_log_interval = 300
+task_jitter_seconds = {"interview_check": 1, "rank_check": 5, "reload_questions": 10, "reconciliation": 30,
+                       "question_backfill": 30}
+
+# Time budgets (seconds) for scheduled tasks, webhook-triggered checks and startup work.
+# Every NocoDB call is capped to the time left (see deadlines.py); once a budget is spent
+# the remaining work is cancelled, reported, and left for the next run.
+task_deadline_seconds = {"interview_check": 120, "rank_check": 60, "reconciliation": 300,
+                         "question_backfill": 600, "webhook": 120, "startup": 600}
+
+scheduler = Scheduler()
+webhook_state = {
+    "condition": threading.Condition(),
+    "job_ids": set(),
+    "unscoped": False
+}
 
-# Link API endpoint for connecting interviews to candidates
-# mpims4p3zrwsarx = Interview table ID
-# c4gkn9aehmsg1n5 = Link field ID for connecting to candidates
-link_api_url = "http://20.254.105.163:8080/api/v2/tables/mpims4p3zrwsarx/links/c4gkn9aehmsg1n5/records/{recordId}"
+# NocoDB tables, reached through the shared pooled client (see nocodb_client.py)
+nocodb = NocoDBClient(on_request=count_api_call)
+jobs_table_id = JOBS_TABLE
+links_table_id = JOB_CV_LINKS_TABLE
+links_job_field = JOB_CV_LINKS_JOB_FIELD
+interviews_table_id = INTERVIEWS_TABLE
+candidates_table_id = CANDIDATES_TABLE
+
+portal_base_url = "http://20.254.105.163:8501/"
 
 # Load interview questions from file
 def load_questions_from_file(filename="interview_questions.txt"):
@@ -115,6 +236,21 @@ def get_interview_title(client, job_title, first_name, last_name):
     logging.debug(f"Generated interview title: {title}")
     return title
 
+def get_interview_key(role_id, candidate_id=None, cv_filename=None, first_name=None, last_name=None):
+    """Deterministic idempotency key for the interview of a (role, candidate) pair.
+    Uses the candidate ID when known, otherwise the CV filename, otherwise the name."""
+    if candidate_id is not None:
+        identity = f"candidate:{candidate_id}"
+    elif cv_filename:
+        identity = f"cv:{cv_filename}"
+    else:
+        identity = f"name:{first_name} {last_name}"
+    return hashlib.sha1(f"role:{role_id}|{identity}".encode('utf-8')).hexdigest()
+
+def get_pair_key(pair: Dict) -> str:
+    return get_interview_key(pair.get("role_id"), pair.get("candidate_id"), pair.get("cv_filename"),
+                             pair.get("first_name"), pair.get("last_name"))
+
 def get_portal_link(job_title, first_name, last_name, interview_id=None, cv_filename=None, role_path=None):
     # URL encode the parameters
     role = urllib.parse.quote(job_title)
@@ -141,50 +277,64 @@ def get_portal_link(job_title, first_name, last_name, interview_id=None, cv_file
 def get_current_datetime():
     return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-def find_candidate_id(first_name: str, last_name: str) -> Optional[int]:
-    """Find the candidate ID in the candidates table based on first and last name.
-    Returns the ID as an integer."""
+def parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """Parse a NocoDB timestamp into an aware datetime; naive values are taken as UTC."""
+    if not value:
+        return None
     try:
-        search_params = {
-            'limit': 100,
-            'shuffle': 0,
-            'offset': 0,
-            'where': f"(First Name,eq,{first_name})~and(Last Name,eq,{last_name})"
-        }
-        
-        response = requests.get(candidates_url, headers=headers, params=search_params)
-        
-        if response.status_code != 200:
-            logging.error(f"Failed to search for candidate. Status code: {response.status_code}")
-            return None
-            
-        candidates_data = response.json()
-        candidates = candidates_data.get('list', [])
-        
-        if not candidates:
-            logging.warning(f"No candidate found with name: {first_name} {last_name}")
-            return None
-            
-        # Return the ID of the first matching candidate as an integer
-        candidate_id = candidates[0].get('Id')
-        if candidate_id is not None:
-            # Convert to integer
-            candidate_id = int(candidate_id)
-            logging.info(f"Found candidate ID {candidate_id} for {first_name} {last_name}")
-            return candidate_id
-        else:
-            logging.warning(f"Candidate found but ID is missing for {first_name} {last_name}")
-            return None
-        
-    except Exception as e:
-        logging.error(f"Error finding candidate ID: {str(e)}")
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
         return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+def iter_records(table: str, extra_params: Optional[Dict] = None,
+                 parallelism: int = page_fetch_parallelism) -> Iterator[Dict]:
+    """Stream every record of a table in Id order, fetching up to `parallelism` pages at
+    a time (see NocoDBClient.iter_records)."""
+    return nocodb.iter_records(table, extra_params, parallelism)
 
-def get_all_candidate_job_pairs(jobs_data):
+def load_candidate_index() -> Dict[tuple, int]:
+    """Load a (First Name, Last Name) -> candidate ID index from the candidates table.
+    Used for CV relations that do not carry the candidate ID themselves. A recent copy in
+    the state store is reused instead of refetching the table."""
+    if state_store is not None:
+        candidate_index = state_store.load_candidate_index(candidate_index_max_age)
+        if candidate_index is not None:
+            logging.info(f"Loaded candidate index with {len(candidate_index)} candidates from the state store")
+            return candidate_index
+    
+    candidate_index = {}
+    try:
+        for candidate in iter_records(candidates_table_id, {'fields': 'Id,First Name,Last Name'}):
+            candidate_id = candidate.get('Id')
+            key = (candidate.get('First Name'), candidate.get('Last Name'))
+            # Keep the first match, like the per-name lookup did
+            if candidate_id is not None and key not in candidate_index:
+                candidate_index[key] = int(candidate_id)
+    except Exception as e:
+        logging.error(f"Error loading candidate index: {str(e)}")
+        return {}
+    
+    logging.info(f"Loaded candidate index with {len(candidate_index)} candidates")
+    if state_store is not None:
+        state_store.save_candidate_index(candidate_index)
+    return candidate_index
+
+def get_all_candidate_job_pairs(jobs_data, candidate_index: Optional[Dict[tuple, int]] = None):
+    """Extract all candidate-job pairs from a jobs response (or any iterable of jobs)."""
     logging.info("Extracting candidate-job pairs...")
-    pairs = []
+    jobs = jobs_data['list'] if isinstance(jobs_data, dict) else jobs_data
+    pairs = list(iter_candidate_job_pairs(jobs, candidate_index))
+    logging.info(f"Found {len(pairs)} total candidate-job pairs")
+    return pairs
+
+def iter_candidate_job_pairs(jobs: Iterable[Dict], candidate_index: Optional[Dict[tuple, int]] = None):
+    """Yield candidate-job pairs from jobs and their nested CV relations.
     
-    for job in jobs_data['list']:
+    The candidate ID is taken from the related CV record. The name-keyed candidate index is
+    only loaded (at most once per call, unless passed in) for relations without an ID, so
+    pair extraction makes no per-candidate requests."""
+    for job in jobs:
         job_title = job.get("Job Title")
         client = job.get("Client")
         role_id = job.get("Id")  # Get the role ID from the job
@@ -194,7 +344,7 @@ def get_all_candidate_job_pairs(jobs_data):
             continue
             
         logging.info(f"Processing job: {job_title} (ID: {role_id}) for client: {client or 'No Client'}")
-        for cv_relation in job.get("nc_92rx___nc_m2m_JobDescription_CVs", []):
+        for cv_relation in job.get(jobs_cv_relation_field) or []:
             cv = cv_relation.get("CV")
             if cv:
                 first_name = cv.get("First Name")
@@ -207,25 +357,32 @@ def get_all_candidate_job_pairs(jobs_data):
                     # Use the title from the first file in the array
                     cv_filename = cv_files[0].get("title")
                 
-                # Look up the candidate ID
-                candidate_id = find_candidate_id(first_name, last_name)
+                # Use the candidate ID from the related CV record, falling back to the name index
+                candidate_id = cv.get("Id")
+                if candidate_id is None:
+                    if candidate_index is None:
+                        candidate_index = load_candidate_index()
+                    candidate_id = candidate_index.get((first_name, last_name))
+                else:
+                    candidate_id = int(candidate_id)
                 
                 logging.info(f"  Found candidate: {first_name} {last_name}" + 
                            (f" (ID: {candidate_id})" if candidate_id else " (ID not found)") +
                            (f", CV File: {cv_filename}" if cv_filename else ", No CV File"))
                 
-                pairs.append({
+                yield {
                     "job_title": job_title,
                     "client": client,
                     "first_name": first_name,
                     "last_name": last_name,
                     "candidate_id": candidate_id,
                     "cv_filename": cv_filename,
-                    "role_id": role_id  # Include role ID in the pairs
-                })
-    
-    logging.info(f"Found {len(pairs)} total candidate-job pairs")
-    return pairs
+                    "role_id": role_id,  # Include role ID in the pairs
+                    # When the CV was linked to the job, for the link-to-interview lag metric.
+                    # Only the link row's own timestamp says that; without it the pair is not
+                    # observed (the job's UpdatedAt moves with unrelated edits).
+                    "linked_at": cv_relation.get("CreatedAt")
+                }
 
 def link_interview_to_candidate(interview_id: int, candidate_id: int) -> bool:
     """Link an interview to a candidate using the link API."""
@@ -233,378 +390,1036 @@ def link_interview_to_candidate(interview_id: int, candidate_id: int) -> bool:
         logging.warning("Cannot link interview to candidate: missing ID")
         return False
     
-    # Format the URL with the interview ID
-    link_url = f"http://20.254.105.163:8080/api/v2/tables/mpims4p3zrwsarx/links/c4gkn9aehmsg1n5/records/{interview_id}"
-    
-    # Format the payload exactly like the working CURL example
-    payload = [{"Id": candidate_id}]
-    
     try:
         logging.info(f"Linking interview {interview_id} to candidate {candidate_id}")
-        logging.info(f"Using link URL: {link_url}")
-        logging.info(f"Payload: {json.dumps(payload)}")
-        
-        # Make the request with the exact same headers as in the CURL example
-        link_headers = {
-            'accept': 'application/json',
-            'xc-token': TOKEN,
-            'Content-Type': 'application/json'
-        }
-        
-        response = requests.post(link_url, headers=link_headers, json=payload)
-        
-        # Log the complete response
-        logging.info(f"Response status code: {response.status_code}")
-        logging.info(f"Response headers: {response.headers}")
-        try:
-            response_text = response.text
-            logging.info(f"Response body: {response_text}")
-            
-            # Accept both 200 and 201 as success codes
-            # 201 means "Created" which is a success for link creation
-            if response.status_code == 200 or response.status_code == 201:
-                logging.info(f"✓ Successfully linked interview {interview_id} to candidate {candidate_id}")
-                return True
-            else:
-                logging.error(f"✗ Failed to link interview to candidate. Status code: {response.status_code}")
-                return False
-        except Exception as e:
-            logging.error(f"Error processing response: {str(e)}")
-            return False
+        nocodb.link_records(interviews_table_id, INTERVIEW_CANDIDATE_LINK_FIELD, interview_id, [candidate_id])
+        logging.info(f"✓ Successfully linked interview {interview_id} to candidate {candidate_id}")
+        return True
     except Exception as e:
-        logging.error(f"Error linking interview to candidate: {str(e)}")
+        logging.error(f"✗ Failed to link interview {interview_id} to candidate {candidate_id}: {str(e)}")
         return False
 
-def create_interview(client, job_title, first_name, last_name, candidate_id=None, cv_filename=None, role_id=None):
-    interview_date = (datetime.now() + timedelta(weeks=2)).strftime("%Y-%m-%d")
-    current_datetime = get_current_datetime()
-    
+def get_formatted_role_name(job_title, role_id=None):
     # Create role name in the same format as download_and_upload_cvs.py
     sanitized_role_name = job_title.replace(' ', '_')
-    formatted_role_name = f"{role_id}_{sanitized_role_name}" if role_id else sanitized_role_name
-    
-    logging.info(f"Creating interview for:")
-    logging.info(f"  Client: {client or 'No Client'}")
-    logging.info(f"  Job Title: {job_title}")
-    logging.info(f"  Role ID: {role_id or 'Not available'}")
-    logging.info(f"  Formatted Role Name: {formatted_role_name}")
-    logging.info(f"  Candidate: {first_name} {last_name}")
-    logging.info(f"  Candidate ID: {candidate_id or 'Not found'}")
-    logging.info(f"  CV Filename: {cv_filename or 'Not available'}")
-    logging.info(f"  Scheduled Date: {interview_date}")
-    logging.info(f"  Date Added: {current_datetime}")
+    return f"{role_id}_{sanitized_role_name}" if role_id else sanitized_role_name
+
+def build_interview_payload(pair: Dict) -> Dict:
+    """Build the insert payload for a candidate-job pair (before the interview ID is known)."""
+    formatted_role_name = get_formatted_role_name(pair["job_title"], pair.get("role_id"))
     
     # Initially create with a temporary portal link, including CV filename and role path
-    initial_portal_link = get_portal_link(job_title, first_name, last_name, cv_filename=cv_filename, role_path=formatted_role_name)
+    initial_portal_link = get_portal_link(pair["job_title"], pair["first_name"], pair["last_name"],
+                                          cv_filename=pair.get("cv_filename"), role_path=formatted_role_name)
     
-    # Get random questions for this interview
-    interview_questions = get_random_questions()
-    
-    payload = {
-        "Title": get_interview_title(client, job_title, first_name, last_name),
+    return {
+        "Title": get_interview_title(pair["client"], pair["job_title"], pair["first_name"], pair["last_name"]),
         "Interview Portal Link": initial_portal_link,
-        "Interview Due Date": interview_date,
+        "Interview Due Date": (datetime.now() + timedelta(weeks=2)).strftime("%Y-%m-%d"),
         "Interview Status": "Ready for Interview",
         "Interview Rank": 0,
-        "Questions": interview_questions,
-        "Date Added": current_datetime,
-        "CV Name": cv_filename,  # Added CV Name field
-        "Role Name": formatted_role_name  # Add formatted role name field
+        "Questions": get_random_questions(),  # Get random questions for this interview
+        "Date Added": get_current_datetime(),
+        "CV Name": pair.get("cv_filename"),
+        "Role Name": formatted_role_name,
+        interview_key_field: get_pair_key(pair)
     }
+
+def insert_interviews(payloads: List[Dict]) -> List[Dict]:
+    """Insert interview records with a single array POST.
     
-    logging.debug("Sending API request with payload:")
-    logging.debug(json.dumps(payload, indent=2))
+    If the bulk insert is rejected, each record is retried with its own POST so one bad
+    record does not fail the whole batch.
     
+    Returns:
+        list: One {"created", "id", "error"} entry per payload, in order
+    """
     try:
-        response = requests.post(interview_url, headers=headers, json=payload)
+        rows = nocodb.insert_records(interviews_table_id, payloads)
+        error = None
+    except Exception as e:
+        rows = None
+        error = str(e)
+    
+    if error is None:
+        rows = rows if isinstance(rows, list) else [rows]
+        if len(rows) != len(payloads):
+            # We cannot tell which record belongs to which payload, so look each one up by
+            # its key. Keys that are not found are released for the next cycle, whose
+            # interviews feed sees any record inserted after all, so nothing is created twice.
+            error = f"Bulk insert returned {len(rows)} records for {len(payloads)} payloads"
+            logging.error(f"✗ {error}")
+            try:
+                existing_ids = find_interviews_by_key([payload[interview_key_field] for payload in payloads])
+            except Exception as e:
+                logging.error(f"Could not look up the inserted interviews: {str(e)}")
+                existing_ids = {}
+            return [{"created": True, "id": existing_ids[payload[interview_key_field]], "error": None}
+                    if payload[interview_key_field] in existing_ids
+                    else {"created": False, "id": None, "error": f"{error}; not found by key"}
+                    for payload in payloads]
         
-        if response.status_code == 200:
-            response_data = response.json()
-            # Check for Id with capital I (as shown in the logs)
-            interview_id = response_data.get('Id')
-            
-            # Convert interview_id to integer if it's not None
-            if interview_id is not None:
-                try:
-                    interview_id = int(interview_id)
-                    logging.info(f"✓ Interview created successfully with ID: {interview_id}")
-                    
-                    # Create the updated portal link with the interview ID, CV filename, and role path
-                    updated_portal_link = get_portal_link(job_title, first_name, last_name, interview_id, cv_filename, formatted_role_name)
-                    logging.info(f"Updating portal link to include interview ID, CV filename, and role path: {updated_portal_link}")
-                    
-                    # Use the PATCH format that works based on your CURL example
-                    update_payload = {
-                        "Id": interview_id,
-                        "Interview Portal Link": updated_portal_link
-                    }
-                    
-                    logging.info(f"Using update URL: {interview_url}")
-                    logging.info(f"Update payload: {json.dumps(update_payload)}")
-                    
-                    update_response = requests.patch(interview_url, headers=headers, json=update_payload)
-                    if update_response.status_code >= 200 and update_response.status_code < 300:
-                        logging.info("✓ Updated interview portal link successfully")
-                    else:
-                        logging.warning(f"✗ Failed to update portal link. Status code: {update_response.status_code}")
-                        logging.warning(f"Error response: {update_response.text}")
-                        
-                except ValueError:
-                    logging.warning(f"Interview ID could not be converted to integer: {interview_id}")
-            else:
-                logging.warning("Interview created but no ID returned")
-                logging.info(f"Full response data: {json.dumps(response_data)}")
-                return True
-                
-            # Link the interview to the candidate if we have a candidate ID
-            if candidate_id is not None and interview_id is not None:
-                # Add a small delay to ensure the interview record is fully created
-                time.sleep(2)
-                link_success = link_interview_to_candidate(interview_id, candidate_id)
-                if link_success:
-                    logging.info("✓ Interview linked to candidate successfully")
-                else:
-                    logging.warning("✗ Failed to link interview to candidate")
-                    
-            return True
+        results = []
+        for row in rows:
+            interview_id = row.get('Id') if isinstance(row, dict) else None
+            try:
+                interview_id = int(interview_id) if interview_id is not None else None
+            except ValueError:
+                logging.warning(f"Interview ID could not be converted to integer: {interview_id}")
+                interview_id = None
+            results.append({"created": True, "id": interview_id,
+                            "error": None if interview_id is not None else "No ID returned"})
+        return results
+    
+    # The request may have failed after the server inserted some records (e.g. a dropped
+    # connection), so look the keys up before retrying rather than inserting twice
+    try:
+        existing_ids = find_interviews_by_key([payload[interview_key_field] for payload in payloads])
+    except Exception as e:
+        logging.error(f"Could not check for already inserted interviews, not retrying: {str(e)}")
+        return [{"created": False, "id": None, "error": error} for _ in payloads]
+    
+    results = []
+    for payload in payloads:
+        key = payload[interview_key_field]
+        if key in existing_ids:
+            logging.info(f"Interview already exists for key {key}: {existing_ids[key]}")
+            results.append({"created": True, "id": existing_ids[key], "error": None})
+        elif len(payloads) == 1:
+            results.append({"created": False, "id": None, "error": error})
         else:
-            logging.error(f"✗ Failed to create interview. Status code: {response.status_code}")
-            logging.error(f"Error response: {response.text}")
-            return False
+            results.append(None)
+    
+    if len(payloads) > 1:
+        logging.warning(f"Bulk insert of {len(payloads)} interviews failed ({error}); retrying one by one")
+        results = [result or insert_interviews([payload])[0] for payload, result in zip(payloads, results)]
+    return results
+
+def check_interview_key_field():
+    """Make sure the interviews table has the idempotency key column before any interview is
+    created. Without it retries and overlapping cycles would create duplicate interviews.
+    
+    Raises:
+        ValueError: If the column is missing (see "Interview Key migration" in the README)
+    """
+    try:
+        columns = nocodb.get_column_titles(interviews_table_id)
     except Exception as e:
-        logging.error(f"Error creating interview: {str(e)}")
-        return False
+        logging.error(f"✗ Could not check the interviews table for the '{interview_key_field}' column, "
+                      f"duplicate interviews are possible if it is missing: {str(e)}")
+        return
+    if interview_key_field not in columns:
+        raise ValueError(f"The interviews table has no '{interview_key_field}' column; add it as a "
+                         f"SingleLineText field before starting (see \"Interview Key migration\" in the README)")
+    logging.info(f"✓ Interviews table has the '{interview_key_field}' column")
+
+def find_interviews_by_key(keys: List[str]) -> Dict[str, int]:
+    """Look up existing interviews by idempotency key. Returns key -> interview ID."""
+    if not keys:
+        return {}
+    query = {
+        'fields': f"Id,{interview_key_field}",
+        'where': "~or".join(f"({interview_key_field},eq,{key})" for key in keys)
+    }
+    return {record[interview_key_field]: int(record['Id'])
+            for record in iter_records(interviews_table_id, query) if record.get('Id') is not None}
+
+def bulk_update_records(table: str, updates: List[Dict]) -> List[Optional[str]]:
+    """Apply several record updates with a single array PATCH.
+    
+    If the bulk update is rejected, each update is retried with its own PATCH.
+    
+    Returns:
+        list: One error message (or None on success) per update, in order
+    """
+    if not updates:
+        return []
+    
+    try:
+        nocodb.update_records(table, updates)
+        return [None] * len(updates)
+    except DeadlineExceeded as e:
+        # Nothing was sent and nothing more can be
+        return [str(e)] * len(updates)
+    except Exception as e:
+        error = str(e)
+    
+    if len(updates) == 1:
+        return [error]
+    
+    logging.warning(f"Bulk update of {len(updates)} records failed ({error}); retrying one by one")
+    return [bulk_update_records(table, [update])[0] for update in updates]
 
-def update_interview_ranks():
-    """Check interviews with 'Complete' status and special CV filenames and set their rank to 5."""
+def create_interviews_batch(pairs: List[Dict]) -> List[Dict]:
+    """Create interviews for several candidate-job pairs using batched API calls.
+    
+    1. Insert all interview records with one array POST.
+    2. Set the portal links, which need the new interview IDs, with one array PATCH.
+    3. Queue a link from each interview to its candidate. The link API takes one
+       interview per call; the background link workers write several at a time and
+       retry failures, so creation does not wait on them.
+    
+    Returns:
+        list: One result per pair with title, interview_id, created, portal_link_updated,
+        link_queued and error, so failures are reported per interview
+    """
+    if not pairs:
+        return []
+    
+    payloads = [build_interview_payload(pair) for pair in pairs]
+    logging.info(f"Creating {len(payloads)} interviews in one batch")
+    logging.debug(json.dumps(payloads, indent=2))
+    
+    results = []
+    for pair, payload, inserted in zip(pairs, payloads, insert_interviews(payloads)):
+        results.append({
+            "title": payload["Title"],
+            "interview_key": payload[interview_key_field],
+            "job_id": pair.get("role_id"),
+            "interview_id": inserted["id"],
+            "candidate_id": pair.get("candidate_id"),
+            "created": inserted["created"],
+            "portal_link_updated": False,
+            "link_queued": False,
+            "error": inserted["error"]
+        })
+    
+    # Update the portal links to include the interview ID, CV filename, and role path
+    to_update = [(pair, result) for pair, result in zip(pairs, results) if result["interview_id"] is not None]
+    updates = [{
+        "Id": result["interview_id"],
+        "Interview Portal Link": get_portal_link(
+            pair["job_title"], pair["first_name"], pair["last_name"], result["interview_id"],
+            pair.get("cv_filename"), get_formatted_role_name(pair["job_title"], pair.get("role_id")))
+    } for pair, result in to_update]
+    for (pair, result), error in zip(to_update, bulk_update_records(interviews_table_id, updates)):
+        result["portal_link_updated"] = error is None
+        if error:
+            result["error"] = f"Portal link update failed: {error}"
+    
+    # Link the interviews to their candidates in the background
+    for result in results:
+        if result["interview_id"] is not None and result["candidate_id"] is not None:
+            enqueue_candidate_link(result["interview_id"], result["candidate_id"])
+            result["link_queued"] = True
+    
+    for pair, result in zip(pairs, results):
+        linked_at = parse_timestamp(pair.get("linked_at"))
+        if result["created"] and linked_at is not None:
+            lag = (datetime.now(timezone.utc) - linked_at).total_seconds()
+            metrics.observe("interview_link_to_interview_lag_seconds", max(0.0, lag), LAG_BUCKETS)
+    
+    for result in results:
+        if result["created"] and not result["error"]:
+            logging.info(f"✓ Created interview {result['interview_id']}: {result['title']}")
+        elif result["created"]:
+            logging.warning(f"⚠ Created interview {result['interview_id']} with problems: "
+                            f"{result['title']} - {result['error']}")
+        else:
+            logging.error(f"✗ Failed to create interview: {result['title']} - {result['error']}")
+    
+    return results
+
+def link_queue_worker():
+    """Write queued interview-candidate links, rescheduling failed ones with backoff."""
+    link_queue = link_queue_state["queue"]
+    condition = link_queue_state["condition"]
+    while True:
+        interview_id, candidate_id, attempt = link_queue.get()
+        done = True
+        try:
+            if link_interview_to_candidate(interview_id, candidate_id):
+                logging.info(f"✓ Interview {interview_id} linked to candidate {candidate_id}")
+            elif attempt + 1 < link_retry_attempts:
+                delay = link_retry_base_delay * (2 ** attempt)
+                logging.info(f"Retrying link for interview {interview_id} in {delay:.2f}s "
+                             f"(attempt {attempt + 2} of {link_retry_attempts})")
+                retry = threading.Timer(delay, link_queue.put, args=[(interview_id, candidate_id, attempt + 1)])
+                retry.daemon = True
+                retry.start()
+                done = False
+            else:
+                logging.error(f"✗ Giving up linking interview {interview_id} to candidate {candidate_id} "
+                              f"after {link_retry_attempts} attempts")
+        except Exception as e:
+            logging.error(f"Error in link queue worker: {str(e)}")
+        finally:
+            if done:
+                if state_store is not None:
+                    state_store.remove_pending_link(interview_id, candidate_id)
+                with condition:
+                    link_queue_state["pending"] -= 1
+                    condition.notify_all()
+
+def enqueue_candidate_link(interview_id: int, candidate_id: int, persist: bool = True):
+    """Queue an interview-candidate link for the background link workers.
+    The link is recorded in the state store until it is written, so a restart resumes it."""
+    if persist and state_store is not None:
+        state_store.add_pending_link(interview_id, candidate_id)
+    condition = link_queue_state["condition"]
+    with condition:
+        if not link_queue_state["started"]:
+            for i in range(link_parallelism):
+                threading.Thread(target=link_queue_worker, name=f"link-worker-{i}", daemon=True).start()
+            link_queue_state["started"] = True
+        link_queue_state["pending"] += 1
+    link_queue_state["queue"].put((interview_id, candidate_id, 0))
+
+def wait_for_pending_links(timeout: Optional[float] = None) -> bool:
+    """Block until every queued link has been written or given up on.
+    Returns False if the timeout expired first."""
+    condition = link_queue_state["condition"]
+    with condition:
+        return condition.wait_for(lambda: link_queue_state["pending"] == 0, timeout)
+
+def create_interview(client, job_title, first_name, last_name, candidate_id=None, cv_filename=None, role_id=None):
+    """Create a single interview. See create_interviews_batch() for creating several at once."""
+    results = create_interviews_batch([{
+        "client": client,
+        "job_title": job_title,
+        "first_name": first_name,
+        "last_name": last_name,
+        "candidate_id": candidate_id,
+        "cv_filename": cv_filename,
+        "role_id": role_id
+    }])
+    return results[0]["created"]
+
+def update_interview_ranks(full: bool = False):
+    """Check interviews with 'Complete' status and special CV filenames and set their rank to 5.
+    
+    The status, CV name and rank conditions are evaluated by the API, and only interviews
+    updated since the last check are considered (all of them on the first run or when
+    full is True). Matches are updated with batched array PATCHes, so a check where
+    nothing has completed costs one small request."""
+    if not holds_global_lease():
+        logging.info("Not the leader of partition 0, skipping rank check")
+        return 0
     logging.info("=== Checking for Completed Interviews with Special CV Files ===")
     
+    if full:
+        sync_state["ranks_watermark"] = None
+    previous_watermark = sync_state["ranks_watermark"]
     try:
-        # Fetch existing interviews
-        interviews_response = requests.get(interview_url, headers=headers, params=params)
+        cv_filter = "~or".join(f"(CV Name,eq,{cv_name})" for cv_name in SPECIAL_CV_FILES)
+        query = changed_since(previous_watermark, {
+            'fields': 'Id,CV Name,UpdatedAt',
+            'where': f"(Interview Status,eq,Complete)~and(Interview Rank,neq,5)~and({cv_filter})"
+        })
         
-        if interviews_response.status_code != 200:
-            logging.error(f"Failed to fetch interviews. Status code: {interviews_response.status_code}")
-            return 0
-            
-        interviews_data = interviews_response.json()
-        existing_interviews = interviews_data.get('list', [])
-        logging.info(f"Found {len(existing_interviews)} existing interviews to check")
+        # Collect the matches first: patching while paging through the filtered result
+        # would shift the offsets and skip records
+        matches = [interview for interview in iter_with_watermark(iter_records(interviews_table_id, query), "ranks_watermark")
+                   if interview.get('Id') is not None]
         
         updated_count = 0
-        for interview in existing_interviews:
-            interview_id = interview.get('Id')
-            interview_status = interview.get('Interview Status')
-            cv_name = interview.get('CV Name')
-            current_rank = interview.get('Interview Rank')
-            
-            # Check if the interview status is "Complete" and the CV name is in our special list
-            if (interview_id is not None and 
-                interview_status == "Complete" and 
-                cv_name in SPECIAL_CV_FILES and
-                current_rank != 5):
-                
-                update_payload = {
-                    "Id": interview_id,
-                    "Interview Rank": 5
-                }
-                
-                logging.info(f"Setting rank to 5 for interview ID {interview_id} with CV: {cv_name}")
-                logging.info(f"Update payload: {json.dumps(update_payload)}")
-                
-                update_response = requests.patch(interview_url, headers=headers, json=update_payload)
-                if update_response.status_code >= 200 and update_response.status_code < 300:
-                    logging.info(f"✓ Successfully updated interview rank for {interview_id}")
-                    updated_count += 1
+        failed_count = 0
+        for start in range(0, len(matches), bulk_update_batch_size):
+            check_deadline()
+            batch = matches[start:start + bulk_update_batch_size]
+            updates = [{"Id": interview['Id'], "Interview Rank": 5} for interview in batch]
+            for interview, error in zip(batch, bulk_update_records(interviews_table_id, updates)):
+                if error:
+                    logging.error(f"✗ Failed to update interview rank for {interview['Id']}: {error}")
+                    failed_count += 1
                 else:
-                    logging.error(f"✗ Failed to update interview rank. Status code: {update_response.status_code}")
-                    logging.error(f"Error response: {update_response.text}")
+                    logging.info(f"✓ Set rank to 5 for interview ID {interview['Id']} with CV: {interview.get('CV Name')}")
+                    updated_count += 1
+        
+        if failed_count:
+            # Re-read the same window next time so the failed updates are retried
+            reset_watermark("ranks_watermark", previous_watermark)
+        save_sync_values(["ranks_watermark"])
         
         logging.info(f"=== Updated rank for {updated_count} completed interviews with special CV files ===")
         return updated_count
+    except DeadlineExceeded as e:
+        # The matches may be only partly updated, so re-read the same window next time
+        reset_watermark("ranks_watermark", previous_watermark)
+        logging.warning(f"✗ Rank check cancelled: {str(e)}")
+        return 0
     except Exception as e:
+        reset_watermark("ranks_watermark", previous_watermark)
         logging.error(f"Error updating interview ranks: {str(e)}")
         return 0
 
 def update_existing_interviews():
-    """Updates all existing interviews to set status to Ready for Interview and add questions."""
+    """Give questions to interviews that have none yet and mark them Ready for Interview.
+    
+    Only interviews without questions that are not complete are fetched (filtered
+    server-side), then updated with batched array PATCHes, so each run's cost grows with
+    the number of interviews needing questions rather than with the table. Runs as a
+    scheduled task, so a standby that becomes the leader picks the backfill up at its next run."""
+    if not holds_global_lease():
+        logging.info("Not the leader of partition 0, skipping question backfill")
+        return 0
     logging.info("=== Updating Existing Interviews ===")
     
     try:
-        # Fetch existing interviews
-        interviews_response = requests.get(interview_url, headers=headers, params=params)
-        
-        if interviews_response.status_code != 200:
-            logging.error(f"Failed to fetch interviews. Status code: {interviews_response.status_code}")
-            return 0
-            
-        interviews_data = interviews_response.json()
-        existing_interviews = interviews_data.get('list', [])
-        logging.info(f"Found {len(existing_interviews)} existing interviews to update")
+        # Collect the IDs first: patching while paging through the filtered result would
+        # shift the offsets and skip records
+        query = {
+            'fields': 'Id',
+            'where': "(Questions,blank)~and(Interview Status,neq,Complete)"
+        }
+        updates = [{
+            "Id": interview['Id'],
+            "Questions": get_random_questions(),  # Generate new random questions for each interview
+            "Interview Status": "Ready for Interview"
+        } for interview in iter_records(interviews_table_id, query) if interview.get('Id') is not None]
+        logging.info(f"Found {len(updates)} interviews without questions")
         
         updated_count = 0
-        for interview in existing_interviews:
-            interview_id = interview.get('Id')
-            if interview_id is not None:
-                # Generate new random questions for each interview
-                interview_questions = get_random_questions()
-                
-                update_payload = {
-                    "Id": interview_id,
-                    "Text": interview_questions,
-                    "Interview Status": "Ready for Interview"
-                }
-                
-                logging.info(f"Updating interview ID {interview_id}")
-                logging.info(f"Update payload: {json.dumps(update_payload)}")
-                
-                update_response = requests.patch(interview_url, headers=headers, json=update_payload)
-                if update_response.status_code >= 200 and update_response.status_code < 300:
-                    logging.info(f"✓ Successfully updated interview {interview_id}")
-                    updated_count += 1
+        for start in range(0, len(updates), bulk_update_batch_size):
+            check_deadline()
+            batch = updates[start:start + bulk_update_batch_size]
+            for update, error in zip(batch, bulk_update_records(interviews_table_id, batch)):
+                if error:
+                    logging.error(f"✗ Failed to update interview {update['Id']}: {error}")
                 else:
-                    logging.error(f"✗ Failed to update interview {interview_id}. Status code: {update_response.status_code}")
-                    logging.error(f"Error response: {update_response.text}")
+                    updated_count += 1
         
         logging.info(f"=== Updated {updated_count} existing interviews ===")
         return updated_count
+    except DeadlineExceeded as e:
+        # The rest still have no questions and are picked up by the next run
+        logging.warning(f"✗ Question backfill cancelled: {str(e)}")
+        return 0
     except Exception as e:
         logging.error(f"Error updating existing interviews: {str(e)}")
         return 0
 
-def check_and_create_interviews():
+def changed_since(watermark: Optional[str], extra_params: Optional[Dict] = None,
+                  field: str = "UpdatedAt") -> Dict:
+    """Build query parameters limited to rows whose timestamp field (UpdatedAt unless given)
+    is at or after the watermark (if any), combined with any existing where clause.
+    Timestamps have one-second resolution, so the watermark's own second is read again;
+    iter_with_watermark skips the rows already seen."""
+    query = dict(extra_params or {})
+    if watermark:
+        updated_filter = f"({field},gte,exactDate,{watermark})"
+        query['where'] = f"({query['where']})~and{updated_filter}" if query.get('where') else updated_filter
+    return query
+
+def iter_jobs_by_id(job_ids: Iterable[int], params: Dict) -> Iterator[Dict]:
+    """Stream the given jobs, filtering on at most job_id_filter_batch_size Ids per query."""
+    job_ids = sorted(job_ids)
+    for start in range(0, len(job_ids), job_id_filter_batch_size):
+        query = dict(params)
+        query['where'] = "~or".join(f"(Id,eq,{job_id})" for job_id in job_ids[start:start + job_id_filter_batch_size])
+        yield from iter_records(jobs_table_id, query)
+
+def iter_with_watermark(records: Iterable[Dict], watermark_key: str, field: str = "UpdatedAt") -> Iterator[Dict]:
+    """Yield records while tracking the highest timestamp field (UpdatedAt unless given) seen
+    in sync_state[watermark_key]. Records at the starting watermark that an earlier read
+    already yielded are skipped."""
+    start = sync_state[watermark_key]
+    seen_at_start = sync_state["watermark_ids"].get(watermark_key, set()) if start else set()
+    highest = start
+    highest_ids = set(seen_at_start)
+    for record in records:
+        updated_at = record.get(field)
+        if updated_at == start and record.get("Id") in seen_at_start:
+            continue
+        if updated_at and (highest is None or updated_at > highest):
+            highest = updated_at
+            highest_ids = set()
+        if updated_at and updated_at == highest:
+            highest_ids.add(record.get("Id"))
+        yield record
+    # Only advance once the whole feed has been consumed, so a failed cycle is re-read
+    sync_state[watermark_key] = highest
+    sync_state["watermark_ids"][watermark_key] = highest_ids
+
+def read_linked_job_ids() -> Set[int]:
+    """Read the link table rows created since the links watermark and return the jobs they
+    belong to, advancing the watermark."""
+    query = changed_since(sync_state["links_watermark"],
+                          {'fields': f"Id,{links_job_field},CreatedAt"}, field="CreatedAt")
+    job_ids = set()
+    for link in iter_with_watermark(iter_records(links_table_id, query), "links_watermark", field="CreatedAt"):
+        if link.get(links_job_field) is not None:
+            job_ids.add(int(link[links_job_field]))
+    return job_ids
+
+def seed_links_watermark():
+    """Move the links watermark to the newest link, without reading the rest of the link
+    table; a full reconciliation reads every job's links anyway."""
+    latest = nocodb.list_records(links_table_id, {'fields': 'Id,CreatedAt', 'sort': '-Id', 'limit': 1}).get('list', [])
+    if latest and latest[0].get("CreatedAt"):
+        sync_state["links_watermark"] = latest[0]["CreatedAt"]
+        sync_state["watermark_ids"]["links_watermark"] = {latest[0].get("Id")}
+
+def reset_watermark(watermark_key: str, watermark: Optional[str]):
+    """Move a watermark back so its window is read again, including every record at it."""
+    sync_state[watermark_key] = watermark
+    sync_state["watermark_ids"].pop(watermark_key, None)
+
+def save_sync_values(names: Iterable[str]):
+    """Write the named sync_state watermarks to the state store, if one is open."""
+    if state_store is not None:
+        state_store.set_values({name: sync_state[name] for name in names})
+
+def open_state_store(path: str = STATE_STORE_PATH) -> bool:
+    """Open the local state store and restore sync_state and pending links from it.
+    
+    Restored keys and watermarks make the first cycle incremental; the next full
+    reconciliation is then due `full_reconciliation_interval` seconds after startup.
+    Returns True if previous state was restored."""
+    global state_store
+    if not path:
+        logging.info("State store disabled, starting with a full reconciliation")
+        return False
+    try:
+        state_store = StateStore(path)
+        values = state_store.get_values()
+        existing_keys, legacy_titles = state_store.load_interview_keys()
+        pending_links = state_store.list_pending_links()
+    except Exception as e:
+        logging.error(f"Error opening state store {path}, starting with a full reconciliation: {str(e)}")
+        state_store = None
+        return False
+    
+    for name in ("jobs_watermark", "interviews_watermark", "ranks_watermark", "links_watermark"):
+        sync_state[name] = values.get(name)
+    sync_state["retry_job_ids"] = set(json.loads(values.get("retry_job_ids") or "[]"))
+    
+    # Resume links that were queued when the previous run stopped
+    for interview_id, candidate_id in pending_links:
+        enqueue_candidate_link(interview_id, candidate_id, persist=False)
+    
+    restored = values.get("last_full_sync_at") is not None
+    if restored:
+        sync_state["existing_keys"] = existing_keys
+        sync_state["legacy_titles"] = legacy_titles
+        sync_state["last_full_sync"] = time.monotonic()
+        logging.info(f"Restored state from {path}: {len(existing_keys)} interview keys, "
+                     f"{len(legacy_titles)} legacy titles, jobs since {sync_state['jobs_watermark']}, "
+                     f"interviews since {sync_state['interviews_watermark']}, "
+                     f"{len(pending_links)} pending links")
+    else:
+        logging.info(f"No previous state in {path}, starting with a full reconciliation")
+    return restored
+
+def persist_sync_state(full_sync: bool, new_keys: Set[str], new_titles: Set[str]):
+    """Write the outcome of a successful scheduling cycle to the state store."""
+    if state_store is None:
+        return
+    try:
+        if full_sync:
+            state_store.replace_interview_keys(sync_state["existing_keys"], sync_state["legacy_titles"])
+            state_store.set_values({"last_full_sync_at": time.time()})
+        else:
+            state_store.add_interview_keys(new_keys, new_titles)
+        save_sync_values(["jobs_watermark", "interviews_watermark", "links_watermark"])
+        state_store.set_values({"retry_job_ids": json.dumps(sorted(sync_state["retry_job_ids"]))})
+    except Exception as e:
+        logging.error(f"Error saving state: {str(e)}")
+
+def job_in_partition(job_id) -> bool:
+    """Whether a job belongs to this instance's partition."""
+    partitions = partition_state["partitions"]
+    if partitions <= 1:
+        return True
+    return (int(job_id) if job_id is not None else 0) % partitions == partition_state["partition"]
+
+def holds_scheduling_lease() -> bool:
+    """Whether this instance may create interviews for its partition right now."""
+    elector = partition_state["elector"]
+    return elector is None or elector.is_leader()
+
+def holds_global_lease() -> bool:
+    """Whether this instance should do instance-wide work such as rank checks."""
+    return partition_state["partition"] == 0 and holds_scheduling_lease()
+
+def start_leader_election(partition: int = 0, partitions: int = 1, store: Optional[LeaseStore] = None):
+    """Start contending for the lease of a partition. Until the lease is held, scheduling
+    checks and instance-wide tasks are skipped."""
+    if not 0 <= partition < partitions:
+        raise ValueError(f"Partition {partition} is out of range for {partitions} partitions")
+    partition_state["partition"] = partition
+    partition_state["partitions"] = partitions
+    elector = LeaderElector(store or FileLeaseStore(leader_lease_dir),
+                            f"interview-scheduler-{partition}-of-{partitions}",
+                            ttl_seconds=leader_lease_ttl)
+    partition_state["elector"] = elector
+    elector.start()
+    logging.info(f"Leader election for partition {partition} of {partitions} as {elector.owner}: "
+                 f"{'leader' if elector.is_leader() else 'standby'}")
+    return elector
+
+def stop_leader_election():
+    """Release the partition lease so a standby can take over immediately."""
+    elector = partition_state["elector"]
+    if elector is not None:
+        elector.stop()
+
+def check_and_create_interviews(force_full_sync: bool = False, job_ids: Optional[Iterable[int]] = None):
+    """Create interviews for candidate-job pairs that do not have one yet.
+    
+    Incremental cycles only read jobs and interviews updated since the last cycle's
+    high-water mark. Every `full_reconciliation_interval` seconds (and on the first
+    cycle) everything is re-read to catch changes the UpdatedAt feed missed, such as
+    links that do not touch the job row. When job_ids is given (webhook events), only
+    those jobs are read and the jobs watermark is left alone."""
+    if not holds_scheduling_lease():
+        logging.info(f"Standby for partition {partition_state['partition']}, skipping check")
+        return 0
+    with scheduling_lock, api_call_scope() as api_calls:
+        return _check_and_create_interviews(force_full_sync, job_ids, api_calls)
+
+def record_cycle_metrics(cycle_type: str, started: float, api_calls: Dict, pair_count: int,
+                         created_count: int, failed_count: int, outcome: str = "ok"):
+    """Record the counters and histograms of one scheduling cycle.
+    The outcome is "ok", "error" or "deadline" (cancelled for running out of time)."""
+    duration = time.monotonic() - started
+    metrics.inc("interview_cycles_total", type=cycle_type, outcome=outcome)
+    metrics.inc("interview_pairs_scanned_total", pair_count)
+    metrics.inc("interviews_created_total", created_count)
+    metrics.inc("interviews_failed_total", failed_count)
+    metrics.observe("interview_cycle_duration_seconds", duration, type=cycle_type)
+    metrics.observe("interview_cycle_api_calls", api_calls["calls"], COUNT_BUCKETS, type=cycle_type)
+    metrics.observe("interview_cycle_pairs_scanned", pair_count, COUNT_BUCKETS, type=cycle_type)
+    metrics.observe("interview_cycle_interviews_created", created_count, COUNT_BUCKETS, type=cycle_type)
+    metrics.set_gauge("interview_last_cycle_timestamp", time.time())
+    metrics.set_gauge("interview_existing_keys", len(sync_state["existing_keys"]))
+    logging.info(f"Cycle metrics: {cycle_type} cycle took {duration:.2f}s with {api_calls['calls']} API calls")
+
+def _check_and_create_interviews(force_full_sync: bool, job_ids: Optional[Iterable[int]], api_calls: Dict):
     logging.info("=== Starting Interview Scheduling Check ===")
     logging.info(f"Time: {get_current_datetime()}")
     
+    last_full_sync = sync_state["last_full_sync"]
+    full_sync = (force_full_sync or last_full_sync is None or
+                 time.monotonic() - last_full_sync >= full_reconciliation_interval)
+    if job_ids is not None and last_full_sync is not None:
+        full_sync = False
+    cycle_type = "full" if full_sync else "targeted" if job_ids is not None else "incremental"
+    started = time.monotonic()
+    pair_count = 0
+    created_count = 0
+    failed_count = 0
+    # Keys claimed for pairs whose batch result has not been collected yet
+    claimed_keys = set()
+    # Batches handed to the create workers whose results have not been collected yet
+    in_flight = set()
+    # The jobs and links feeds are fully read before their last batches finish, so a
+    # cancelled cycle puts both watermarks back to where they started
+    jobs_watermark_at_start = sync_state["jobs_watermark"]
+    links_watermark_at_start = sync_state["links_watermark"]
+    # Jobs with failed pairs that this cycle re-reads; put back if it does not finish
+    retry_job_ids = set()
+    
+    def collect(done_futures):
+        # Results are handled on this thread, so the key set is never shared with workers
+        nonlocal created_count, failed_count
+        for future in done_futures:
+            in_flight.discard(future)
+            for result in future.result():
+                claimed_keys.discard(result["interview_key"])
+                if result["created"]:
+                    created_count += 1
+                else:
+                    # Release the claim and have the next cycle re-read the job, which the
+                    # jobs watermark may already have moved past
+                    sync_state["existing_keys"].discard(result["interview_key"])
+                    new_keys.discard(result["interview_key"])
+                    if result["job_id"] is not None:
+                        sync_state["retry_job_ids"].add(int(result["job_id"]))
+                    failed_count += 1
+    
     try:
-        # Fetch jobs
-        logging.info("=== Fetching Current Jobs and Candidates ===")
-        jobs_response = requests.get(jobs_url, headers=headers, params=params)
-        
-        if jobs_response.status_code != 200:
-            logging.error(f"Failed to fetch jobs. Status code: {jobs_response.status_code}")
-            return
-            
-        jobs_data = jobs_response.json()
-        logging.info(f"Successfully fetched {len(jobs_data.get('list', []))} jobs")
+        if full_sync:
+            logging.info("=== Full reconciliation cycle ===")
+            sync_state["jobs_watermark"] = None
+            sync_state["interviews_watermark"] = None
+            sync_state["links_watermark"] = None
+            sync_state["existing_keys"] = set()
+            sync_state["legacy_titles"] = set()
+            sync_state["last_full_sync"] = time.monotonic()
+            # Every job is read, so earlier failures are retried anyway
+            sync_state["retry_job_ids"] = set()
+        elif job_ids is not None:
+            job_ids = sorted(job_id for job_id in job_ids if job_in_partition(job_id))
+            logging.info(f"=== Targeted cycle for jobs {job_ids} ===")
+        else:
+            retry_job_ids, sync_state["retry_job_ids"] = sync_state["retry_job_ids"], set()
+            logging.info(f"=== Incremental cycle (jobs since {sync_state['jobs_watermark']}, "
+                         f"interviews since {sync_state['interviews_watermark']}, "
+                         f"links since {sync_state['links_watermark'] if links_table_id else '(scanning every job)'}, "
+                         f"{len(retry_job_ids)} jobs to retry) ===")
         
-        # Fetch interviews
+        # Stream interview keys; only keys (and titles of interviews created before keys
+        # existed) are kept in memory
         logging.info("=== Fetching Current Interviews ===")
-        interviews_response = requests.get(interview_url, headers=headers, params=params)
-        
-        if interviews_response.status_code != 200:
-            logging.error(f"Failed to fetch interviews. Status code: {interviews_response.status_code}")
-            return
-            
-        interviews_data = interviews_response.json()
-        existing_interviews = interviews_data.get('list', [])
-        logging.info(f"Successfully fetched {len(existing_interviews)} existing interviews")
-        
-        existing_titles = set(interview.get("Title") for interview in existing_interviews)
-        logging.info(f"Found {len(existing_titles)} existing interview titles")
-        
-        # Get all candidate-job pairs
-        pairs = get_all_candidate_job_pairs(jobs_data)
+        existing_keys = sync_state["existing_keys"]
+        legacy_titles = sync_state["legacy_titles"]
+        # Keys and titles learned this cycle, for the state store
+        new_keys = set()
+        new_titles = set()
+        interview_query = changed_since(sync_state["interviews_watermark"],
+                                        {'fields': f"Title,{interview_key_field},UpdatedAt"})
+        for interview in iter_with_watermark(iter_records(interviews_table_id, interview_query), "interviews_watermark"):
+            if interview.get(interview_key_field):
+                existing_keys.add(interview[interview_key_field])
+                new_keys.add(interview[interview_key_field])
+            else:
+                legacy_titles.add(interview.get("Title"))
+                new_titles.add(interview.get("Title"))
+        logging.info(f"Found {len(existing_keys)} existing interview keys and {len(legacy_titles)} legacy titles")
         
-        # Create missing interviews
-        logging.info("=== Creating Missing Interviews ===")
-        created_count = 0
+        # Stream jobs with their CV relations and create missing interviews as we go
+        logging.info("=== Fetching Current Jobs and Creating Missing Interviews ===")
         skipped_count = 0
         
-        for pair in pairs:
-            title = get_interview_title(pair["client"], pair["job_title"], pair["first_name"], pair["last_name"])
-            if title not in existing_titles:
-                success = create_interview(
-                    pair["client"], 
-                    pair["job_title"], 
-                    pair["first_name"], 
-                    pair["last_name"],
-                    pair.get("candidate_id"),  # Pass the candidate ID for linking
-                    pair.get("cv_filename"),   # Pass the CV filename
-                    pair.get("role_id")        # Pass the role ID
-                )
-                if success:
-                    created_count += 1
-            else:
-                logging.info(f"Skipping existing interview: {title}")
-                skipped_count += 1
+        job_fields = {'fields': f"Id,Job Title,Client,UpdatedAt,{jobs_cv_relation_field}"}
+        if job_ids is not None and not full_sync:
+            if not job_ids:
+                record_cycle_metrics(cycle_type, started, api_calls, 0, 0, 0)
+                return 0
+            jobs = iter_jobs_by_id(job_ids, job_fields)
+        elif full_sync or links_table_id:
+            # The link feed is read before the jobs, so a link made while the jobs are read
+            # is seen again next cycle rather than missed
+            linked_job_ids = set()
+            if links_table_id and full_sync:
+                seed_links_watermark()
+            elif links_table_id:
+                linked_job_ids = read_linked_job_ids()
+            jobs_query = changed_since(sync_state["jobs_watermark"], job_fields)
+            jobs = iter_with_watermark(iter_records(jobs_table_id, jobs_query), "jobs_watermark")
+            # Jobs with new links or failed pairs are re-read after the feed; pairs already
+            # handled from the feed are skipped by their claimed keys
+            reread_job_ids = linked_job_ids | retry_job_ids
+            if reread_job_ids:
+                jobs = itertools.chain(jobs, iter_jobs_by_id(reread_job_ids, job_fields))
+        else:
+            # No link table: new links can only be found by reading every job's links
+            jobs = iter_records(jobs_table_id, job_fields)
+        if partition_state["partitions"] > 1:
+            jobs = (job for job in jobs if job_in_partition(job.get("Id")))
+        missing_pairs = []
+        
+        with ThreadPoolExecutor(max_workers=interview_create_workers) as executor:
+            def submit_missing_pairs():
+                if not missing_pairs:
+                    return
+                # Stop handing out work once the cycle is out of time
+                check_deadline()
+                # Never create interviews after the lease has lapsed: a standby may own them now
+                if not holds_scheduling_lease():
+                    raise RuntimeError(f"Lost the lease for partition {partition_state['partition']} mid-cycle")
+                # Bound the work queued ahead of the workers
+                while len(in_flight) >= interview_create_workers:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    collect(done)
+                in_flight.add(executor.submit(propagate_context(create_interviews_batch), list(missing_pairs)))
+                missing_pairs.clear()
+            
+            for pair in iter_candidate_job_pairs(jobs):
+                pair_count += 1
+                key = get_pair_key(pair)
+                title = get_interview_title(pair["client"], pair["job_title"], pair["first_name"], pair["last_name"])
+                if key not in existing_keys and title not in legacy_titles:
+                    # Claim the key before handing the pair to a worker, so duplicate pairs
+                    # in this cycle are skipped
+                    existing_keys.add(key)
+                    new_keys.add(key)
+                    claimed_keys.add(key)
+                    missing_pairs.append(pair)
+                    if len(missing_pairs) >= interview_batch_size:
+                        submit_missing_pairs()
+                else:
+                    logging.info(f"Skipping existing interview: {title}")
+                    skipped_count += 1
+            submit_missing_pairs()
+            collect(list(in_flight))
         
         # Summary
         logging.info("=== Summary ===")
-        logging.info(f"Total candidate-job pairs processed: {len(pairs)}")
+        logging.info(f"Total candidate-job pairs processed: {pair_count}")
         logging.info(f"Interviews created: {created_count}")
+        logging.info(f"Interviews failed: {failed_count}")
         logging.info(f"Interviews skipped (already exist): {skipped_count}")
         logging.info("Check completed!")
         
+        persist_sync_state(full_sync, new_keys, new_titles)
+        record_cycle_metrics(cycle_type, started, api_calls, pair_count, created_count, failed_count)
+        return created_count
+    except DeadlineExceeded as e:
+        # Leaving the worker pool waited for the batches in flight; count what they did
+        for future in list(in_flight):
+            try:
+                collect([future])
+            except Exception as batch_error:
+                logging.warning(f"Interview batch did not finish: {str(batch_error)}")
+        # Release the claims of pairs whose outcome is still unknown, and re-read every job
+        # of this cycle next time: the jobs and links watermarks go back to where the cycle started
+        # (nothing at all after a cancelled full reconciliation) and the jobs of a targeted
+        # cycle are queued again. Nothing is persisted, and interviews created before the
+        # cancellation show up in the next interviews feed, so nothing is created twice.
+        # No full reconciliation is forced, as that would only make the next cycle longer.
+        sync_state["existing_keys"].difference_update(claimed_keys)
+        reset_watermark("jobs_watermark", None if full_sync else jobs_watermark_at_start)
+        reset_watermark("links_watermark", None if full_sync else links_watermark_at_start)
+        sync_state["retry_job_ids"].update(retry_job_ids)
+        if cycle_type == "targeted" and job_ids:
+            queue_webhook_jobs(job_ids)
+        logging.warning(f"✗ {cycle_type.capitalize()} cycle cancelled after {pair_count} pairs "
+                        f"({created_count} interviews created): {str(e)}")
+        record_cycle_metrics(cycle_type, started, api_calls, pair_count, created_count, failed_count,
+                             outcome="deadline")
         return created_count
     except Exception as e:
         logging.error(f"Error during check: {str(e)}")
+        # Reconcile fully next cycle rather than trusting partial state (e.g. keys
+        # claimed for interviews that were never created)
+        sync_state["last_full_sync"] = None
+        record_cycle_metrics(cycle_type, started, api_calls, pair_count, created_count, failed_count, outcome="error")
         return 0
 
-def main():
-    logging.info("=== Starting Continuous Interview Scheduling Monitor ===")
+# Create Flask app for event-driven mode
+app = Flask(__name__)
+
+def parse_job_id(value: Any) -> Optional[int]:
+    """Convert a job Id from a webhook payload to an int, or log it and return None if it is not one."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        logging.warning(f"Ignoring invalid job Id in webhook payload: {value!r}")
+        return None
+
+def extract_job_ids(payload: Any) -> Tuple[Set[int], bool]:
+    """Find the job IDs affected by a NocoDB webhook payload.
     
-    # Update existing interviews with the questions and status
-    updated_count = update_existing_interviews()
-    logging.info(f"Updated {updated_count} existing interviews with questions and status")
+    Rows from the jobs table contribute their own Id. Rows from other tables (CVs, the
+    jobs/CV link table) contribute the Ids of any related job records they carry. Ids that
+    are not integers are logged and skipped.
     
-    # Check for completed interviews with special CV files and update ranks
+    Returns:
+        tuple: (job IDs, unscoped) where unscoped is True if the event could not be tied
+        to specific jobs and a full incremental check is needed instead
+    """
+    data = payload.get('data') if isinstance(payload, dict) else None
+    if not isinstance(data, dict):
+        return set(), True
+    
+    rows = data.get('rows') or []
+    job_ids = set()
+    for row in rows:
+        if not isinstance(row, dict):
+            continue
+        if data.get('table_id') == jobs_table_id:
+            job_id = parse_job_id(row['Id']) if row.get('Id') is not None else None
+            if job_id is not None:
+                job_ids.add(job_id)
+            continue
+        for key, value in row.items():
+            if 'job' not in key.lower():
+                continue
+            related = value if isinstance(value, list) else [value]
+            for item in related:
+                job_id = parse_job_id(item['Id']) if isinstance(item, dict) and item.get('Id') is not None else None
+                if job_id is not None:
+                    job_ids.add(job_id)
+    
+    return job_ids, not job_ids
+
+def queue_webhook_jobs(job_ids: Iterable[int], unscoped: bool = False):
+    """Queue jobs (or, if unscoped, a full incremental check) for the webhook worker."""
+    condition = webhook_state["condition"]
+    with condition:
+        webhook_state["job_ids"].update(job_ids)
+        webhook_state["unscoped"] = webhook_state["unscoped"] or unscoped
+        condition.notify()
+
+@app.route('/interview_webhook', methods=['POST'])
+def interview_webhook():
+    """Receive NocoDB row events and queue the affected jobs for scheduling."""
+    if not hmac.compare_digest(request.headers.get(webhook_secret_header, '').encode(), webhook_secret.encode()):
+        logging.warning(f"Rejected webhook event from {request.remote_addr}: missing or wrong {webhook_secret_header}")
+        return jsonify({"error": "unauthorized"}), 401
+    payload = request.get_json(silent=True) or {}
+    job_ids, unscoped = extract_job_ids(payload)
+    logging.info(f"Webhook event {payload.get('type', 'unknown')}: jobs {sorted(job_ids) or 'unknown'}")
+    
+    queue_webhook_jobs(job_ids, unscoped)
+    
+    return jsonify({"queued": True, "job_ids": sorted(job_ids), "unscoped": unscoped}), 202
+
+def webhook_worker():
+    """Process queued webhook events, debouncing bursts into a single check."""
+    condition = webhook_state["condition"]
+    while True:
+        with condition:
+            while not webhook_state["job_ids"] and not webhook_state["unscoped"]:
+                condition.wait()
+        
+        # Let a burst of events (e.g. several CVs linked at once) accumulate
+        time.sleep(webhook_debounce_seconds)
+        
+        with condition:
+            job_ids = webhook_state["job_ids"]
+            unscoped = webhook_state["unscoped"]
+            webhook_state["job_ids"] = set()
+            webhook_state["unscoped"] = False
+        
+        try:
+            with deadline_scope(task_deadline_seconds["webhook"], "webhook check"):
+                if unscoped:
+                    created = check_and_create_interviews()
+                else:
+                    created = check_and_create_interviews(job_ids=job_ids)
+            logging.info(f"Webhook-triggered check created {created} interviews")
+        except Exception as e:
+            logging.error(f"Error processing webhook events: {str(e)}")
+
+def reload_questions():
+    """Reload the interview question bank from file."""
+    global ALL_QUESTIONS
+    logging.info("Reloading interview questions from file...")
+    ALL_QUESTIONS = load_questions_from_file()
+    return len(ALL_QUESTIONS)
+
+def run_interview_check():
+    new_interviews = check_and_create_interviews()
+    if new_interviews > 0:
+        logging.info(f"Created {new_interviews} new interviews in this check")
+    else:
+        logging.info("No new interviews created in this check")
+    return new_interviews
+
+def run_rank_check():
+    logging.info("Checking for interviews that need rank updates...")
     rank_updates = update_interview_ranks()
-    logging.info(f"Updated rank for {rank_updates} interviews with special CV files")
+    if rank_updates > 0:
+        logging.info(f"Updated rank for {rank_updates} interviews with special CV files")
+    else:
+        logging.info("No interview ranks needed updating")
+    return rank_updates
+
+def run_reconciliation():
+    """Slow safety-net check for event-driven mode: catch anything the webhooks missed.
+    A missed event may be a new CV link, which an incremental cycle would not see without
+    a link table, so every job's links are read."""
+    logging.info("Running reconciliation check...")
+    return check_and_create_interviews(force_full_sync=True)
+
+def log_scheduler_stats():
+    for line in format_stats(scheduler.get_stats()):
+        logging.info(f"Scheduler stats - {line}")
+
+def write_metrics_file():
+    """Write the metrics and scheduler task statistics to the JSON stats file."""
+    metrics.write_json(metrics_path, {
+        "tasks": scheduler.get_stats(),
+        "partition": {"partition": partition_state["partition"], "partitions": partition_state["partitions"],
+                      "leader": holds_scheduling_lease()}
+    })
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Scheduler metrics in the Prometheus text format."""
+    return app.response_class(metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/scheduler_stats', methods=['GET'])
+def scheduler_stats():
+    """Per-task last run time, duration, lag and run/error counts."""
+    return jsonify(scheduler.get_stats())
+
+def run_webhook_server(port: int):
+    """Run the scheduler in event-driven mode behind the /interview_webhook endpoint."""
+    if not webhook_secret:
+        raise ValueError("Set REFRESH_WEBHOOK_SECRET to the secret NocoDB sends in the "
+                         f"{webhook_secret_header} header of webhook events")
+    logging.info("=== Starting Event-Driven Interview Scheduler ===")
+    logging.info(f"Debounce window: {webhook_debounce_seconds}s, "
+                 f"reconciliation every {webhook_reconciliation_interval}s")
     
-    # Configuration
-    check_interval_seconds = 10  # Check every 10 seconds
-    reload_questions_interval = 300  # Reload questions every 5 minutes (300 seconds)
-    rank_check_interval = 60  # Check ranks every minute
+    check_interview_key_field()
+    open_state_store()
+    with deadline_scope(task_deadline_seconds["startup"], "startup"):
+        # Full reconciliation unless state from a previous run was restored
+        check_and_create_interviews()
+    
+    threading.Thread(target=webhook_worker, name="webhook-worker", daemon=True).start()
+    scheduler.add_task("reconciliation", run_reconciliation, webhook_reconciliation_interval,
+                       task_jitter_seconds["reconciliation"], run_immediately=False,
+                       deadline_seconds=task_deadline_seconds["reconciliation"])
+    scheduler.add_task("rank_check", run_rank_check, rank_check_interval,
+                       task_jitter_seconds["rank_check"], deadline_seconds=task_deadline_seconds["rank_check"])
+    scheduler.add_task("reload_questions", reload_questions, reload_questions_interval,
+                       task_jitter_seconds["reload_questions"], run_immediately=False)
+    scheduler.add_task("question_backfill", update_existing_interviews, question_backfill_interval,
+                       task_jitter_seconds["question_backfill"],
+                       deadline_seconds=task_deadline_seconds["question_backfill"])
+    scheduler.add_task("stats", log_scheduler_stats, stats_log_interval, run_immediately=False)
+    scheduler.add_task("metrics", write_metrics_file, metrics_write_interval, run_immediately=False)
+    scheduler.start()
+    
+    logging.info(f"Listening for NocoDB webhooks on port {port} at /interview_webhook")
+    try:
+        app.run(host='0.0.0.0', port=port, threaded=True)
+    finally:
+        stop_leader_election()
+
+def main():
+    logging.info("=== Starting Continuous Interview Scheduling Monitor ===")
+    check_interview_key_field()
+    
+    # Resume from the previous run's state so the first check is incremental
+    open_state_store()
+    
+    # Each task runs on its own thread and cadence, so a slow rank check never delays
+    # interview creation. Ranks are checked and existing interviews without questions are
+    # given some as part of startup; the backfill then repeats on whichever instance leads.
+    scheduler.add_task("interview_check", run_interview_check, check_interval_seconds,
+                       task_jitter_seconds["interview_check"],
+                       deadline_seconds=task_deadline_seconds["interview_check"])
+    scheduler.add_task("rank_check", run_rank_check, rank_check_interval,
+                       task_jitter_seconds["rank_check"], deadline_seconds=task_deadline_seconds["rank_check"])
+    scheduler.add_task("reload_questions", reload_questions, reload_questions_interval,
+                       task_jitter_seconds["reload_questions"], run_immediately=False)
+    scheduler.add_task("question_backfill", update_existing_interviews, question_backfill_interval,
+                       task_jitter_seconds["question_backfill"],
+                       deadline_seconds=task_deadline_seconds["question_backfill"])
+    scheduler.add_task("stats", log_scheduler_stats, stats_log_interval, run_immediately=False)
+    scheduler.add_task("metrics", write_metrics_file, metrics_write_interval, run_immediately=False)
     
     logging.info(f"Monitor will check for updates every {check_interval_seconds} seconds")
     logging.info(f"Questions will be reloaded every {reload_questions_interval} seconds")
     logging.info(f"Interview ranks will be checked every {rank_check_interval} seconds")
     
-    last_questions_reload = datetime.now()
-    last_rank_check = datetime.now()
-    
     try:
-        while True:
-            # Check if it's time to reload questions
-            if (datetime.now() - last_questions_reload).total_seconds() >= reload_questions_interval:
-                logging.info("Reloading interview questions from file...")
-                global ALL_QUESTIONS
-                ALL_QUESTIONS = load_questions_from_file()
-                last_questions_reload = datetime.now()
-            
-            # Check if it's time to check interview ranks
-            if (datetime.now() - last_rank_check).total_seconds() >= rank_check_interval:
-                logging.info("Checking for interviews that need rank updates...")
-                rank_updates = update_interview_ranks()
-                if rank_updates > 0:
-                    logging.info(f"Updated rank for {rank_updates} interviews with special CV files")
-                else:
-                    logging.info("No interview ranks needed updating")
-                last_rank_check = datetime.now()
-            
-            new_interviews = check_and_create_interviews()
-            
-            if new_interviews > 0:
-                logging.info(f"Created {new_interviews} new interviews in this check")
-            else:
-                logging.info("No new interviews created in this check")
-                
-            next_check_time = datetime.now() + timedelta(seconds=check_interval_seconds)
-            logging.info(f"Next check scheduled for: {next_check_time.strftime('%Y-%m-%d %H:%M:%S')}")
-            logging.info("Waiting for next check cycle...")
-            
-            # Sleep until next check
-            time.sleep(check_interval_seconds)
+        scheduler.run_forever()
     except KeyboardInterrupt:
         logging.info("Monitor stopped by user")
     except Exception as e:
         logging.error(f"Monitor stopped due to error: {str(e)}")
         raise
     finally:
+        stop_leader_election()
+        log_scheduler_stats()
         logging.info("=== Continuous Interview Scheduling Monitor Stopped ===")
 
 if __name__ == "__main__":
-    # Call update_existing_interviews once when script is run
-    update_existing_interviews()
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Create interviews for new candidate-job pairs')
+    parser.add_argument('--webhook', action='store_true',
+                        help='Run event-driven, triggered by NocoDB webhooks instead of 10s polling')
+    parser.add_argument('--port', type=int, default=int(os.environ.get('PORT', 8889)),
+                        help='Port for the webhook receiver (default: 8889)')
+    parser.add_argument('--ha', action='store_true',
+                        help='Elect a leader through REFRESH_LEASE_DIR so several instances can run')
+    parser.add_argument('--partition', type=int, default=0,
+                        help='Partition of the jobs handled by this instance (implies --ha)')
+    parser.add_argument('--partitions', type=int, default=1,
+                        help='Total number of partitions the jobs are split into (implies --ha)')
+    args = parser.parse_args()
+    
+    if args.ha or args.partitions > 1:
+        start_leader_election(args.partition, args.partitions)
+    
+    if args.webhook:
+        run_webhook_server(args.port)
+    else:
+        main()
\ No newline at end of file
@@ -0,0 +1,198 @@
+#!/usr/bin/env python
+"""
+Scheduler Metrics
+
+A small in-process metrics registry for the interview scheduler: counters, gauges and
+fixed-bucket histograms, with optional labels. Snapshots can be rendered in the
+Prometheus text format (for a /metrics endpoint) or written to a JSON stats file.
+
+API calls are counted globally and, inside an api_call_scope(), per scope as well, so a
+scheduling cycle can report how many requests it made without counting the requests of
+tasks running alongside it. The scope is a context variable, so work handed to other
+threads must be wrapped with propagate_context() to be counted.
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Default histogram buckets (upper bounds)
+DURATION_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+COUNT_BUCKETS = (0, 1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000, 10000)
+LAG_BUCKETS = (10, 30, 60, 120, 300, 600, 1800, 3600, 7200, 21600, 86400)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+class Histogram:
+    """Fixed-bucket histogram with count, sum, min and max."""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(sorted(buckets))
+        self.bucket_counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.bucket_counts[i] += 1
+                break
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return cumulative bucket counts (Prometheus-style) and summary values."""
+        cumulative = []
+        running = 0
+        for bound, count in zip(self.buckets, self.bucket_counts):
+            running += count
+            cumulative.append([bound, running])
+        return {"buckets": cumulative, "count": self.count, "sum": self.sum,
+                "min": self.min, "max": self.max}
+
+class MetricsRegistry:
+    """Thread-safe registry of counters, gauges and histograms."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters: Dict[str, Dict[LabelKey, float]] = {}
+        self.gauges: Dict[str, Dict[LabelKey, float]] = {}
+        self.histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self.descriptions: Dict[str, str] = {}
+        self.started_at = time.time()
+
+    @staticmethod
+    def _label_key(labels: Dict[str, Any]) -> LabelKey:
+        return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+    def describe(self, name: str, description: str) -> None:
+        """Set the help text shown for a metric in the Prometheus output."""
+        self.descriptions[name] = description
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        """Increase a counter."""
+        key = self._label_key(labels)
+        with self.lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels) -> None:
+        """Set a gauge to the given value."""
+        with self.lock:
+            self.gauges.setdefault(name, {})[self._label_key(labels)] = value
+
+    def observe(self, name: str, value: float, buckets: Sequence[float] = DURATION_BUCKETS, **labels) -> None:
+        """Record a value in a histogram. The buckets are fixed by the first observation."""
+        key = self._label_key(labels)
+        with self.lock:
+            series = self.histograms.setdefault(name, {})
+            if key not in series:
+                series[key] = Histogram(buckets)
+            series[key].observe(value)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return every metric as plain JSON-serialisable data."""
+        def series_list(series, render):
+            return [{"labels": dict(key), **render(value)} for key, value in series.items()]
+
+        with self.lock:
+            return {
+                "started_at": self.started_at,
+                "generated_at": time.time(),
+                "counters": {name: series_list(series, lambda v: {"value": v})
+                             for name, series in self.counters.items()},
+                "gauges": {name: series_list(series, lambda v: {"value": v})
+                           for name, series in self.gauges.items()},
+                "histograms": {name: series_list(series, Histogram.snapshot)
+                               for name, series in self.histograms.items()},
+            }
+
+    def render_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        def label_text(key: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+            pairs = list(key) + list(extra)
+            if not pairs:
+                return ""
+            return "{" + ",".join(f'{name}="{value}"' for name, value in pairs) + "}"
+
+        lines = []
+        collected = []
+        with self.lock:
+            for kind, registry in (("counter", self.counters), ("gauge", self.gauges)):
+                for name, series in registry.items():
+                    collected.append((kind, name, [(key, value) for key, value in series.items()]))
+            for name, series in self.histograms.items():
+                collected.append(("histogram", name, [(key, h.snapshot()) for key, h in series.items()]))
+
+        for kind, name, series in collected:
+            if name in self.descriptions:
+                lines.append(f"# HELP {name} {self.descriptions[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+            for key, value in series:
+                if kind != "histogram":
+                    lines.append(f"{name}{label_text(key)} {value}")
+                    continue
+                for bound, count in value["buckets"]:
+                    lines.append(f"{name}_bucket{label_text(key, (('le', str(bound)),))} {count}")
+                lines.append(f"{name}_bucket{label_text(key, (('le', '+Inf'),))} {value['count']}")
+                lines.append(f"{name}_sum{label_text(key)} {value['sum']}")
+                lines.append(f"{name}_count{label_text(key)} {value['count']}")
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, path: str, extra: Optional[Dict[str, Any]] = None) -> None:
+        """Atomically write a snapshot (plus any extra sections) to a JSON file."""
+        data = self.snapshot()
+        if extra:
+            data.update(extra)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=2, default=str)
+        os.replace(tmp_path, path)
+
+# Shared registry for the scheduler process
+metrics = MetricsRegistry()
+
+# Per-scope API call counter, see api_call_scope()
+_api_call_scope: contextvars.ContextVar[Optional[Dict[str, int]]] = contextvars.ContextVar(
+    "api_call_scope", default=None)
+
+def count_api_call(method: str) -> None:
+    """Count one API request globally and in the current api_call_scope(), if any."""
+    metrics.inc("nocodb_requests_total", method=method)
+    scope = _api_call_scope.get()
+    if scope is not None:
+        # Workers of one scope may count concurrently
+        with metrics.lock:
+            scope["calls"] += 1
+
+@contextmanager
+def api_call_scope() -> Iterator[Dict[str, int]]:
+    """Count the API calls made in this context; the count is in the yielded dict's 'calls'."""
+    scope = {"calls": 0}
+    token = _api_call_scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _api_call_scope.reset(token)
+
+def propagate_context(func: Callable) -> Callable:
+    """Wrap func to run in a copy of the caller's context on whichever thread calls it,
+    so thread pool workers count their API calls in the caller's api_call_scope()."""
+    context = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        # A context can only be entered by one thread at a time, so each call gets a copy
+        return context.copy().run(func, *args, **kwargs)
+    return run
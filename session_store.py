@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+"""
+Session Store
+
+Interview progress kept outside st.session_state, keyed by interview ID. A candidate who
+reconnects, whether to the same replica, to a restarted pod, or to another replica that
+shares the store, resumes where they left off. The store is the source of truth for
+progress; the app's local answer journal follows it.
+
+A session is a JSON document (the chat messages, questions, question index, responses
+and answer journal state) with a version that goes up on every save. Saves are
+compare-and-set on that version: a session saving over progress made elsewhere (another
+tab or replica) gets SessionConflict and should reload the stored state instead.
+
+The SQLite store keeps every session in one file. Replicas on one host, or sharing a
+volume with working file locks, can share it. Other backends (Redis, a database) only
+need to implement SessionStore and be added to SESSION_STORES. The in-memory store is a
+stand-in for tests and single-process runs.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+SESSION_STORE_BACKEND = os.environ.get('INTERVIEW_SESSION_STORE', 'sqlite')
+SESSION_STORE_PATH = os.environ.get('INTERVIEW_SESSION_STORE_PATH',
+                                    os.path.join(os.getcwd(), ".interview_sessions.sqlite3"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    interview_id TEXT PRIMARY KEY,
+    state TEXT,
+    version INTEGER,
+    updated_at REAL
+);
+"""
+
+class SessionConflict(Exception):
+    """Raised when a session is saved over a version it did not load."""
+
+class SessionStore(ABC):
+    """Interface for session stores."""
+
+    @abstractmethod
+    def load(self, interview_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Load a session.
+
+        Args:
+            interview_id (str): Interview the session belongs to
+
+        Returns:
+            dict: {"state": ..., "version": ..., "updated_at": ...}, or None if there is none
+        """
+
+    @abstractmethod
+    def version(self, interview_id: str) -> Optional[int]:
+        """Return the stored version of a session without loading it, or None if there is none."""
+
+    @abstractmethod
+    def save(self, interview_id: str, state: Dict[str, Any], expected_version: Optional[int] = None) -> int:
+        """
+        Save a session.
+
+        Args:
+            interview_id (str): Interview the session belongs to
+            state (dict): JSON-serialisable session state
+            expected_version (int): Version the caller loaded or last saved. None replaces
+                whatever is stored, e.g. when a new take of the interview starts.
+
+        Returns:
+            int: The new version
+
+        Raises:
+            SessionConflict: If the stored version is not expected_version
+        """
+
+    @abstractmethod
+    def delete(self, interview_id: str) -> None:
+        """Delete a session, if there is one."""
+
+class SQLiteSessionStore(SessionStore):
+    """Session store backed by a SQLite file. Safe to share between threads and processes."""
+
+    def __init__(self, db_path: str = SESSION_STORE_PATH, retention_seconds: float = 30 * 24 * 3600):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        # Autocommit mode; saves use explicit immediate transactions so the version check
+        # and the write are atomic across processes
+        self.conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self.lock = threading.Lock()
+        with self.lock:
+            self.conn.execute("DELETE FROM sessions WHERE updated_at < ?", (time.time() - retention_seconds,))
+
+    def load(self, interview_id: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            row = self.conn.execute("SELECT state, version, updated_at FROM sessions WHERE interview_id = ?",
+                                    (str(interview_id),)).fetchone()
+        if row is None:
+            return None
+        return {"state": json.loads(row[0]), "version": row[1], "updated_at": row[2]}
+
+    def version(self, interview_id: str) -> Optional[int]:
+        with self.lock:
+            row = self.conn.execute("SELECT version FROM sessions WHERE interview_id = ?",
+                                    (str(interview_id),)).fetchone()
+        return row[0] if row else None
+
+    def save(self, interview_id: str, state: Dict[str, Any], expected_version: Optional[int] = None) -> int:
+        data = json.dumps(state)
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self.conn.execute("SELECT version FROM sessions WHERE interview_id = ?",
+                                        (str(interview_id),)).fetchone()
+                current = row[0] if row else None
+                if expected_version is not None and current != expected_version:
+                    raise SessionConflict(f"Session {interview_id} is at version {current}, "
+                                          f"not {expected_version}")
+                new_version = (current or 0) + 1
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO sessions (interview_id, state, version, updated_at) VALUES (?, ?, ?, ?)",
+                    (str(interview_id), data, new_version, time.time()))
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        return new_version
+
+    def delete(self, interview_id: str) -> None:
+        with self.lock:
+            self.conn.execute("DELETE FROM sessions WHERE interview_id = ?", (str(interview_id),))
+
+class InMemorySessionStore(SessionStore):
+    """Session store for tests and single-process runs."""
+
+    def __init__(self):
+        self.sessions: Dict[str, Dict[str, Any]] = {}
+        self.lock = threading.Lock()
+
+    def load(self, interview_id: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            session = self.sessions.get(str(interview_id))
+            if session is None:
+                return None
+            # Round-trip through JSON so callers never share state with the store
+            return {"state": json.loads(session["state"]), "version": session["version"],
+                    "updated_at": session["updated_at"]}
+
+    def version(self, interview_id: str) -> Optional[int]:
+        with self.lock:
+            session = self.sessions.get(str(interview_id))
+            return session["version"] if session else None
+
+    def save(self, interview_id: str, state: Dict[str, Any], expected_version: Optional[int] = None) -> int:
+        data = json.dumps(state)
+        with self.lock:
+            session = self.sessions.get(str(interview_id))
+            current = session["version"] if session else None
+            if expected_version is not None and current != expected_version:
+                raise SessionConflict(f"Session {interview_id} is at version {current}, not {expected_version}")
+            new_version = (current or 0) + 1
+            self.sessions[str(interview_id)] = {"state": data, "version": new_version, "updated_at": time.time()}
+        return new_version
+
+    def delete(self, interview_id: str) -> None:
+        with self.lock:
+            self.sessions.pop(str(interview_id), None)
+
+SESSION_STORES = {
+    "sqlite": SQLiteSessionStore,
+    "memory": InMemorySessionStore,
+}
+
+def create_session_store(backend: str = SESSION_STORE_BACKEND) -> SessionStore:
+    """Create the session store named by INTERVIEW_SESSION_STORE (one of SESSION_STORES)."""
+    if backend not in SESSION_STORES:
+        raise ValueError(f"Unknown session store {backend!r}; expected one of {', '.join(SESSION_STORES)}")
+    logger.info(f"Using {backend} session store")
+    return SESSION_STORES[backend]()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+"""
+State Store
+
+Local SQLite store for the interview scheduler's sync state, so refresh_website.py can
+resume where it left off after a restart instead of re-scanning NocoDB. It holds:
+
+- the idempotency keys (and legacy titles) of interviews that already exist
+- the change-feed watermarks and the time of the last full reconciliation
+- the (First Name, Last Name) -> candidate ID map
+- interview-candidate links that were queued but not yet written
+
+Everything in the store can be rebuilt from NocoDB, so deleting the file is always safe;
+the next cycle is then a full reconciliation.
+"""
+
+import os
+import time
+import sqlite3
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+STATE_STORE_PATH = os.environ.get('REFRESH_STATE_PATH', os.path.join(os.getcwd(), ".refresh_state.sqlite3"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS interview_keys (key TEXT PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS legacy_titles (title TEXT PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS sync_values (name TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS candidates (
+    first_name TEXT,
+    last_name TEXT,
+    candidate_id INTEGER,
+    PRIMARY KEY (first_name, last_name)
+);
+CREATE TABLE IF NOT EXISTS pending_links (
+    interview_id INTEGER,
+    candidate_id INTEGER,
+    queued_at REAL,
+    PRIMARY KEY (interview_id, candidate_id)
+);
+"""
+
+class StateStore:
+    """SQLite-backed scheduler state. Safe to share between threads."""
+
+    def __init__(self, db_path: str = STATE_STORE_PATH):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        # Link workers and the scheduling cycle write from different threads; the
+        # connection is shared and every access goes through the lock
+        self.conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self.lock = threading.Lock()
+
+    def close(self) -> None:
+        with self.lock:
+            self.conn.close()
+
+    # Interview keys and legacy titles
+
+    def load_interview_keys(self) -> Tuple[Set[str], Set[str]]:
+        """Return (interview keys, legacy titles) of interviews known to exist."""
+        with self.lock:
+            keys = {row[0] for row in self.conn.execute("SELECT key FROM interview_keys")}
+            titles = {row[0] for row in self.conn.execute("SELECT title FROM legacy_titles")}
+        return keys, titles
+
+    def add_interview_keys(self, keys: Iterable[str], titles: Iterable[str] = ()) -> None:
+        """Record newly seen interview keys and legacy titles."""
+        with self.lock, self.conn:
+            self.conn.executemany("INSERT OR IGNORE INTO interview_keys (key) VALUES (?)",
+                                  ((key,) for key in keys))
+            self.conn.executemany("INSERT OR IGNORE INTO legacy_titles (title) VALUES (?)",
+                                  ((title,) for title in titles if title is not None))
+
+    def replace_interview_keys(self, keys: Iterable[str], titles: Iterable[str]) -> None:
+        """Replace the stored keys and titles, e.g. after a full reconciliation."""
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM interview_keys")
+            self.conn.execute("DELETE FROM legacy_titles")
+            self.conn.executemany("INSERT OR IGNORE INTO interview_keys (key) VALUES (?)",
+                                  ((key,) for key in keys))
+            self.conn.executemany("INSERT OR IGNORE INTO legacy_titles (title) VALUES (?)",
+                                  ((title,) for title in titles if title is not None))
+
+    # Watermarks and other scalar values
+
+    def get_values(self) -> Dict[str, Optional[str]]:
+        """Return all stored scalar values (watermarks, last full sync time)."""
+        with self.lock:
+            return dict(self.conn.execute("SELECT name, value FROM sync_values"))
+
+    def set_values(self, values: Dict[str, Optional[str]]) -> None:
+        """Store scalar values; None removes a value."""
+        with self.lock, self.conn:
+            for name, value in values.items():
+                if value is None:
+                    self.conn.execute("DELETE FROM sync_values WHERE name = ?", (name,))
+                else:
+                    self.conn.execute("INSERT OR REPLACE INTO sync_values (name, value) VALUES (?, ?)",
+                                      (name, str(value)))
+
+    # Candidate ID map
+
+    def load_candidate_index(self, max_age_seconds: float) -> Optional[Dict[tuple, int]]:
+        """Return the stored candidate index, or None if it is missing or older than max_age_seconds."""
+        saved_at = self.get_values().get("candidate_index_saved_at")
+        if saved_at is None or time.time() - float(saved_at) > max_age_seconds:
+            return None
+        with self.lock:
+            rows = self.conn.execute("SELECT first_name, last_name, candidate_id FROM candidates")
+            return {(first_name, last_name): candidate_id for first_name, last_name, candidate_id in rows}
+
+    def save_candidate_index(self, candidate_index: Dict[tuple, int]) -> None:
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM candidates")
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO candidates (first_name, last_name, candidate_id) VALUES (?, ?, ?)",
+                ((first_name, last_name, candidate_id)
+                 for (first_name, last_name), candidate_id in candidate_index.items()))
+            self.conn.execute("INSERT OR REPLACE INTO sync_values (name, value) VALUES (?, ?)",
+                              ("candidate_index_saved_at", str(time.time())))
+
+    # Pending interview-candidate links
+
+    def add_pending_link(self, interview_id: int, candidate_id: int) -> None:
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO pending_links (interview_id, candidate_id, queued_at) VALUES (?, ?, ?)",
+                (interview_id, candidate_id, time.time()))
+
+    def remove_pending_link(self, interview_id: int, candidate_id: int) -> None:
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM pending_links WHERE interview_id = ? AND candidate_id = ?",
+                              (interview_id, candidate_id))
+
+    def list_pending_links(self) -> List[Tuple[int, int]]:
+        """Return queued links in the order they were queued."""
+        with self.lock:
+            return [(interview_id, candidate_id) for interview_id, candidate_id in self.conn.execute(
+                "SELECT interview_id, candidate_id FROM pending_links ORDER BY queued_at")]
@@ -0,0 +1,215 @@
+#!/usr/bin/env python
+"""
+Task Scheduler
+
+Runs periodic tasks, each on its own cadence and its own thread, so a slow task never
+delays the others. Tasks are scheduled at a fixed rate: the next run is due one interval
+after the previous run was due, not after it finished, so slow runs do not drift the
+timetable. A run that overruns its interval is never overlapped with itself; the missed
+ticks are skipped and the task runs again at the next tick on its timetable.
+
+Each run can be delayed by a random jitter so that several schedulers started together
+do not hit the API in lockstep. A task can be given a deadline: each run is executed
+inside a deadline_scope() (see deadlines.py), so its outbound calls stop once the budget
+is spent, and runs that overrun it are counted. Per-task statistics (last run, duration, lag behind the
+schedule, run, error and deadline counts) are available from Scheduler.get_stats().
+"""
+
+import time
+import random
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+from deadlines import DeadlineExceeded, deadline_scope
+
+logger = logging.getLogger(__name__)
+
+class ScheduledTask:
+    """A periodic task and its run statistics."""
+
+    def __init__(self, name: str, func: Callable[[], Any], interval_seconds: float,
+                 jitter_seconds: float = 0, run_immediately: bool = True,
+                 deadline_seconds: Optional[float] = None):
+        self.name = name
+        self.func = func
+        self.interval_seconds = interval_seconds
+        self.jitter_seconds = jitter_seconds
+        self.run_immediately = run_immediately
+        self.deadline_seconds = deadline_seconds
+        self.thread: Optional[threading.Thread] = None
+        self.lock = threading.Lock()
+        self.running = False
+        self.runs = 0
+        self.errors = 0
+        self.skipped_ticks = 0
+        self.deadline_exceeded = 0
+        self.last_started: Optional[float] = None
+        self.last_finished: Optional[float] = None
+        self.last_duration: Optional[float] = None
+        self.last_lag: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.last_result: Any = None
+        self.next_due: Optional[float] = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return a JSON-serialisable snapshot of the task's statistics."""
+        with self.lock:
+            return {
+                "interval_seconds": self.interval_seconds,
+                "jitter_seconds": self.jitter_seconds,
+                "deadline_seconds": self.deadline_seconds,
+                "running": self.running,
+                "runs": self.runs,
+                "errors": self.errors,
+                "skipped_ticks": self.skipped_ticks,
+                "deadline_exceeded": self.deadline_exceeded,
+                "last_started": self.last_started,
+                "last_finished": self.last_finished,
+                "last_duration": self.last_duration,
+                "last_lag": self.last_lag,
+                "last_error": self.last_error,
+                "next_due": self.next_due,
+            }
+
+class Scheduler:
+    """Runs registered tasks concurrently, one thread per task."""
+
+    def __init__(self):
+        self.tasks: Dict[str, ScheduledTask] = {}
+        self.stop_event = threading.Event()
+
+    def add_task(self, name: str, func: Callable[[], Any], interval_seconds: float,
+                 jitter_seconds: float = 0, run_immediately: bool = True,
+                 deadline_seconds: Optional[float] = None) -> ScheduledTask:
+        """
+        Register a periodic task.
+
+        Args:
+            name (str): Unique task name, used for logging and statistics
+            func (Callable): Function to call on every run
+            interval_seconds (float): Time between scheduled runs
+            jitter_seconds (float): Maximum random delay added to each run
+            run_immediately (bool): Run as soon as the scheduler starts instead of after one interval
+            deadline_seconds (float, optional): Time budget for each run
+
+        Returns:
+            ScheduledTask: The registered task
+        """
+        if name in self.tasks:
+            raise ValueError(f"Task {name} is already registered")
+        task = ScheduledTask(name, func, interval_seconds, jitter_seconds, run_immediately, deadline_seconds)
+        self.tasks[name] = task
+        return task
+
+    def start(self) -> None:
+        """Start a thread for every registered task."""
+        self.stop_event.clear()
+        for task in self.tasks.values():
+            if task.thread and task.thread.is_alive():
+                continue
+            task.thread = threading.Thread(target=self._run_task_loop, args=(task,),
+                                           name=f"task-{task.name}", daemon=True)
+            task.thread.start()
+        logger.info(f"Scheduler started {len(self.tasks)} tasks: " +
+                    ", ".join(f"{t.name} every {t.interval_seconds}s" for t in self.tasks.values()))
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop scheduling new runs and wait for running tasks to finish."""
+        self.stop_event.set()
+        for task in self.tasks.values():
+            if task.thread:
+                task.thread.join(timeout)
+
+    def run_forever(self) -> None:
+        """Start the tasks and block until stop() is called or the process is interrupted."""
+        self.start()
+        try:
+            while not self.stop_event.wait(1):
+                pass
+        finally:
+            self.stop()
+
+    def run_now(self, name: str) -> bool:
+        """Run a task immediately on the caller's thread unless it is already running.
+
+        Returns:
+            bool: False if the task was skipped because a run was already in progress
+        """
+        task = self.tasks[name]
+        return self._run_once(task, time.time())
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return statistics for every task, keyed by task name."""
+        return {name: task.get_stats() for name, task in self.tasks.items()}
+
+    def _run_task_loop(self, task: ScheduledTask) -> None:
+        next_due = time.time() if task.run_immediately else time.time() + task.interval_seconds
+        while not self.stop_event.is_set():
+            jitter = random.uniform(0, task.jitter_seconds) if task.jitter_seconds else 0
+            with task.lock:
+                task.next_due = next_due
+            if self.stop_event.wait(max(0, next_due + jitter - time.time())):
+                break
+
+            self._run_once(task, next_due)
+
+            # Fixed rate: the next run is due one interval after this one was due. If the run
+            # overran, skip the missed ticks instead of running back-to-back to catch up.
+            next_due += task.interval_seconds
+            now = time.time()
+            if next_due < now:
+                missed = int((now - next_due) // task.interval_seconds) + 1
+                with task.lock:
+                    task.skipped_ticks += missed
+                next_due += missed * task.interval_seconds
+
+    def _run_once(self, task: ScheduledTask, due_at: float) -> bool:
+        with task.lock:
+            if task.running:
+                return False
+            task.running = True
+            started = time.time()
+            task.last_started = started
+            task.last_lag = max(0.0, started - due_at)
+
+        error = None
+        result = None
+        overran = False
+        with deadline_scope(task.deadline_seconds, f"task {task.name}") as deadline:
+            try:
+                result = task.func()
+            except DeadlineExceeded as e:
+                error = str(e)
+                logger.warning(f"Task {task.name} cancelled: {error}")
+            except Exception as e:
+                error = str(e)
+                logger.error(f"Task {task.name} failed: {error}")
+            # Tasks may handle the cancellation themselves, so check the clock as well
+            overran = deadline is not None and task.deadline_seconds is not None and deadline.expired()
+
+        finished = time.time()
+        with task.lock:
+            task.running = False
+            task.runs += 1
+            task.last_finished = finished
+            task.last_duration = finished - started
+            task.last_result = result
+            if error is not None:
+                task.errors += 1
+                task.last_error = error
+            if overran:
+                task.deadline_exceeded += 1
+        if task.last_duration > task.interval_seconds:
+            logger.warning(f"Task {task.name} took {task.last_duration:.1f}s, "
+                           f"longer than its {task.interval_seconds}s interval")
+        return True
+
+def format_stats(stats: Dict[str, Dict[str, Any]]) -> List[str]:
+    """Render scheduler statistics as one log line per task."""
+    lines = []
+    for name, s in stats.items():
+        duration = f"{s['last_duration']:.2f}s" if s['last_duration'] is not None else "-"
+        lag = f"{s['last_lag']:.2f}s" if s['last_lag'] is not None else "-"
+        lines.append(f"{name}: runs={s['runs']} errors={s['errors']} skipped={s['skipped_ticks']} "
+                     f"deadline_exceeded={s['deadline_exceeded']} last_duration={duration} last_lag={lag}")
+    return lines